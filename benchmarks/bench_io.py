@@ -0,0 +1,57 @@
+"""I/O benchmarks: export_config and import_config of configs with 10, 100 and 1000 fields
+Run from repository root: python benchmarks/bench_io.py [repeats]"""
+import sys
+from timeit import Timer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from configlayer import ConfigBase                      # noqa: E402
+from configlayer._io import _CODECS                     # noqa: E402
+
+
+FIELDS_COUNTS = (10, 100, 1000)
+PROFILES_COUNT = 10
+DEFAULTS = (False, 'string', 65535, 3.1415, b'bytes', (1, 2, None), [1, 'a'], {'a'}, {1: 'a'})
+
+
+def make_config(count: int) -> type[ConfigBase]:
+    """Get config class with fields of different types"""
+    values = {f'f{i}': DEFAULTS[i % len(DEFAULTS)] for i in range(count)}
+    annotations = {k: type(v) for k, v in values.items()}
+    return type(f'Config{count}', (ConfigBase,), {'__annotations__': annotations, **values})
+
+
+def bench(count: int, repeats: int) -> dict[str, float]:
+    """Get best time (in microseconds) of export and import of config with all fields changed"""
+    config = make_config(count)
+    data = config(io=True, profiles=True)
+    changed = {k: not v if isinstance(v, bool) else v * 2 if isinstance(v, (str, int, float, bytes,
+                                                                        tuple, list)) else v
+               for k, v in data.cfg.get_defaults.items()}
+    for i in range(PROFILES_COUNT):
+        data.cfg.profiles.set(f'p{i}', changed)
+    io = data.cfg.io
+    raw = io.export_config(strict_data=True)
+
+    def best(stmt, number=10):
+        return min(Timer(stmt).repeat(repeats, number)) / number * 1e6
+
+    _CODECS.pop(config, None)
+    return {'generate': best(lambda: (_CODECS.pop(config, None), io._codec), 1),  # noqa
+            'export_config': best(lambda: io.export_config(strict_data=True)),
+            'import_config': best(lambda: io._import_config(raw))}  # noqa
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f'{"fields":>8} {"generate, us":>14} {"export_config, us":>18} {"import_config, us":>18}'
+          f'  ({PROFILES_COUNT} profiles, best of {repeats})')
+    for count in FIELDS_COUNTS:
+        result = bench(count, repeats)
+        print(f'{count:>8} {result["generate"]:>14.0f} {result["export_config"]:>18.0f} '
+              f'{result["import_config"]:>18.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -11,43 +11,61 @@
     note: "bug mypy" is not necessarily a bug, but that's what it's supposed to be
     note: "noqa" is mostly for silencing pycharm bugs or corrected side effects"""
 from copy import deepcopy
-from weakref import ref
+from weakref import ref, WeakValueDictionary
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import replace
 
 from ._config import ConfigSupport, Options
 from ._profiles import Profiles
 from ._io import IO
-from ._file import File
+from ._history import History
+from ._file import File, _fsync
+from ._sqlite import SQLiteFile  # noqa: F401 (registers file structure for database suffixes)
+from ._compressed import CompressedFile  # noqa: F401 (registers file structure for compressed)
+from ._formats import JSONFile, TOMLFile  # noqa: F401 (registers file structures for formats)
+from ._shards import ShardedFile  # noqa: F401 (registers file structure for 'file_shards' option)
+from ._shared import SharedFile
 
 from .types import path_t, Field
 from .utils import (init_reraise, get_attrs, check_type, check_items, check_types, safe, GetName,
                     is_dunder, with_type, is_exception)
 from .constants import DEFAULT_SECTION, DEFAULT_ID
-from .exceptions import InputError, CheckTypeError, FieldError
+from .exceptions import InputError, CheckTypeError, FieldError, FileError
 
 
-__all__ = ['ConfigBase', 'LanguageBase', 'Field', 'Options']
+__all__ = ['ConfigBase', 'LanguageBase', 'Field', 'Options', 'SharedFile']
 __version__ = "0.1.2"
 
 
+def _check_results(op: str, total: int, results: list):
+    """Raise FileError with all exceptions from results of several configs files operation"""
+    if errors := [str(x) for x in results if is_exception(x)]:
+        header = f'{op} of {len(errors)} from {total} configs failed:'
+        raise FileError('\n\t'.join((header, *errors)))
+
+
 class ConfigBase:
     """Config base
     Must be inherited with providing configuration fields"""
+    _configs: WeakValueDictionary = WeakValueDictionary()  # Common fixed class variable
     cfg: ConfigSupport
 
     @init_reraise('config', doc=True)
-    def __init__(self, path: path_t | None = None, *,
+    def __init__(self, path: path_t | SharedFile | None = None, *,
                  profiles: bool | None = None, io: bool | None = None, group: str | None = None,
                  default_section: str = DEFAULT_SECTION, options: Options | None = None,
-                 type_name: str = 'config'):
+                 type_name: str = 'config', history: int = 0):
         """
-        :arg path:              Current configuration file path to load from or save to
+        :arg path:              Current configuration file path to load from or save to,
+                                or shared file to store several configs without profiles
         :arg profiles:          Enable profiles support for current configuration
         :arg io:                Enable input/output operations for current configuration
         :arg group:             Group name for current configuration, if group changes needed
         :arg default_section:   Default section name for current configuration
         :arg options:           More precise behavior options for current configuration
         :arg type_name:         Internal current configuration type name for error message
+        :arg history:           Enable changes history (undo/redo) with max recorded changes count
         :raise InitError:       If something goes wrong"""
         _ = GetName(self, doc=True, full=True)
         _name, name = str(_.attrs.cls), str(_)  # noqa
@@ -72,6 +90,10 @@ class ConfigBase:
         if path is not None and not io:
             raise InputError('io', must_be=f'True or unfilled when {path=!r} provided')
 
+        # Check history size
+        if not isinstance(history, int) or isinstance(history, bool) or history < 0:
+            raise InputError('history', must_be='not negative int', received=with_type(history))
+
         # Get fields names with declared types and values, including multiple inherited configs
         attrs = get_attrs(self, 1, internal=True, dunder=True)  # dunder for merged __annotations__
         cfg_values = {k: v for k, v in attrs.items() if not is_dunder(k)}
@@ -121,7 +143,14 @@ class ConfigBase:
             self.cfg, cfg = cfg, ref(cfg)()
             self.cfg.profiles = Profiles(cfg, data, group) if profiles else None
             self.cfg.io = IO(cfg, data, fields) if io else None
-            self.cfg.file = File(cfg, path) if path is not None else None
+            if isinstance(path, SharedFile):
+                self.cfg.file = path._file_type(cfg, path)  # noqa
+            else:
+                self.cfg.file = File(cfg, path) if path is not None else None
+            self.cfg.history = History(cfg, data, history) if history else None
+
+        # Register inited config in live configs, it is removed at deletion by garbage collector
+        ConfigBase._configs[id(self)] = self
 
     def __del__(self):
         """Remove path from used at object deletion by garbage collector
@@ -129,6 +158,74 @@ class ConfigBase:
         if (cfg := getattr(self, 'cfg', None)) and (file := getattr(cfg, 'file', None)):
             file.__del__()
 
+    @staticmethod
+    def load_many(*configs: 'ConfigBase', workers: int | None = None):
+        """Load several configs from their files, as cfg.file.load() does for each config. Files are
+        read and imported in thread pool, imported data is applied in current thread. Threads only
+        overlap files reading (I/O waits), parsing and import are not scaled with cores, as they
+        hold GIL (for heavy import functions use import_config() with process pool workers)
+        :arg configs:       Configs with file paths
+        :arg workers:       Thread pool workers count (default - as for ThreadPoolExecutor)
+        :raise InputError:  If wrong arguments provided
+        :raise FileError:   If loading of any config failed (other configs are loaded anyway)"""
+        if wrong := [repr(x) for x in configs
+                     if not isinstance(x, ConfigBase) or getattr(x.cfg, 'file', None) is None]:
+            raise InputError('configs', func_name='ConfigBase.load_many()',
+                             must_be='configs with file paths', received=f': {", ".join(wrong)}')
+
+        # Fetch files data in pool threads, and apply fetched data to configs in current thread
+        files = [x.cfg.file for x in configs]
+        fetch = File._exc('Load from')(lambda file: file._fetch(None))  # noqa
+        apply = File._exc('Load from')(lambda file, fetched: file._apply(fetched))  # noqa
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(partial(safe, fetch), files))
+        _check_results('Loading', len(files), [x if is_exception(x) else safe(apply, file, x)
+                                               for file, x in zip(files, results)])
+
+    @staticmethod
+    def get_configs() -> list['ConfigBase']:
+        """Get all live configs (not deleted by garbage collector) in creation order"""
+        return list(ConfigBase._configs.values())
+
+    @staticmethod
+    def save_all(*, workers: int | None = None, strict_defaults=False, strict_data=False):
+        """Save all live configs with file paths, as cfg.file.save() does for each config. Configs
+        are exported in current thread, files are written concurrently in thread pool and flushed
+        to disk, with single flush of each files folder at the end. Threads only overlap files
+        writing (I/O waits), export is not scaled with cores. Configs with shared file are saved by
+        single shared file save, as SharedFile.save() does
+        :arg workers:           Thread pool workers count (default - as for ThreadPoolExecutor)
+        :arg strict_defaults:   Save all fields from default sections (not skip equal to factory)
+        :arg strict_data:       Save all fields from data sections (not skip equal to default)
+        :raise FileError:       If saving of any config failed (other configs are saved anyway)"""
+        files = [file for x in ConfigBase.get_configs() if (file := x.cfg.file) is not None]
+        total = len(files)
+        files = list(dict.fromkeys(getattr(x, 'store', x) for x in files))  # shared files once
+        prepare = File._exc('Save to')(  # noqa
+            lambda file: file._prepare(None, strict_defaults, strict_data))  # noqa
+        store = File._exc('Save to')(  # noqa
+            lambda file, prepared: (file._store(None, prepared), file._flush()))  # noqa
+
+        # Export configs in current thread, and write files in pool threads
+        prepared = [safe(prepare, x) for x in files]
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(lambda file, x: x if is_exception(x) else safe(store, file, x),
+                                    files, prepared))
+
+        # Flush folders entries of saved files, once for each folder
+        folders = {file.path.parent: file for file, x in zip(files, results) if not is_exception(x)}
+        flush = File._exc('Save to')(lambda file: _fsync(file.path.parent))  # noqa
+        _check_results('Saving', total, results + [safe(flush, x) for x in folders.values()])
+
+    @staticmethod
+    def reload_all(*, workers: int | None = None):
+        """Load all live configs with existing files, as load_many() does (threads overlap I/O only)
+        :arg workers:       Thread pool workers count (default - as for ThreadPoolExecutor)
+        :raise FileError:   If loading of any config failed (other configs are loaded anyway)"""
+        ConfigBase.load_many(*[x for x in ConfigBase.get_configs()
+                               if (file := x.cfg.file) is not None and file.path.exists()],
+                             workers=workers)
+
     def __repr__(self):
         """Class name in code"""
         return self.cfg._name  # noqa
@@ -140,8 +237,13 @@ class ConfigBase:
                               for k, field in self.cfg.get_fields.items())))
 
     def __eq__(self, other):
-        """Only fields compared! Profiles and any other functionalities are ignored!"""
+        """Only fields compared! Profiles and any other functionalities are ignored!
+        Fields values are not compared, if both configs have equal io.fingerprints data digests,
+        and they are exact (fields types are immutable), so float NaN values are equal then"""
         if issubclass(type(other), ConfigBase) and self.cfg.get_fields == other.cfg.get_fields:
+            fp, o_fp = (io._fingerprints if (io := x.cfg.io) else None for x in (self, other))  # noqa
+            if fp and o_fp and fp.exact and o_fp.exact and fp.data == o_fp.data:
+                return True
             return self.cfg.get_data == other.cfg.get_data
         return False
 
@@ -161,9 +263,11 @@ class ConfigBase:
                                  reason=f'it is fixed by {profiles.active!r} profile. '
                                         f'Available fields: {", ".join(profiles.active_fields)}')
 
-        # Get previous and set current value
+        # Get previous and set current value, notify if changed (or same object, changed in place)
         prev_value = getattr(self, key)
         object.__setattr__(self, key, value)
+        if prev_value is value or type(prev_value) is not type(value) or prev_value != value:
+            cfg._notify('set', key, prev_value, value)  # noqa
 
         # Run on_set handlers
         errors = []
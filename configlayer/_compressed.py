@@ -0,0 +1,121 @@
+"""Internal config layer compressed file support structure"""
+import os
+import bz2
+import gzip
+import lzma
+from typing import IO, Any, Callable, Iterator, Mapping
+from pathlib import Path
+from functools import partial
+from configparser import DuplicateSectionError
+
+from ._file import File, _LazySection, _SECTION_RE, _in_loop
+
+from .types import mb_holder_t, imported_t
+from .utils import as_holder
+from .exceptions import FileError
+
+
+# Compressed file openers by path suffix
+_OPENERS: dict[str, Callable[..., Any]] = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open,
+                                           '.lzma': lzma.open}
+
+
+class CompressedFile(File, suffixes=tuple(_OPENERS)):
+    """Compressed file optional structure
+    Used instead of ini file structure for paths with compression suffix. File data is compressed
+    at writing and decompressed at reading by streams, without whole decompressed data in memory"""
+    __slots__ = ()
+
+    def _open(self, path: Path, mode: str) -> IO[bytes]:
+        return _OPENERS[self.path.suffix.lower()](path, mode)
+
+    def _sections(self, file: IO[bytes]) -> Iterator[tuple[str | None, list[bytes]]]:
+        """Get decompressed file lines grouped by sections (text before first one has no name)"""
+        name: str | None = None
+        lines: list[bytes] = []
+        for line in file:
+            if match := _SECTION_RE.match(line):
+                if name is not None or lines:
+                    yield name, lines
+                name, lines = match[1].decode('utf-8'), []
+            lines.append(line)
+        if name is not None or lines:
+            yield name, lines
+
+    def _write(self, rendered: dict[str, bytes]):
+        """Write file atomically, by temp file replacing it"""
+        temp = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        try:
+            with self._open(temp, 'wb') as file:
+                file.writelines(rendered.values())
+            os.replace(temp, self.path)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+        self._stamp = self._get_stamp()
+
+    def _patch(self, rendered: dict[str, bytes], removed: set[str]):
+        """Rewrite file with changed sections, copying other ones (except removed) from old file
+        by stream"""
+        rendered = dict(rendered)
+        temp = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        try:
+            with self._open(self.path, 'rb') as src, self._open(temp, 'wb') as dst:
+                for name, lines in self._sections(src):
+                    if name in rendered:
+                        dst.write(rendered.pop(name))
+                    elif name not in removed:
+                        dst.writelines(lines)
+                dst.writelines(rendered.values())
+            os.replace(temp, self.path)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+        self._stamp = self._get_stamp()
+
+    def _lines(self, file: IO[bytes]) -> Iterator[str]:
+        """Get decoded lines of decompressed file, with forbidden default section check"""
+        hidden_default_sect = f'_{self._cfg.def_sect}'
+        for line in file:
+            if (match := _SECTION_RE.match(line)) and match[1].decode() == hidden_default_sect:
+                raise FileError(f'{hidden_default_sect!r} section is forbidden, but provided')
+            yield line.decode('utf-8')
+
+    def _decompress(self) -> dict[str, dict[str, str]]:
+        config = self._get_config()
+        with self._open(self.path, 'rb') as file:
+            config.read_file(self._lines(file), str(self.path))
+        return {k: dict(config[k]) for k in config.sections()}
+
+    def _select(self, sections: mb_holder_t[str]) -> dict[str, Mapping[str, str]]:
+        """Get sections of decompressed file by stream. Only sections needed for selected sections
+        import are kept and decoded at first access, other ones are skipped without decoding"""
+        cfg = self._cfg
+        hidden_default_sect = f'_{cfg.def_sect}'
+        selected: tuple[str, ...] = tuple(as_holder(sections))                                      # type: ignore[arg-type]
+        needed = {cfg.io._key_section, cfg.def_sect, cfg.name, *selected}  # noqa
+        raw: dict[str, Mapping[str, str]] = {}
+        line = 1
+        with self._open(self.path, 'rb') as file:
+            for name, lines in self._sections(file):
+                if name is None:
+                    data = b''.join(lines)
+                    self._decode(data, '', 0, len(data))
+                elif name == hidden_default_sect:
+                    raise FileError(f'{hidden_default_sect!r} section is forbidden, but provided')
+                elif name in raw:
+                    raise DuplicateSectionError(name, str(self.path), line)
+                elif name in needed:
+                    data = b''.join(lines)
+                    raw[name] = _LazySection(partial(self._decode, data, name, 0, len(data)))
+                else:
+                    raw[name] = {}  # never imported
+                line += len(lines)
+        return raw
+
+    def _read(self, sections: mb_holder_t[str] | None = None) -> tuple[imported_t, None]:
+        """Read and import decompressed file data without applying, see File._read(). Whole file
+        is parsed by stream, or only selected sections are kept and decoded at import"""
+        read = self._decompress if sections is None else partial(self._select, sections)
+        raw, self._stamp = self._read_stable(read)
+        return _in_loop(self._cfg.io._import_config, raw, sections), None  # noqa
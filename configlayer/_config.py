@@ -1,14 +1,16 @@
 """Internal config layer support structure"""
 from types import MappingProxyType
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 from functools import partial
+from contextlib import contextmanager
 
 from ._profiles import Profiles
-from ._io import IO
+from ._io import IO, Snapshot
 from ._file import File
+from ._history import History
 
 from .types import fields_t, on_set_t, Field
-from .utils import Locker, check_extra, check_types, set_slots_defaults, fmt_exc
+from .utils import Locker, check_extra, check_types, set_slots_defaults, fmt_exc, as_dict
 from .exceptions import OptionsCheckError, InputError
 
 
@@ -24,6 +26,10 @@ class Options:
     typecheck = True        # Check field data for type at each field set
     typecast = True         # Try to cast type if type check enabled and failed
     revert_fails = False    # Field value revert if on_set get some error
+    file_snapshot = False   # Keep imported file data (of builtin types) near it for fast full loads
+    file_lock = False       # Lock file by advisory inter-process lock at load and save (POSIX)
+    file_journal = False    # Append each change to journal near file, compacted to it in background
+    file_shards = False     # Store profiles in own files of path folder, load lazily, save changed
 
     def __post_init__(self):
         if msg := self._check():
@@ -52,11 +58,14 @@ class Options:
 class ConfigSupport(Locker):
     """Config support structure
     Holds a lot of functionality for config operations"""
-    __slots__ = ('__weakref__', '_data', '_fields', '_on_set', '_name',
-                 'name', 'type_name', 'def_sect', 'options', 'version', 'profiles', 'io', 'file')
+    __slots__ = ('__weakref__', '_data', '_fields', '_on_set', '_listeners', '_muted', '_name',
+                 'name', 'type_name', 'def_sect', 'options', 'version', 'profiles', 'io', 'file',
+                 'history')
     _data:      Any
     _fields:    dict[str, Field]
     _on_set:    dict[str, on_set_t]
+    _listeners: dict[str, Callable]
+    _muted:     int
     name:       str
     type_name:  str
     def_sect:   str
@@ -65,20 +74,23 @@ class ConfigSupport(Locker):
     profiles:   None | Profiles
     io:         None | IO
     file:       None | File
+    history:    None | History
 
     def __init__(self, data, fields, _name, name, default_section, options, type_name):
         self._data = data
         self._fields = fields
         self._on_set = {}
+        self._listeners = {}
+        self._muted = 0
         self._name = _name
         self.name = name
         self.type_name = type_name
         self.def_sect = default_section
         self.options = options
-        self.version = self.profiles = self.io = self.file = None
+        self.version = self.profiles = self.io = self.file = self.history = None
 
-        # Locks structure for changes with disabling attribute deletion
-        super().__init__(del_attr=False, name=str(self))
+        # Locks structure for changes with disabling attribute deletion and unlocked mute counter
+        super().__init__('_muted', del_attr=False, name=str(self))
 
     def __repr__(self):
         return f'{self._name}.cfg'  # noqa
@@ -109,6 +121,37 @@ class ConfigSupport(Locker):
         :arg name:  Handler name"""
         del self._on_set[name]
 
+    def _add_listener(self, name: str, func: Callable):
+        """Add internal config changes listener, called with operation name and its arguments:
+            'set', key, prev_value, value - field set (also default, if default profile active),
+                not notified if equal value of the same type set (but notified for the same object)
+            'defaults', {key: (prev_value, value)} - defaults set (also fields, if active)
+            'profile', name, prev_profile | None, profile - profile set (not default)
+            'switch', prev_name, name - active profile switch
+            'rename', new_name, old_name - profile rename
+            'delete', name, profile - profile deletion
+            'clear', profiles - all profiles deletion (after switch to default profile)
+            'import' - config data replaced by io.import_config()
+            'load' - config data replaced by file.load()"""
+        self._listeners[name] = func
+
+    def _del_listener(self, name: str):
+        self._listeners.pop(name, None)
+
+    def _notify(self, op: str, *args):
+        if self._listeners and not self._muted:
+            for func in tuple(self._listeners.values()):
+                func(op, *args)
+
+    @contextmanager
+    def _mute(self):
+        """Skip listeners calls for compound operations (which are notified as a whole)"""
+        self._muted += 1
+        try:
+            yield
+        finally:
+            self._muted -= 1
+
     @property
     def get_on_set(self) -> MappingProxyType[str, on_set_t]:
         """Get exists on_set handlers as a dict view"""
@@ -177,7 +220,12 @@ class ConfigSupport(Locker):
         :arg typecast:      Data types cast (if check failed)
         :raise InputError:  If wrong arguments provided"""
         input_exc = (f'{self!r}.set_fields()', 'fields')
-        self._set_fields(self._check_fields(input_exc, fields, typecheck, typecast))
+        fields = self._check_fields(input_exc, fields, typecheck, typecast)
+        if self.history:
+            with self.history.batch():  # single undo step
+                self._set_fields(fields)
+        else:
+            self._set_fields(fields)
         if self.profiles:
             self.profiles.update()
 
@@ -189,6 +237,101 @@ class ConfigSupport(Locker):
         :raise InputError:  If wrong arguments provided"""
         input_exc = (f'{self!r}.set_defaults()', 'fields')
         fields = self._check_fields(input_exc, fields, typecheck, typecast)
-        if self.profiles and self.profiles.active == self.def_sect:
-            self._set_fields(fields)
-        self._set_defaults(fields)
+        prev = self.get_defaults
+        with self._mute():
+            if self.profiles and self.profiles.active == self.def_sect:
+                self._set_fields(fields)
+            self._set_defaults(fields)
+        if changed := {k: (prev[k], v) for k, v in fields.items() if prev[k] is not v}:
+            self._notify('defaults', changed)
+
+    def iter_diff(self, target: Any) -> Iterator[tuple[str, str | None, str | None, Any, Any]]:
+        """Get differences from target to the config lazily, profile by profile. Configs profiles
+        with equal digests are skipped without comparison, if both configs have exact fingerprints
+        :arg target:        Other config with the same fields, profile name (or default section
+                            name) to compare with current fields, or io.snapshot() of the config
+        :return:            Iterator of changes: kind, profile name, field name, target and config
+                            values. Kinds: 'active' (profile names), 'renamed' (names, snapshot
+                            only), 'removed' and 'added' (profiles fields, with changed active
+                            fields too), 'defaults', 'fields' and 'profiles' (field values)
+        :raise InputError:  If wrong arguments provided"""
+        ie = (f'{self!r}.iter_diff()', 'target')
+        if isinstance(target, Snapshot):
+            if self.io is None:
+                raise fmt_exc(ie, 'Snapshot is provided, but I/O is disabled')
+            yield from self.io._iter_diff(target)  # noqa
+        elif isinstance(target, str):
+            yield from self._iter_diff_profile(target, ie)
+        elif isinstance(other := getattr(target, 'cfg', None), ConfigSupport):
+            if tuple(other.get_fields) != tuple(self._fields):
+                raise fmt_exc(ie, f'Fields of {other.name!r} config are not equal')
+            yield from self._iter_diff_config(other)
+        else:
+            raise fmt_exc(ie, must_be='config, profile name or snapshot', received=repr(target))
+
+    def _iter_diff_profile(self, name: str, ie: tuple):
+        profiles = self.profiles
+        if name == self.def_sect:
+            prev = self.get_defaults
+        elif profiles and name in profiles:
+            prev = as_dict(profiles[name], self._fields)
+        else:
+            raise fmt_exc(ie, f'Profile {name!r} is not exists')
+        data = self.get_data
+        yield from (('fields', None, k, v, data[k]) for k, v in prev.items() if v != data[k])
+
+    def _iter_diff_config(self, other: 'ConfigSupport'):
+        fields = self._fields
+        fp, o_fp = (io._fingerprints if (io := x.io) else None for x in (self, other))  # noqa
+        fps = (fp, o_fp) if fp and o_fp and fp.exact and o_fp.exact else None
+
+        def changed(kind: str, name: str | None, prev: fields_t, curr: fields_t):
+            yield from ((kind, name, k, v, curr[k]) for k, v in prev.items() if v != curr[k])
+
+        # Active profile, defaults and current fields
+        profiles, o_profiles = self.profiles, other.profiles
+        active, o_active = (x.active if x else None for x in (profiles, o_profiles))
+        if active != o_active:
+            yield 'active', None, None, o_active, active
+        if not fps or fps[0].section(self.def_sect) != fps[1].section(other.def_sect):
+            yield from changed('defaults', None, other.get_defaults, self.get_defaults)
+        if not fps or fps[0].data != fps[1].data:
+            yield from changed('fields', None, other.get_data, self.get_data)
+
+        # Profiles, only with different digests (if both configs have exact fingerprints)
+        curr, prev = (x.get if x else {} for x in (profiles, o_profiles))
+        if fps and curr and prev:
+            names = fps[0].diff_profiles(fps[1])
+        else:
+            names = list(dict.fromkeys((*prev, *curr)))
+        for name in names:
+            p, c = (as_dict(x[name], fields) if name in x else None for x in (prev, curr))
+            if p is not None and (c is None or p.keys() != c.keys()):
+                yield 'removed', name, None, p, None
+            if c is not None and (p is None or p.keys() != c.keys()):
+                yield 'added', name, None, None, c
+            elif c is not None and p is not None:
+                yield from changed('profiles', name, p, c)
+
+    def diff(self, target: Any) -> dict[str, Any]:
+        """Get differences from target to the config, see iter_diff()
+        :arg target:        Other config with the same fields, profile name or snapshot
+        :return:            Only not empty items of: 'active' (target and config profile names),
+                            'renamed' (old and new profiles names), 'removed' and 'added' (profiles
+                            fields), 'defaults' and 'fields' ({field: (target value, value)}),
+                            'profiles' ({profile: {field: (target value, value)}})
+        :raise InputError:  If wrong arguments provided"""
+        result: dict[str, Any] = {}
+        for kind, name, key, prev, curr in self.iter_diff(target):
+            match kind:
+                case 'active':
+                    result[kind] = (prev, curr)
+                case 'renamed':
+                    result.setdefault(kind, []).append((prev, curr))
+                case 'removed' | 'added':
+                    result.setdefault(kind, {})[name] = curr if kind == 'added' else prev
+                case 'defaults' | 'fields':
+                    result.setdefault(kind, {})[key] = (prev, curr)
+                case 'profiles':
+                    result.setdefault(kind, {}).setdefault(name, {})[key] = (prev, curr)
+        return result
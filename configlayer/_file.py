@@ -1,39 +1,198 @@
 """Internal config layer file support structure"""
+import os
+import re
+import marshal
+import asyncio
+from threading import Thread, RLock
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from concurrent.futures import Future
+from mmap import mmap, ACCESS_READ
+from typing import Any, Callable, Iterator, Mapping
 from pathlib import Path
-from configparser import ConfigParser
+from hashlib import blake2b
+from inspect import iscoroutinefunction
+from functools import partial
+from configparser import ConfigParser, DuplicateSectionError
 
-from .utils import Locker
-from .types import path_t, mb_holder_t
+from ._journal import Journal
+
+from .utils import Locker, safe, as_dict, as_holder
+from .types import path_t, mb_holder_t, fields_t, imported_t
 from .exceptions import InitError, FileError
 
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None        # type: ignore[assignment]
+
+
+# Section header line prefix, as ConfigParser matches it (up to the last bracket in line)
+_SECTION_RE = re.compile(rb'^\[(.+)\]', re.MULTILINE)
+
+# File reading attempts, if it is changed during reading (by writers ignoring locks)
+_READ_ATTEMPTS = 3
+
+# Journal size in bytes, after which it is compacted into file
+_JOURNAL_LIMIT = 1 << 20
+
+# Event loop of aload() call in its executor thread, where config state is not used
+_LOOP: ContextVar[asyncio.AbstractEventLoop | None] = ContextVar('_LOOP', default=None)
+
+
+@contextmanager
+def _flocked(path: Path, exclusive: bool):
+    """Hold shared or exclusive advisory lock of provided lock file path"""
+    if fcntl is None:
+        raise FileError("Option 'file_lock' is not supported on this platform")
+    with path.open('a') as lock:  # lock file is not truncated and never deleted
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def _in_loop(func: Callable, *args, **kwargs):
+    """Call function, which uses config state (not thread safe), in event loop thread of aload()
+    if file is read in its executor, else in current thread"""
+    if (loop := _LOOP.get()) is None:
+        return func(*args, **kwargs)
+    future: Future = Future()
+
+    def call():
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
+    loop.call_soon_threadsafe(call)
+    return future.result()
+
+
+def _scan(data: mmap | memoryview | bytes, path: Path) -> dict[str, tuple[int, int]]:
+    """Get sections spans (from header to the next one or to the end) in file data"""
+    index: dict[str, tuple[int, int]] = {}
+    prev = None
+    for match in _SECTION_RE.finditer(data):
+        if prev is not None:
+            index[prev[0]] = (prev[1], match.start())
+        if (name := match[1].decode('utf-8')) in index or prev and name == prev[0]:
+            line = bytes(data[:match.start()]).count(b'\n') + 1
+            raise DuplicateSectionError(name, str(path), line)
+        prev = (name, match.start())
+    if prev is not None:
+        index[prev[0]] = (prev[1], len(data))
+    return index
+
+
+def _fsync(path: Path):
+    """Flush file data or folder entries to disk (folders are not flushed on Windows)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except PermissionError:  # Windows folder
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _LazySection(Mapping):
+    """Section raw fields, decoded from file data at first access"""
+    __slots__ = ('_decode', '_items')
+
+    def __init__(self, decode: Callable[[], dict[str, str]]):
+        self._decode: Callable[[], dict[str, str]] | None = decode
+        self._items: dict[str, str] | None = None
+
+    def _get(self) -> dict[str, str]:
+        if self._items is None:
+            # note mypy: decode is removed only after items are filled
+            self._items, self._decode = self._decode(), None                                        # type: ignore[misc]
+        return self._items
+
+    def __getitem__(self, key) -> str:
+        return self._get()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get())
+
+    def __len__(self) -> int:
+        return len(self._get())
+
 
 class File(Locker):
     """File optional structure
     Used in config support structure if file path provided, for local storage of configs"""
-    __slots__ = ('_cfg', 'path')
+    __slots__ = ('_cfg', '_index', '_stamp', '_removed', '_journal', '_compactor', '_generation',
+                 '_lock', '_asaves', '_awriting', 'path')
     _used_paths: dict = dict()    # Common fixed class variable (dict methods only)
+    _suffixes: dict = dict()      # Common fixed class variable (dict methods only)
+    _options: dict = dict()       # Common fixed class variable (dict methods only)
+    _native: Callable[[Any], bool] | None = None  # Class constant (values stored natively)
+    _index: dict[str, tuple[int, int]]
+    _stamp: tuple[int, int, int] | None
+    _removed: set[str] | None
+    _journal: Journal | None
+    _compactor: Thread | None
+    _generation: int
+    _lock: RLock
+    _asaves: dict[tuple, asyncio.Future]
+    _awriting: asyncio.Future | None
     path: Path
 
+    def __init_subclass__(cls, suffixes: tuple[str, ...] = (), option: str | None = None,
+                          **kwargs):
+        """Register file structure subclass, used for paths with provided suffixes or for configs
+        with enabled option"""
+        super().__init_subclass__(**kwargs)
+        File._suffixes.update(dict.fromkeys(suffixes, cls))
+        if option is not None:
+            File._options[option] = cls
+
+    def __new__(cls, cfg, path: path_t):
+        if cls is File:
+            # Structure is selected by option or path suffix
+            cls = (next((v for k, v in File._options.items() if getattr(cfg.options, k)), None)
+                   or File._suffixes.get(Path(path).suffix.lower(), File))
+        return super().__new__(cls)
+
     def __init__(self, cfg, path: path_t):
         self._cfg = cfg
         if (path := Path(path)) in self._used_paths:
             raise InitError(f'Path "{path}" is already used in {self._used_paths[path]!r} config')
 
         self.path = path
+        self._index, self._stamp, self._removed, self._journal = {}, None, set(), None
+        self._compactor, self._generation, self._lock = None, 0, RLock()
+        self._asaves, self._awriting = {}, None
+        journal = Journal(self.journal_path) if cfg.options.file_journal else None
         if path.exists():
+            self._journal = journal
             self.load()
         else:
             self.save()     # Create "empty" file for path correctness check, folder is not created
-            path.unlink()   # Remove "empty" file
+            self._unlink()  # Remove "empty" file
+            self._journal = journal
+            if journal is not None:
+                with cfg._mute():
+                    self._replay(journal.read())
         self._used_paths[path] = cfg.name
+        cfg._add_listener('file', self._on_change)
 
-        # Locks structure for changes with disabling attribute deletion
-        super().__init__(del_attr=False)
+        # Locks structure for changes with disabling attribute deletion and unlocked index
+        super().__init__('_index', '_stamp', '_removed', '_compactor', '_generation', '_awriting',
+                         del_attr=False)
 
     def __del__(self):
-        """Remove path from used at config deletion"""
+        """Remove path from used and close journal at config deletion"""
         if hasattr(self, 'path'):
             self._used_paths.pop(self.path, None)
+        if (journal := getattr(self, '_journal', None)) is not None:
+            journal.close()
 
     def __repr__(self):
         return f'{self._cfg!r}.file'
@@ -44,6 +203,19 @@ class File(Locker):
     @staticmethod
     def _exc(op):
         def init_wrapper(func):
+            if iscoroutinefunction(func):
+                async def async_method_wrapper(self, *args, **kwargs):
+                    try:
+                        return await func(self, *args, **kwargs)
+                    except FileNotFoundError as e:
+                        msg = e.args[1]
+                    except FileError as e:
+                        msg = e
+                    except Exception as e:
+                        raise FileError(f'{op} "{self.path}" failed. {e!r}') from e
+                    raise FileError(f'{op} "{self.path}" failed. {msg}')
+                return async_method_wrapper
+
             def method_wrapper(self, *args, **kwargs):
                 try:
                     return func(self, *args, **kwargs)
@@ -62,20 +234,416 @@ class File(Locker):
         config.optionxform = str
         return config
 
+    def _read_stable(self, read: Callable[[], Any]) -> tuple[Any, tuple[int, int, int]]:
+        """Call file reading function, until file is not changed during it
+        :return:    Reading result and file stamp"""
+        for _ in range(_READ_ATTEMPTS):
+            stamp = self._get_stamp()
+            result = read()
+            if self._get_stamp() == stamp:
+                return result, stamp
+        raise FileError(f'File is changed during each of {_READ_ATTEMPTS} reading attempts')
+
+    def _unlink(self):
+        self.path.unlink()
+
+    def _flush(self):
+        """Flush saved file to disk (its folder entry is flushed separately)"""
+        _fsync(self.path)
+
+    def _get_stamp(self) -> tuple[int, int, int]:
+        stat = os.stat(self.path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @property
+    def lock_path(self) -> Path:
+        """Get inter-process lock file path, used if 'file_lock' option enabled"""
+        return self.path.with_name(f'{self.path.name}.lock')
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold thread lock and shared (for readers) or exclusive (for writers) advisory lock,
+        if enabled"""
+        with self._lock:
+            if not self._cfg.options.file_lock:
+                yield
+                return
+            with _flocked(self.lock_path, exclusive):
+                yield
+
+    @property
+    def journal_path(self) -> Path:
+        """Get changes journal path, used if 'file_journal' option enabled"""
+        return self.path.with_name(f'{self.path.name}.journal')
+
+    def _on_change(self, op: str, *args):
+        """Track removed profiles (their sections are removed from file at save of selected
+        sections) and append config change to journal, if enabled"""
+        cfg = self._cfg
+        self._track(op, *args)
+        if not cfg.options.file_journal or op == 'load' or self._journal is None:
+            return
+        if op == 'import':
+            return self.compact()
+
+        fields = cfg.get_fields
+        export = cfg.io._export_field  # noqa
+        match op:
+            case 'set':
+                section = cfg.profiles.active if cfg.profiles else cfg.name
+                record: tuple = (op, section, args[0], export(fields[args[0]], args[2], True))
+            case 'defaults':
+                record = (op, {k: export(fields[k], v, True) for k, (_, v) in args[0].items()})
+            case 'profile':
+                profile = as_dict(args[2], fields)
+                record = (op, args[0], {k: export(fields[k], v, True) for k, v in profile.items()})
+            case 'switch':
+                record = (op, args[1])
+            case 'delete':
+                record = (op, args[0])
+            case _:  # 'rename' and 'clear'
+                record = (op, *args[:2]) if op == 'rename' else (op,)
+        if self._journal.append(record) > _JOURNAL_LIMIT:
+            self.compact()
+
+    def _track(self, op: str, *args):
+        """Track removed profiles names, or all not existing sections (if config is imported)"""
+        if op == 'load':
+            self._removed = set()
+        elif op == 'import':
+            self._removed = None
+        elif (removed := self._removed) is not None:
+            match op:
+                case 'profile':
+                    removed.discard(args[0])
+                case 'rename':
+                    removed.discard(args[0])
+                    removed.add(args[1])
+                case 'delete':
+                    removed.add(args[0])
+                case 'clear':
+                    removed.update(args[0])
+
+    def _replay(self, records: list[tuple]):
+        """Apply journal records to config"""
+        cfg = self._cfg
+        data, io, profiles = cfg._data, cfg.io, cfg.profiles  # noqa
+        for i, (op, *args) in enumerate(records, 1):
+            try:
+                match op:
+                    case 'set':
+                        setattr(data, args[1], io.import_field(args[1], args[2]))
+                    case 'defaults':
+                        cfg.set_defaults(io.import_section(args[0]), typecheck=False)
+                    case 'profile':
+                        profiles.set(args[0], io.import_section(args[1]), defaults=False,
+                                     typecheck=False)
+                    case 'switch':
+                        next(profiles._switch(args[0], False, False))  # noqa
+                    case 'rename':
+                        next(profiles._rename(*args))  # noqa
+                    case 'delete':
+                        del profiles[args[0]]
+                    case 'clear':
+                        profiles.clear()
+                    case _:
+                        raise ValueError(f'Unknown operation {op!r}')
+            except Exception as e:
+                raise FileError(f'Journal "{self.journal_path}" record {i} replay failed: '
+                                f'{e!r}') from e
+
+    def _compact(self, rendered: dict[str, bytes], journal_size: int, generation: int):
+        """Write config exported at compact() and trim journal records before export, skipped if
+        file is written since export (by save or other compaction)"""
+        with self._locked(True):
+            if self._generation != generation:
+                return
+            self._write(rendered)
+            self._generation += 1
+            if self._journal is not None:
+                self._journal.trim(journal_size)
+
+    def compact(self, wait=False):
+        """Save whole config to file in background thread and remove saved changes from journal
+        Config is exported at call, compaction is skipped if previous one is not finished yet
+        :arg wait:              Wait for the end of file writing
+        :raise IOExportError:   If errors during export_config"""
+        if (compactor := self._compactor) is None or not compactor.is_alive():
+            journal_size = self._journal.size if self._journal else 0
+            rendered = self._render(self._cfg.io.export_config(native=self._native))
+            self._compactor = compactor = Thread(target=self._compact, daemon=False,
+                                                 args=(rendered, journal_size, self._generation))
+            compactor.start()
+        if wait:
+            compactor.join()
+
+    @staticmethod
+    def _map(file) -> mmap | memoryview:
+        """Get memory-mapped file data (empty file cannot be mapped)"""
+        if os.fstat(file.fileno()).st_size:
+            return mmap(file.fileno(), 0, access=ACCESS_READ)
+        return memoryview(b'')
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Get binary snapshot path, used if 'file_snapshot' option enabled"""
+        return self.path.with_name(f'{self.path.name}.snapshot')
+
+    def _snapshot_key(self) -> tuple[bytes, bytes]:
+        """Get snapshot key by config schema and factory defaults (imported data contains them)"""
+        cfg = self._cfg
+        fields, canonical = cfg.get_fields, cfg.io._canonical_field  # noqa
+        defaults = repr(tuple((k, canonical(fields[k], v))
+                              for k, v in cfg.get_factory_defaults.items()))
+        return cfg.io.schema, blake2b(defaults.encode()).digest()
+
+    def _read_snapshot(self, key: tuple[bytes, bytes], stamp: tuple[int, int, int],
+                       data: mmap | memoryview) -> tuple[Any, tuple | None]:
+        """Get snapshot sections index and imported data, if snapshot is valid for config and file.
+        Snapshot header is checked before data deserialization, file data is hashed only if file
+        stamp is changed since snapshot writing
+        :return:    Snapshot data (or None if not valid) and header to write (if it is changed)"""
+        digest = None
+        try:
+            with self.snapshot_path.open('rb') as file:
+                snapshot_key, snapshot_stamp, snapshot_digest = marshal.load(file)
+                if snapshot_key == key:
+                    if snapshot_stamp == stamp:
+                        return marshal.load(file), None
+                    if (digest := blake2b(data).digest()) == snapshot_digest:
+                        return marshal.load(file), (key, stamp, digest)
+        except Exception:
+            pass
+        return None, (key, stamp, digest or blake2b(data).digest())
+
+    def _write_snapshot(self, header: tuple, snapshot: tuple[dict, imported_t]):
+        """Write snapshot header and data, only if data is marshallable (of builtin types)"""
+        path = self.snapshot_path
+        temp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        try:
+            with temp.open('wb') as file:
+                marshal.dump(header, file)
+                marshal.dump(snapshot, file)
+            os.replace(temp, path)
+        except Exception:   # Not marshallable data, no access, etc. - next load will use file
+            safe(temp.unlink, missing_ok=True)
+            safe(path.unlink, missing_ok=True)
+
+    def _decode(self, data: mmap | memoryview | bytes, name: str, begin: int, end: int
+                ) -> dict[str, str]:
+        config = self._get_config()
+        config.read_string(bytes(data[begin:end]).decode('utf-8'), str(self.path))
+        return dict(config[name]) if name else {}
+
+    def _render(self, raw_config: dict[str, fields_t[str]]) -> dict[str, bytes]:
+        """Get file bytes of each section, as ConfigParser writes it (multiline values are
+        written with indented continuation lines)"""
+        rendered = {}
+        for name, raw_section in raw_config.items():
+            lines = [f'[{name}]']
+            lines += [f'{k} = ' + str(v).replace('\n', '\n\t') for k, v in raw_section.items()]
+            rendered[name] = '\n'.join(lines + ['', '']).replace('\n', os.linesep).encode('utf-8')
+        return rendered
+
+    def _write(self, rendered: dict[str, bytes]):
+        """Write file atomically, by temp file replacing it"""
+        temp = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        try:
+            with temp.open('wb') as file:
+                file.write(b''.join(rendered.values()))
+            os.replace(temp, self.path)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+        pos, self._index = 0, {}
+        for name, data in rendered.items():
+            self._index[name] = (pos, pos := pos + len(data))
+        self._stamp = self._get_stamp()
+
+    def _patch(self, rendered: dict[str, bytes], removed: set[str]):
+        """Rewrite changed sections only. Same sized are rewritten in place, others - from the
+        first of them to the end of file, with copying of unchanged sections verbatim. Removed
+        sections are dropped as resized to nothing"""
+        with self.path.open('r+b') as file:
+            index = self._index
+            if self._stamp != self._get_stamp():
+                with self._map(file) as mapped:
+                    index = _scan(mapped, self.path)
+
+            # Skip sections equal to file data
+            dropped = {k for k in removed if k in index and k not in rendered}
+            changed = dict.fromkeys(dropped, b'')
+            for name, data in rendered.items():
+                if span := index.get(name):
+                    file.seek(span[0])
+                    if file.read(span[1] - span[0]) == data:
+                        continue
+                changed[name] = data
+
+            # Rewrite in place all changed sections before the first resized one
+            size = file.seek(0, os.SEEK_END)
+            start = min((index[k][0] for k, v in changed.items()
+                         if k in index and len(v) != index[k][1] - index[k][0]), default=size)
+            for name, data in changed.items():
+                if (span := index.get(name)) and span[0] < start:
+                    file.seek(span[0])
+                    file.write(data)
+
+            # Rewrite file tail with changed and new sections
+            file.seek(start)
+            tail = file.read()
+            new_index = {k: v for k, v in index.items() if v[0] < start}
+            chunks, pos = [], start
+            for name, (begin, end) in sorted(index.items(), key=lambda x: x[1]):
+                if begin >= start and name not in dropped:
+                    data = changed[name] if name in changed else tail[begin - start:end - start]
+                    chunks.append(data)
+                    new_index[name] = (pos, pos := pos + len(data))
+            for name, data in changed.items():
+                if name not in index:
+                    chunks.append(data)
+                    new_index[name] = (pos, pos := pos + len(data))
+            if chunks or start < size:
+                file.seek(start)
+                file.write(b''.join(chunks))
+                file.truncate()
+        self._index = new_index
+        self._stamp = self._get_stamp()
+
     @_exc('Save to')
     def save(self, sections: mb_holder_t[str] | None = None, *,
              strict_defaults=False, strict_data=False):
         """Save config to file (or only selected sections, excepting internal)
+        Selected sections are patched in the exists file, other sections are kept as is
         :arg sections:          Selected section name(s) or all (if not provided)
         :arg strict_defaults:   Save all fields from default section (not skip equal to factory)
         :arg strict_data:       Save all fields from data sections (not skip equal to default)
         :raise InputError:      If wrong arguments provided
         :raise IOExportError:   If errors during export_config"""
-        config = self._get_config()
-        config.read_dict(self._cfg.io.export_config(sections, strict_defaults=strict_defaults,
-                                                    strict_data=strict_data, typecast=True))
-        with self.path.open('w', encoding='utf-8') as file:
-            config.write(file)
+        self._store(sections, self._prepare(sections, strict_defaults, strict_data))
+
+    def _prepare(self, sections: mb_holder_t[str] | None, strict_defaults: bool, strict_data: bool):
+        """Get data to store at save with taken removed profiles, all sections are exported if
+        config is imported since last save (config is exported, not thread safe)"""
+        taken, self._removed = self._removed, set()
+        try:
+            return self._render(self._cfg.io.export_config(
+                None if taken is None else sections, strict_defaults=strict_defaults,
+                strict_data=strict_data, typecast=True, native=self._native)), taken
+        except BaseException:
+            self._restore(taken)
+            raise
+
+    def _restore(self, taken: set[str] | None):
+        """Return taken removed profiles back (if they are not added again), if saving failed"""
+        if taken is None or (removed := self._removed) is None:
+            self._removed = None
+        else:
+            removed.update(k for k in taken if k not in self._cfg.profiles)
+
+    def _store(self, sections: mb_holder_t[str] | None, prepared):
+        """Store prepared data at save (file is written, thread safe)"""
+        rendered, removed = prepared
+        try:
+            with self._locked(True):
+                if sections is None or removed is None or not self.path.exists():
+                    self._write(rendered)
+                    if self._journal is not None:
+                        self._journal.trim()
+                else:
+                    self._patch(rendered, removed)
+                self._generation += 1
+        except BaseException:
+            self._restore(removed)
+            raise
+
+    @_exc('Save to')
+    async def asave(self, sections: mb_holder_t[str] | None = None, *,
+                    strict_defaults=False, strict_data=False):
+        """Save config to file as save() does, but file is written in default executor of running
+        event loop. Config is exported at the start of writing, so saves with the same arguments,
+        called while previous save is not finished, are coalesced into one save
+        :arg sections:          Selected section name(s) or all (if not provided)
+        :arg strict_defaults:   Save all fields from default section (not skip equal to factory)
+        :arg strict_data:       Save all fields from data sections (not skip equal to default)
+        :raise InputError:      If wrong arguments provided
+        :raise IOExportError:   If errors during export_config"""
+        key: tuple = (sections if sections is None else tuple(as_holder(sections)),                 # type: ignore[arg-type]
+                      strict_defaults, strict_data)
+        if (future := self._asaves.get(key)) is not None:
+            return await asyncio.shield(future)
+
+        # Wait for the previous save, and export config in event loop thread at the start of writing
+        loop = asyncio.get_running_loop()
+        self._asaves[key] = future = loop.create_future()
+        prev, self._awriting = self._awriting, future
+        try:
+            if prev is not None:
+                await asyncio.wait((prev,))
+            del self._asaves[key]
+            prepared = self._prepare(sections, strict_defaults, strict_data)
+            await loop.run_in_executor(None, self._store, sections, prepared)
+        except BaseException as e:
+            if self._asaves.get(key) is future:
+                del self._asaves[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # retrieved, it is raised there and in coalesced saves
+            raise
+        else:
+            future.set_result(None)
+        finally:
+            if self._awriting is future:
+                self._awriting = None
+
+    def _read(self, sections: mb_holder_t[str] | None = None
+              ) -> tuple[imported_t, tuple[tuple, tuple[dict, imported_t]] | None]:
+        """Read and import file data without applying. File state is checked after reading,
+        so data changed by writer at reading is never returned
+        :return:    Imported data, and snapshot header with data (if enabled and changed)"""
+        io = self._cfg.io
+        hidden_default_sect = f'_{self._cfg.def_sect}'
+        options = self._cfg.options
+        key = _in_loop(self._snapshot_key) if sections is None and options.file_snapshot else None
+        for _ in range(_READ_ATTEMPTS):
+            stamp = self._get_stamp()
+
+            # Map file data, and get valid snapshot of its sections index and imported data
+            with self.path.open('rb') as file, self._map(file) as data:
+                snapshot, header = self._read_snapshot(key, stamp, data) if key else (None, None)
+                if snapshot is not None:
+                    index, imported = snapshot
+                else:
+                    # Index sections headers. Whole file is parsed at once, or only selected
+                    # sections are decoded at import
+                    index = _scan(data, self.path)
+                    raw: dict[str, Mapping[str, str]]
+                    if sections is None:
+                        config = self._get_config()
+                        config.read_string(bytes(data).decode('utf-8'), str(self.path))
+                        raw = {k: dict(config[k]) for k in config.sections()}
+                        if hidden_default_sect in index:
+                            raw[hidden_default_sect] = dict(config.defaults())
+                    else:
+                        self._decode(data, '', 0, min((x[0] for x in index.values()),
+                                                      default=len(data)))
+                        raw = {k: _LazySection(partial(self._decode, data, k, *v))
+                               for k, v in index.items()}
+
+                    # Raise an error if real default section provided (not used due to internal
+                    # section impact), else import config
+                    if (wrong := raw.pop(hidden_default_sect, None)) is not None:
+                        details = f'. Data: {dict(wrong)}' if wrong else ''
+                        raise FileError(f'{hidden_default_sect!r} section is forbidden, '
+                                        f'but provided{details}')
+                    imported = _in_loop(io._import_config, raw, sections)  # noqa
+
+            if self._get_stamp() == stamp:
+                self._index, self._stamp = index, stamp
+                return imported, (header, (index, imported)) if header else None
+        raise FileError(f'File is changed during each of {_READ_ATTEMPTS} reading attempts')
 
     @_exc('Load from')
     def load(self, sections: mb_holder_t[str] | None = None):
@@ -84,22 +652,36 @@ class File(Locker):
         :raise InputError:      If wrong arguments provided
         :raise IOImportError:   If errors during import_config
         :raise FileError:       If file contains forbidden default section"""
-        config = self._get_config()
-        hidden_default_sect = f'_{self._cfg.def_sect}'
+        self._apply(self._fetch(sections))
+
+    def _fetch(self, sections: mb_holder_t[str] | None):
+        """Get data to apply at load (file is read and imported, thread safe)"""
+        journal = sections is None and self._cfg.options.file_journal and self._journal
+        with self._locked(False):
+            imported, snapshot = self._read(sections)
+            records = journal.read() if journal else []
+        if snapshot:
+            self._write_snapshot(*snapshot)
+        return imported, records
+
+    def _apply(self, fetched):
+        """Apply fetched data at load (config is changed, not thread safe)"""
+        cfg = self._cfg
+        imported, records = fetched
+        with cfg._mute():
+            cfg.io._apply_config(imported)  # noqa
+            self._replay(records)
+        cfg._notify('load')
 
-        # Raw check for provided real default section (not used due to internal section impact)
-        error = False
-        with self.path.open('r', encoding='utf-8') as file:
-            config.read_file(file)
-            file.seek(0)
-            for line in file.readlines():
-                if line.startswith(f'[{hidden_default_sect}]'):
-                    error = True
-                    break
-
-        # Process data as dicts and raise an error if real default section provided
-        data = {k: dict(v) for k, v in config.items()}
-        if (wrong := data.pop(hidden_default_sect)) or error:
-            details = f'. Data: {wrong}' if wrong else ''
-            raise FileError(f'{hidden_default_sect!r} section is forbidden, but provided{details}')
-        self._cfg.io.import_config(data, sections)
+    @_exc('Load from')
+    async def aload(self, sections: mb_holder_t[str] | None = None):
+        """Load config from file as load() does, but file is read in default executor of running
+        event loop, and imported and applied to config in event loop thread
+        :arg sections:          Selected section name(s) or all (if not provided)
+        :raise InputError:      If wrong arguments provided
+        :raise IOImportError:   If errors during import_config
+        :raise FileError:       If file contains forbidden default section"""
+        loop = asyncio.get_running_loop()
+        context = copy_context()
+        context.run(_LOOP.set, loop)
+        self._apply(await loop.run_in_executor(None, context.run, self._fetch, sections))
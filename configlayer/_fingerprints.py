@@ -0,0 +1,232 @@
+"""Internal config layer incremental fingerprints support structure"""
+from hashlib import blake2b
+from pathlib import PurePath
+from typing import Any, Mapping, Callable
+
+from .types import Field
+from .utils import Locker, as_dict, fmt_exc
+
+
+# Digest size in bytes
+_DIGEST_SIZE = 16
+
+# Profiles tree depth in bits of profile name hash (leaves count is 2 ** depth)
+_TREE_DEPTH = 16
+
+# Field types, which values cannot be changed in place (without config change notification)
+_IMMUTABLE = (bool, int, float, complex, str, bytes, frozenset, PurePath)
+
+
+def _digest(*parts: str) -> int:
+    data = '\0'.join(parts).encode('utf-8')
+    return int.from_bytes(blake2b(data, digest_size=_DIGEST_SIZE).digest(), 'big')
+
+
+def _bucket(name: str) -> int:
+    data = blake2b(name.encode('utf-8'), digest_size=_TREE_DEPTH // 8).digest()
+    return int.from_bytes(data, 'big')
+
+
+def _bytes(digest: int) -> bytes:
+    return digest.to_bytes(_DIGEST_SIZE, 'big')
+
+
+class Fingerprints(Locker):
+    """Incremental fingerprints optional structure
+    Created by io.fingerprints at first access, then updated by config changes. Field digest is
+    calculated by field name and canonical raw value (see io.export_config), section digest is XOR
+    of its fields digests, so field set updates it without other fields. Profiles digests (by name
+    and section digest) are XORed into nodes of profiles tree by profile name hash prefixes, from
+    root to leaves, for comparison of profiles of two configs by several nodes (see diff_profiles).
+    Lazy loaded profiles (see 'file_shards' option) are loaded at creation and at each file load.
+    In-place changes of mutable fields values (list.append, etc.) are not tracked, so digests are
+    exact only for configs with immutable fields types (see exact). Digests are calculated by raw
+    values, so float NaN values are equal by digests, unlike by value comparison (nan != nan).
+    Digests are not equal to io.fingerprint() ones"""
+    __slots__ = ('_cfg', '_raw', '_fields', '_sections', '_leaves', '_nodes', 'exact')
+    _cfg: Any
+    _raw: Callable[[Field, Any], str]
+    _fields: dict[str | None, dict[str, int]]
+    _sections: dict[str | None, int]
+    _leaves: dict[int, dict[str, int]]
+    _nodes: dict[tuple[int, int], int]
+    exact: bool
+
+    def __init__(self, cfg, raw: Callable[[Field, Any], str]):
+        """
+        :arg cfg:   Config support structure
+        :arg raw:   Canonical raw value getter of field value"""
+        self._cfg = cfg
+        self._raw = raw
+        self.exact = all(issubclass(x, _IMMUTABLE) for x in cfg.get_types.values())
+        self._fields, self._sections, self._leaves, self._nodes = {}, {}, {}, {}
+        self._rebuild()
+        cfg._add_listener('fingerprints', self._on_change)  # noqa
+
+        # Locks structure for changes with disabling attribute deletion
+        super().__init__(del_attr=False, name=str(self))
+
+    def __repr__(self):
+        return f'{self._cfg!r}.io.fingerprints'
+
+    def __str__(self):
+        return f'{self._cfg.name!r} {self._cfg.type_name} fingerprints support structure'
+
+    def _field(self, key: str, value) -> int:
+        return _digest(key, self._raw(self._cfg.get_fields[key], value))
+
+    def _set_tree(self, name: str, digest: int | None):
+        """Set profile digest in profiles tree (or remove, if None), with nodes from leaf to root"""
+        bucket = _bucket(name)
+        leaf = self._leaves.setdefault(bucket, {})
+        delta = leaf.pop(name, 0)
+        if digest is not None:
+            leaf[name] = digest = _digest(name, str(digest))
+            delta ^= digest
+        elif not leaf:
+            del self._leaves[bucket]
+        nodes = self._nodes
+        for level in range(_TREE_DEPTH + 1):
+            key = (level, bucket >> (_TREE_DEPTH - level))
+            if value := nodes.get(key, 0) ^ delta:
+                nodes[key] = value
+            else:
+                nodes.pop(key, None)
+
+    def _is_profile(self, name: str | None) -> bool:
+        return name is not None and name != self._cfg.def_sect
+
+    def _set_section(self, name: str | None, items: Mapping[str, Any]):
+        """Set section fields digests, section None is current fields"""
+        self._fields[name] = fields = {k: self._field(k, v) for k, v in items.items()}
+        digest = 0
+        for value in fields.values():
+            digest ^= value
+        self._sections[name] = digest
+        if self._is_profile(name):
+            self._set_tree(name, digest)                                                            # type: ignore[arg-type]
+
+    def _set_field(self, name: str | None, key: str, value):
+        fields = self._fields[name]
+        delta = fields.get(key, 0) ^ (digest := self._field(key, value))
+        fields[key] = digest
+        self._sections[name] ^= delta
+        if self._is_profile(name):
+            self._set_tree(name, self._sections[name])                                              # type: ignore[arg-type]
+
+    def _del_section(self, name: str):
+        del self._fields[name], self._sections[name]
+        self._set_tree(name, None)
+
+    def _rebuild(self):
+        cfg = self._cfg
+        [x.clear() for x in (self._fields, self._sections, self._leaves, self._nodes)]
+        self._set_section(None, cfg.get_data)
+        self._set_section(cfg.def_sect, cfg.get_defaults)
+        if profiles := cfg.profiles:
+            fields = cfg.get_fields
+            [self._set_section(k, as_dict(v, fields)) for k, v in profiles.get.items()]
+
+    def _on_change(self, op: str, *args):
+        """Update digests of changed fields, sections and profiles tree nodes"""
+        cfg = self._cfg
+        profiles = cfg.profiles
+        match op:
+            case 'set':
+                self._set_field(None, args[0], args[2])
+                if profiles:
+                    self._set_field(profiles.active, args[0], args[2])
+            case 'defaults':
+                current = profiles and profiles.active == cfg.def_sect
+                for key, (_, value) in args[0].items():
+                    self._set_field(cfg.def_sect, key, value)
+                    if current:
+                        self._set_field(None, key, value)
+            case 'profile':
+                self._set_section(args[0], as_dict(args[2], cfg.get_fields))
+                if args[0] == profiles.active:
+                    self._set_section(None, cfg.get_data)
+            case 'switch':
+                self._set_section(None, cfg.get_data)
+            case 'rename':
+                if args[0] == args[1]:
+                    return
+                if args[0] in self._sections:  # existing target profile is replaced by any of them
+                    self._del_section(args[1])
+                    return self._set_section(args[0], as_dict(profiles[args[0]], cfg.get_fields))
+                self._fields[args[0]] = self._fields[args[1]]
+                self._sections[args[0]] = digest = self._sections[args[1]]
+                self._del_section(args[1])
+                self._set_tree(args[0], digest)
+            case 'delete':
+                self._del_section(args[0])
+            case 'clear' | 'import' | 'load':
+                self._rebuild()
+
+    @property
+    def root(self) -> bytes:
+        """Get whole config digest: active profile, defaults, current fields and profiles"""
+        cfg = self._cfg
+        active = cfg.profiles.active if cfg.profiles else None
+        sections = self._sections
+        return _bytes(_digest(repr((active, sections[cfg.def_sect], sections[None],
+                                    self._nodes.get((0, 0))))))
+
+    @property
+    def data(self) -> bytes:
+        """Get current fields digest (equal for configs with equal fields values)"""
+        return _bytes(self._sections[None])
+
+    def section(self, name: str) -> bytes:
+        """Get section digest
+        :arg name:          Default section or profile name
+        :return:            Digest bytes
+        :raise InputError:  If section is not exists"""
+        if name not in self._sections or name is None:
+            raise fmt_exc((f'{self!r}.section()', 'name'), 'Section is not exists',
+                          available=tuple(k for k in self._sections if k is not None))
+        return _bytes(self._sections[name])
+
+    def field(self, name: str, key: str) -> bytes:
+        """Get field digest of section
+        :arg name:          Default section or profile name
+        :arg key:           Field name
+        :return:            Digest bytes
+        :raise InputError:  If section or field is not exists"""
+        self.section(name)
+        if key not in (fields := self._fields[name]):
+            raise fmt_exc((f'{self!r}.field()', 'key'), 'Field is not exists in section',
+                          available=tuple(fields))
+        return _bytes(fields[key])
+
+    def node(self, level: int, prefix: int) -> bytes:
+        """Get profiles tree node digest, XOR of profiles digests with profile name hash prefix
+        :arg level:         Node level, from 0 (root) to tree depth (leaves)
+        :arg prefix:        Profile name hash prefix of :arg level: bits
+        :return:            Digest bytes (zero for node without profiles)"""
+        return _bytes(self._nodes.get((level, prefix), 0))
+
+    def leaf(self, prefix: int) -> dict[str, bytes]:
+        """Get profiles digests of profiles tree leaf
+        :arg prefix:        Profile name hash of tree depth bits
+        :return:            Profiles names with digests"""
+        return {k: _bytes(v) for k, v in self._leaves.get(prefix, {}).items()}
+
+    def diff_profiles(self, other: 'Fingerprints') -> list[str]:
+        """Get names of profiles, which differ from other config ones (changed, added or deleted),
+        by comparison of profiles tree nodes from root, only subtrees with changes are compared
+        :arg other:         Other config fingerprints, or any object with node() and leaf()
+        :return:            Sorted profiles names"""
+        result: set[str] = set()
+        pending = [(0, 0)]
+        while pending:
+            level, prefix = pending.pop()
+            if self.node(level, prefix) == other.node(level, prefix):
+                continue
+            if level < _TREE_DEPTH:
+                pending += [(level + 1, prefix << 1), (level + 1, prefix << 1 | 1)]
+                continue
+            leaf, other_leaf = self.leaf(prefix), other.leaf(prefix)
+            result.update(k for k in leaf.keys() | other_leaf.keys()
+                          if leaf.get(k) != other_leaf.get(k))
+        return sorted(result)
@@ -0,0 +1,122 @@
+"""Internal config layer JSON and TOML files support structures"""
+import os
+import re
+import json
+from typing import Any
+
+from ._file import File, _scan, _in_loop
+
+from .types import mb_holder_t, fields_t, imported_t
+from .exceptions import FileError
+
+try:
+    import tomllib
+except ImportError:     # Python 3.10
+    tomllib = None      # type: ignore[assignment]
+
+
+# TOML bare key characters
+_TOML_BARE_KEY_RE = re.compile(r'[A-Za-z0-9_-]+')
+
+# TOML integer limits (64-bit signed)
+_TOML_INT_MIN, _TOML_INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _json_native(value: Any) -> bool:
+    """Check that value is stored in JSON without changes"""
+    if value is None or (t := type(value)) in (bool, int, float, str):
+        return True
+    if t is list:
+        return all(map(_json_native, value))
+    if t is dict:
+        return all(type(k) is str and _json_native(v) for k, v in value.items())
+    return False
+
+
+def _toml_native(value: Any) -> bool:
+    """Check that value is stored in TOML without changes"""
+    if (t := type(value)) in (bool, float, str):
+        return True
+    if t is int:
+        return _TOML_INT_MIN <= value <= _TOML_INT_MAX
+    if t is list:
+        return all(map(_toml_native, value))
+    if t is dict:
+        return all(type(k) is str and _toml_native(v) for k, v in value.items())
+    return False
+
+
+def _toml_str(value: str) -> str:
+    return json.dumps(value, ensure_ascii=False).replace('\x7f', '\\u007f')
+
+
+def _toml_key(key: str) -> str:
+    return key if _TOML_BARE_KEY_RE.fullmatch(key) else _toml_str(key)
+
+
+def _toml_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)  # inf and nan are the same in TOML
+    if isinstance(value, str):
+        return _toml_str(value)
+    if isinstance(value, list):
+        return f'[{", ".join(map(_toml_value, value))}]'
+    return f'{{{", ".join(f"{_toml_key(k)} = {_toml_value(v)}" for k, v in value.items())}}}'
+
+
+class JSONFile(File, suffixes=('.json',)):
+    """JSON file optional structure
+    Used instead of ini file structure for paths with JSON suffix. Values of native field types are
+    stored as JSON values, others - as strings from field export function"""
+    __slots__ = ()
+    _native = staticmethod(_json_native)
+
+    def _render(self, raw_config: dict[str, fields_t]) -> dict[str, fields_t]:                     # type: ignore[override]
+        return raw_config
+
+    def _write(self, rendered: dict[str, fields_t]):                                               # type: ignore[override]
+        self.path.write_bytes(json.dumps(rendered, ensure_ascii=False, indent=4).encode('utf-8'))
+
+    def _patch(self, rendered: dict[str, fields_t], removed: set[str]):                            # type: ignore[override]
+        """Replace changed sections in file data and drop removed ones, other sections are kept"""
+        raw = {k: v for k, v in json.loads(self.path.read_bytes()).items() if k not in removed}
+        raw.update(rendered)
+        self._write(raw)
+
+    def _read(self, sections: mb_holder_t[str] | None = None) -> tuple[imported_t, None]:
+        """Read and import file data without applying, see File._read()"""
+        data, self._stamp = self._read_stable(self.path.read_bytes)
+        raw = json.loads(data)
+        return _in_loop(self._cfg.io._import_config, raw, sections, native=True), None  # noqa
+
+
+class TOMLFile(File, suffixes=('.toml',)):
+    """TOML file optional structure
+    Used instead of ini file structure for paths with TOML suffix. Values of native field types are
+    stored as TOML values, others - as strings from field export function. Reading needs tomllib
+    (Python 3.11+), saving of selected sections patches them in the file as for ini file"""
+    __slots__ = ()
+    _native = staticmethod(_toml_native)
+
+    def _render(self, raw_config: dict[str, fields_t]) -> dict[str, bytes]:                         # type: ignore[override]
+        """Get file bytes of each section (by header name, as _scan() gets it)"""
+        rendered = {}
+        for name, raw_section in raw_config.items():
+            lines = [f'[{(name := _toml_key(name))}]']
+            lines += [f'{_toml_key(k)} = {_toml_value(v)}' for k, v in raw_section.items()]
+            rendered[name] = os.linesep.join(lines + ['', '']).encode('utf-8')
+        return rendered
+
+    def _patch(self, rendered: dict[str, bytes], removed: set[str]):
+        super()._patch(rendered, {_toml_key(x) for x in removed})
+
+    def _read(self, sections: mb_holder_t[str] | None = None) -> tuple[imported_t, None]:
+        """Read and import file data without applying, see File._read()"""
+        if tomllib is None:
+            raise FileError('TOML file reading needs tomllib (Python 3.11+)')
+        data, stamp = self._read_stable(self.path.read_bytes)
+        raw = tomllib.loads(data.decode('utf-8'))
+        self._index, self._stamp = _scan(data, self.path), stamp
+        return _in_loop(self._cfg.io._import_config, raw, sections, native=True), None  # noqa
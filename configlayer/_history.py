@@ -0,0 +1,187 @@
+"""Internal config layer changes history support structure"""
+from typing import Any
+from collections import deque
+from contextlib import contextmanager
+
+from .utils import Locker, fmt_exc
+
+
+class History(Locker):
+    """History optional structure
+    Used in config support structure if enabled, for undo and redo of config changes. Changes are
+    recorded from config changes listener as they are notified (field set, defaults set, profile
+    set, switch, rename, deletion and clearing), only with previous and new values. Recorded
+    changes are kept in ring buffer of limited size (the oldest ones are dropped), so undo or redo
+    of field set does not depend on config size. Field set without value change is not recorded,
+    changes inside batch() are recorded as single one. Config import and file load clear history.
+    Fields, not used by profile with active fields, keep values at undo of switch to it"""
+    __slots__ = ('_cfg', '_data', '_done', '_undone', '_position', '_replaying', '_batch')
+    _cfg: Any
+    _data: Any
+    _done: deque[tuple]
+    _undone: list[tuple]
+    _position: int
+    _replaying: bool
+    _batch: list[tuple] | None
+
+    def __init__(self, cfg, data, size: int):
+        """
+        :arg cfg:   Config support structure
+        :arg data:  Config data object
+        :arg size:  Max recorded changes count"""
+        self._cfg = cfg
+        self._data = data
+        self._done = deque(maxlen=size)
+        self._undone = []
+        self._position = 0
+        self._replaying = False
+        self._batch = None
+        cfg._add_listener('history', self._on_change)  # noqa
+
+        # Locks structure for changes with disabling attribute deletion and unlocked state
+        super().__init__('_position', '_replaying', '_batch', del_attr=False, name=str(self))
+
+    def __repr__(self):
+        return f'{self._cfg!r}.history'
+
+    def __str__(self):
+        return f'{self._cfg.name!r} {self._cfg.type_name} history support structure'
+
+    def __len__(self):
+        """Get recorded changes count, available for undo"""
+        return len(self._done)
+
+    @property
+    def size(self) -> int:
+        """Get max recorded changes count"""
+        return self._done.maxlen  # type: ignore[return-value]
+
+    @property
+    def redo_count(self) -> int:
+        """Get undone changes count, available for redo"""
+        return len(self._undone)
+
+    def _on_change(self, op: str, *args):
+        if self._replaying:
+            return
+        if op in ('import', 'load'):
+            if self._batch is not None:
+                self._batch.clear()
+            self.clear()
+            return
+        if op == 'set' and args[1] is args[2]:
+            return  # in-place change of field value cannot be reverted
+        if self._batch is not None:
+            self._batch.append((op, *args))
+            return
+        self._record((op, *args))
+
+    def _record(self, change: tuple):
+        self._done.append(change)
+        self._undone.clear()
+        self._position += 1
+
+    @contextmanager
+    def batch(self):
+        """Record changes inside context as single change, reverted and applied again at once
+        (nested batches are recorded as a part of the outer one)"""
+        if self._batch is not None:
+            yield
+            return
+        self._batch = []
+        try:
+            yield
+        finally:
+            changes, self._batch = self._batch, None
+            if changes:
+                self._record(('batch', tuple(changes)))
+
+    def _replay(self, change: tuple, undo: bool):
+        """Apply change or revert it (if :arg undo:), without recording"""
+        cfg = self._cfg
+        profiles = cfg.profiles
+        op, *args = change
+        self._replaying = True
+        try:
+            match op:
+                case 'batch':
+                    [self._replay(x, undo) for x in (reversed(args[0]) if undo else args[0])]
+                case 'set':
+                    setattr(self._data, args[0], args[1] if undo else args[2])
+                case 'defaults':
+                    cfg.set_defaults({k: v[0 if undo else 1] for k, v in args[0].items()},
+                                     typecheck=False)
+                case 'profile':
+                    name, prev, profile = args
+                    if (profile := prev if undo else profile) is None:
+                        del profiles[name]
+                    else:
+                        profiles.set(name, profile, defaults=isinstance(profile, tuple),
+                                     typecheck=False)
+                case 'switch':
+                    profiles.switch(args[0] if undo else args[1])
+                case 'rename':
+                    profiles.rename(*(args[::-1] if undo else args))
+                case 'delete':
+                    if undo:
+                        profiles.set(args[0], args[1], defaults=isinstance(args[1], tuple),
+                                     typecheck=False)
+                    else:
+                        del profiles[args[0]]
+                case 'clear':
+                    if undo:
+                        [profiles.set(k, v, defaults=isinstance(v, tuple), typecheck=False)
+                         for k, v in args[0].items()]
+                    else:
+                        profiles.clear()
+        finally:
+            self._replaying = False
+
+    def checkpoint(self) -> int:
+        """Get current position in history, to undo or redo changes up to it
+        :return:    Checkpoint position (recorded changes count since history creation)"""
+        return self._position
+
+    def _steps(self, checkpoint: int | None, undo: bool) -> int:
+        if checkpoint is None:
+            return 1 if (self._done if undo else self._undone) else 0
+        available = len(self._done) if undo else len(self._undone)
+        steps = self._position - checkpoint if undo else checkpoint - self._position
+        if not 0 <= steps <= available:
+            func, direction = ('undo', 'before') if undo else ('redo', 'after')
+            raise fmt_exc((f'{self!r}.{func}()', 'checkpoint'),
+                          f'Checkpoint {checkpoint} is not available {direction} current '
+                          f'position {self._position} ({available} changes recorded)')
+        return steps
+
+    def undo(self, checkpoint: int | None = None) -> int:
+        """Revert the last change, or all changes after checkpoint
+        :arg checkpoint:    Position from checkpoint(), or the last change (if not provided)
+        :return:            Reverted changes count
+        :raise InputError:  If checkpoint is not available (dropped or not before position)"""
+        steps = self._steps(checkpoint, True)
+        for _ in range(steps):
+            change = self._done.pop()
+            self._position -= 1
+            self._undone.append(change)
+            self._replay(change, True)
+        return steps
+
+    def redo(self, checkpoint: int | None = None) -> int:
+        """Apply again the last reverted change, or all reverted changes up to checkpoint.
+        Reverted changes are dropped at any new change
+        :arg checkpoint:    Position from checkpoint(), or the last undone change (if not provided)
+        :return:            Applied changes count
+        :raise InputError:  If checkpoint is not available (dropped or not after position)"""
+        steps = self._steps(checkpoint, False)
+        for _ in range(steps):
+            change = self._undone.pop()
+            self._position += 1
+            self._done.append(change)
+            self._replay(change, False)
+        return steps
+
+    def clear(self):
+        """Drop all recorded and reverted changes, position is kept"""
+        self._done.clear()
+        self._undone.clear()
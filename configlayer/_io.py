@@ -1,12 +1,25 @@
 """Internal config layer IO support structure"""
+import pickle
+import struct
 from ast import literal_eval
-from typing import Any, Mapping, Callable
+from typing import Any, Mapping, Callable, Iterable, Iterator
+from operator import itemgetter
+from itertools import groupby
+from hashlib import blake2b
+from types import CodeType
 from pathlib import Path
+from threading import Lock
+from weakref import WeakSet, WeakKeyDictionary
+from functools import partial, lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ._wire import pack, unpack, wire_native
+from ._fingerprints import Fingerprints
 
 from .exceptions import CheckValueError, InputError, FieldError, IOExportError, IOImportError
-from .types import mb_holder_t, fields_t, Field
+from .types import holder_t, mb_holder_t, fields_t, imported_t, Field
 from .utils import (Locker, GetName, as_holder, check_input, check_extra, check_items, check_type,
-                    with_type, fmt_exc, as_dict)
+                    with_type, fmt_exc, as_dict, safe)
 
 
 _UNIQUE = object()
@@ -16,6 +29,9 @@ _UNIQUE = object()
 _TEMPL_FIELD_DESC = "Field {}={} by {}: {!r}"
 _TEMPL_CONFIG = "Cannot {} {!r} config"
 
+# Schema digest size in bytes
+_SCHEMA_DIGEST_SIZE = 16
+
 # Exceptions holder
 _EXC_LIST = {'import': IOImportError, 'export': IOExportError}
 
@@ -23,11 +39,191 @@ _EXC_LIST = {'import': IOImportError, 'export': IOExportError}
 _EXPORT_HOOKS: dict[type, Callable] = {Path: str}
 _IMPORT_HOOKS: dict[type, Callable] = {Path: Path}
 
+# Field types, which values can be stored natively (if default export and import functions used)
+_NATIVE_TYPES = (bool, int, float, str, list, dict)
+
+
+# Import cache of literal_eval results: max size (least recently used are dropped) and raw length
+_IMPORT_CACHE_SIZE = 4096
+_IMPORT_CACHE_RAW_LEN = 256
+
+# Literal types, which values are immutable
+_IMMUTABLE_TYPES = (bool, int, float, complex, str, bytes, type(None), type(...))
+
+# Generated section functions of config classes, regenerated if fields types or functions changed
+_CODECS: WeakKeyDictionary[type, '_Codec'] = WeakKeyDictionary()
+
+# Process pools of import workers by workers count, created at first use and reused
+_POOLS: dict[int, ProcessPoolExecutor] = {}
+_POOLS_LOCK = Lock()
+
+
+def _is_native(field: Field) -> bool:
+    return (field.type in _NATIVE_TYPES and field.export_func is repr
+            and field.import_func is literal_eval)
+
+
+def _is_immutable(value) -> bool:
+    if type(value) in _IMMUTABLE_TYPES:
+        return True
+    return type(value) in (tuple, frozenset) and all(map(_is_immutable, value))
+
+
+def _copy_literal(value):
+    """Copy literal value, only its mutable parts are copied"""
+    if _is_immutable(value):
+        return value
+    if (t := type(value)) is dict:
+        return {k: _copy_literal(v) for k, v in value.items()}
+    return t(map(_copy_literal, value))  # list, set or tuple with mutable items
+
+
+def _code_key(code: CodeType) -> tuple:
+    """Get code object key by its bytecode, names and constants (with nested code objects)"""
+    return code.co_code, code.co_names, tuple(_code_key(x) if isinstance(x, CodeType) else repr(x)
+                                              for x in code.co_consts)
+
+
+def _canonical(value) -> str:
+    """Get repr of value with sorted items of sets and dicts at any depth, independent of their
+    insertion order and strings hash randomization (equal for equal containers of literals)"""
+    if (t := type(value)) in (set, frozenset) and value:
+        items = '{%s}' % ', '.join(sorted(map(_canonical, value)))
+        return items if t is set else f'frozenset({items})'
+    if t is dict:
+        return '{%s}' % ', '.join(f'{k}: {v}' for k, v in sorted(
+            (_canonical(k), _canonical(v)) for k, v in value.items()))
+    if t is list:
+        return '[%s]' % ', '.join(map(_canonical, value))
+    if t is tuple:
+        return '(%s)' % ', '.join(map(_canonical, value)) if len(value) != 1 else \
+            f'({_canonical(value[0])},)'
+    return repr(value)
+
+
+@lru_cache(_IMPORT_CACHE_SIZE)
+def _literal_eval_cached(raw_value: str) -> tuple[Any, bool]:
+    return (value := literal_eval(raw_value)), _is_immutable(value)
+
+
+def _literal_eval(raw_value: str):
+    """Evaluate literal with cache of results by raw value, mutable results are copied"""
+    if type(raw_value) is not str or len(raw_value) > _IMPORT_CACHE_RAW_LEN:
+        return literal_eval(raw_value)
+    value, immutable = _literal_eval_cached(raw_value)
+    return value if immutable else _copy_literal(value)
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """Get process pool of import workers (created at first use, recreated if broken)"""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None or pool._broken:  # noqa
+            if pool is not None:
+                pool.shutdown(wait=False)
+            pool = _POOLS[workers] = ProcessPoolExecutor(workers)
+        return pool
+
+
+def _describe(key: str, value, func: Callable, exc: Exception) -> str:
+    return _TEMPL_FIELD_DESC.format(key, with_type(value), GetName(func, code=True), exc)
+
+
+def _import_items(fields: Mapping[str, Field], raw_section: Mapping[str, Any], typecast: bool,
+                  native: bool, imports: Mapping[str, Callable] | None = None
+                  ) -> tuple[fields_t, list[str]]:
+    """Import section fields, with errors descriptions (module level for process pool workers)
+    Fields are imported by generated import functions (see _Codec), if :arg imports: provided"""
+    if imports is None:
+        imports = {k: partial(IO._import_field, v) for k, v in fields.items()}
+    result, errors = {}, []
+    for key, raw_value in raw_section.items():
+        try:
+            result[key] = imports[key](raw_value, typecast, native)
+        except Exception as e:
+            errors.append(_describe(key, raw_value, fields[key].import_func, e))
+    return result, errors
+
+
+class _Batched:
+    """Field value, exported later by field batch export function with other values"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Codec:
+    """Schema-specialised section functions, generated from config class fields
+    Export function exports fields unrolled, import functions import single field each, fields
+    types and functions are bound as globals. Results and errors are equal to generic ones"""
+    __slots__ = ('key', 'export_items', 'imports')
+
+    def __init__(self, name: str, fields: Mapping[str, Field], key: tuple):
+        self.key = key
+        ns: dict[str, Any] = {'check': check_type, '_Batched': _Batched, '_describe': _describe,
+                              '_canonical': _canonical}
+        lines = ['def export_items(items, defaults, active, strict, typecast, native, batched, '
+                 'canonical):',
+                 '    result, errors, get = {}, [], items.get']
+        imports = []
+        for i, (k, field) in enumerate(fields.items()):
+            import_func = _IMPORT_HOOKS.get(field.type, field.import_func)
+            export_func = _EXPORT_HOOKS.get(field.type, field.export_func)
+            ns |= {f'ex{i}': export_func,
+                   f'exf{i}': field.export_func, f't{i}': field.type,
+                   f'im{i}': _literal_eval if import_func is literal_eval else import_func}
+
+            # Export of field, with checks of value equality to default and raw value type
+            value = f'r if type(r := ex{i}(v)) is str else check(r, str, typecast, "field", False)'
+            if export_func is repr:
+                value = value.replace(f'ex{i}(v)', f'(_canonical if canonical else ex{i})(v)')
+            if native := _is_native(field):
+                value = f'v if native is not None and native(v) else ({value})'
+            if field.export_many:
+                value = f'_Batched(v) if batched else ({value})'
+            lines += [f'    d = defaults[{k!r}]',
+                      f'    v = get({k!r}, d)',
+                      f'    if strict and {k!r} in active or v != d:',
+                      '        try:',
+                      f'            result[{k!r}] = {value}',
+                      '        except Exception as e:',
+                      f'            errors.append(_describe({k!r}, v, exf{i}, e))']
+
+            # Import of field, with check of value type (native raw value is imported as is)
+            value = f'im{i}(r)'
+            if native:
+                value = f'r if native else {value}' if field.type is str else \
+                    f'r if native and not isinstance(r, str) else {value}'
+            imports += [f'def im{i}_(r, typecast, native):',
+                        f'    v = {value}',
+                        f'    if type(v) is t{i}:',
+                        '        return v',
+                        f'    return check(v, t{i}, typecast, "field", False)']
+        lines += ['    return result, errors', *imports]
+        exec(compile('\n'.join(lines), f'<{name} codec>', 'exec'), ns)
+        self.export_items = ns['export_items']
+        self.imports = {k: ns[f'im{i}_'] for i, k in enumerate(fields)}
+
+
+class Snapshot:
+    """Config state, recorded by io.snapshot() as baseline for io.export_delta()
+    Profiles renames after recording are tracked to be exported as renames"""
+    __slots__ = ('defaults', 'data', 'profiles', 'active', 'renames', '__weakref__')
+
+    def __init__(self, defaults: fields_t[str], data: fields_t[str] | None,
+                 profiles: dict[str, tuple[bool, fields_t[str]]], active: str | None):
+        self.defaults = defaults
+        self.data = data
+        self.profiles = profiles
+        self.active = active
+        self.renames: list[tuple[str, str]] = []
+
 
 class IO(Locker):
     """IO optional structure
     Used in config support structure if enabled, for any IO operations"""
-    __slots__ = ('_cfg', '_data')
+    __slots__ = ('_cfg', '_data', '_snapshots', '_fingerprints')
     _key_section = '_CONFIG_LAYER'  # Class constant
     _key_version = 'version'        # Class constant
     _key_profile = 'profile'        # Class constant
@@ -36,6 +232,8 @@ class IO(Locker):
     def __init__(self, cfg, data, fields):
         self._cfg = cfg
         self._data = data
+        self._snapshots: WeakSet[Snapshot] = WeakSet()
+        self._fingerprints: Fingerprints | None = None
 
         # Config IO check (rewrite to export/import section with all fields)
         errors = []
@@ -48,6 +246,11 @@ class IO(Locker):
                 errors.append(f'Field {name}={with_type(field.default)} must be equal '
                               f'imported={with_type(imported)}: '
                               f'{export_func = }, {exported = }, {import_func = }')
+            for func, arg, result in ((field.export_many, field.default, exported),
+                                      (field.import_many, exported, imported)):
+                if func is not None and (batched := safe(lambda: list(func([arg])))) != [result]:
+                    errors.append(f'Field {name} batch function {GetName(func)} result '
+                                  f'{batched!r} must be equal [{result!r}]')
         if errors:
             raise CheckValueError('\n\t'.join((f'{cfg.name!r} config IO check failed:', *errors)))
 
@@ -60,12 +263,45 @@ class IO(Locker):
     def __str__(self):
         return f'{self._cfg.name!r} {self._cfg.type_name} I/O support structure'
 
+    @staticmethod
+    def _schema_item(obj) -> tuple:
+        code = getattr(obj, '__code__', None)
+        name = getattr(obj, '__qualname__', None) or repr(obj)
+        cells = (safe(getattr, x, 'cell_contents', _exc_=None)
+                 for x in getattr(obj, '__closure__', None) or ())
+        closure = tuple(_code_key(x.__code__) if hasattr(x, '__code__') else repr(x) for x in cells)
+        return getattr(obj, '__module__', ''), name, _code_key(code) if code else (), closure
+
+    @property
+    def schema(self) -> bytes:
+        """Get config schema digest, changed with fields names, types or export/import functions
+        (by its names, code with constants and closures), profiles state or default section name"""
+        cfg = self._cfg
+        item = self._schema_item
+        fields = tuple((k, item(v.type), item(v.export_func), item(v.import_func))
+                       for k, v in cfg.get_fields.items())
+        schema = (cfg.def_sect, bool(cfg.profiles), *fields)
+        return blake2b(repr(schema).encode(), digest_size=_SCHEMA_DIGEST_SIZE).digest()
+
+    @property
+    def _codec(self) -> _Codec:
+        """Get generated section functions of config class, cached until fields changed"""
+        cls = type(self._data)
+        key = tuple((k, v.type, v.export_func, v.import_func, v.export_many)
+                    for k, v in self._cfg.get_fields.items())
+        if (codec := _CODECS.get(cls)) is None or codec.key != key:
+            _CODECS[cls] = codec = _Codec(cls.__qualname__, self._cfg.get_fields, key)
+        return codec
+
     def _exc(self, op, exc, section=_UNIQUE):
         section = '' if section == _UNIQUE else f' section {section!r}' if section else ' section'
         return _EXC_LIST[op](f"{_TEMPL_CONFIG.format(op, self._cfg.name)}{section}. {exc}")
 
     @staticmethod
-    def _export_field(field: Field, value, typecast: bool) -> str:
+    def _export_field(field: Field, value, typecast: bool,
+                      native: Callable[[Any], bool] | None = None) -> Any:
+        if native is not None and _is_native(field) and native(value):
+            return value
         hook = _EXPORT_HOOKS.get(field.type, field.export_func)
         return check_type(hook(value), str, typecast, 'field', False)
 
@@ -87,19 +323,31 @@ class IO(Locker):
             raise FieldError('Export', self._cfg.name, name, **kw, type_name=self._cfg.type_name,
                              reason=repr(e)) from e
 
-    def export_section(self, section: str | fields_t | None = None, strict=False, typecast=True
-                       ) -> fields_t[str]:
+    def export_section(self, section: str | fields_t | None = None, strict=False, typecast=True,
+                       native: Callable[[Any], bool] | None = None) -> fields_t[str]:
         """Export single section to dict with raw str type values
         :arg section:           Section name, fields dict, or active section (if not provided)
         :arg strict:            Export all fields (not skip equal to default)
         :arg typecast:          Force str type if field export_func result is not str
+        :arg native:            Predicate of values, stored natively by storage (exported as is,
+                                if field type is native and default export and import used)
         :return:                Fields raw values
         :raise InputError:      If wrong arguments provided
         :raise IOExportError:   Any other error"""
+        return dict(self._iter_section(section, strict, typecast, native))
+
+    def _iter_section(self, section: str | fields_t | None, strict: bool, typecast: bool,
+                      native: Callable[[Any], bool] | None, batched=False,
+                      codec: _Codec | None = None, canonical=False) -> Iterator[tuple[str, Any]]:
+        """Export single section lazily, see export_section(). Fields are exported at first item
+        by generated function of config class (:arg codec: if provided, got once for all sections),
+        errors are raised together before any item. Values of fields with batch export function
+        are yielded as _Batched, if :arg batched: enabled. Values exported by repr are exported by
+        _canonical() and profiles active fields are sorted, if :arg canonical: enabled"""
         cfg = self._cfg
         profiles = cfg.profiles
         fields = cfg.get_fields
-        active_fields = tuple(fields)
+        active_fields: Mapping[str, Any] = fields
         name, section = (section, None) if isinstance(section, str) else (None, section)
         ie = (f'{self!r}.export_section()', 'section')
 
@@ -117,10 +365,12 @@ class IO(Locker):
                     support[self._key_version] = repr(cfg.version)
                 if profiles:
                     support[self._key_profile] = repr(profiles.active)
-                    if fields := {k: tuple(v) for k, v in profiles.get.items()
-                                  if isinstance(v, dict)}:
+                    p_fields = profiles._fields()  # noqa (not loaded profiles are not loaded)
+                    p_items = sorted(p_fields.items()) if canonical else p_fields.items()
+                    if fields := {k: tuple(sorted(v)) if canonical else v for k, v in p_items}:
                         support[self._key_fields] = repr(fields)
-                return support
+                yield from support.items()
+                return
 
             # Default section select
             elif (name == cfg.def_sect or
@@ -136,7 +386,7 @@ class IO(Locker):
                     details = f'available profiles: {p}' if p else 'there is no profiles'
                     raise fmt_exc(ie, f'Profile is not exists, {details}')
                 items, defaults = as_dict(profiles[name], fields), cfg.get_defaults
-                active_fields = tuple(items)
+                active_fields = items
 
             # Config section select
             else:
@@ -145,21 +395,12 @@ class IO(Locker):
                 else:
                     raise fmt_exc(ie, must_be=repr(cfg.name), received=repr(name))
 
-            # Export section
-            _export = self._export_field
-            result, errors = {}, []
-            for key, field in fields.items():
-                default = defaults[key]
-                value = items.get(key, default)
-                if key in active_fields and strict or value != default:
-                    try:
-                        result[key] = _export(field, value, typecast)
-                    except Exception as e:
-                        fn = GetName(field.export_func, code=True)
-                        errors.append(_TEMPL_FIELD_DESC.format(key, with_type(value), fn, e))
+            # Export section by generated function
+            result, errors = (codec or self._codec).export_items(
+                items, defaults, active_fields, strict, typecast, native, batched, canonical)
             if errors:
                 raise CheckValueError('\n\t'.join(('Errors:', *errors)))
-            return result
+            yield from result.items()
 
         except InputError:
             raise
@@ -169,13 +410,17 @@ class IO(Locker):
             raise self._exc('export', repr(e), name) from e  # not tested extreme case exception
 
     def export_config(self, sections: mb_holder_t[str] | None = None, *, strict_defaults=False,
-                      strict_data=False, typecast=True) -> dict[str, fields_t[str]]:
+                      strict_data=False, typecast=True, native: Callable[[Any], bool] | None = None,
+                      canonical=False) -> dict[str, fields_t[str]]:
         """Export whole config or specified profile(s) (if profiles enabled).
         Also, by defaults, export only changed by user default and data fields
         :arg sections:          Selected section name(s) or all (if not provided)
         :arg strict_defaults:   Export all fields from default section (not skip equal to factory)
         :arg strict_data:       Export all fields from data sections (not skip equal to default)
         :arg typecast:          Force str type if field export_func result is not str
+        :arg native:            Predicate of values, stored natively by storage (see export_section)
+        :arg canonical:         Deterministic export of equal configs: sorted profiles and fields,
+                                values of fields exported by repr - with sorted sets and dicts items
         :return:                Sections with fields raw values
         :raise InputError:      If wrong arguments provided
         :raise IOExportError:   Any other error"""
@@ -187,24 +432,35 @@ class IO(Locker):
                 raise fmt_exc(ie, f'Profiles disabled, but provided: {sections!r}')
 
             # Export config support fields
-            if support := self.export_section(self._key_section):
+            if support := dict(self._iter_section(self._key_section, False, typecast, native,
+                                                  canonical=canonical)):
                 result[self._key_section] = support
 
             # Export config defaults
+            batched = any(x.export_many for x in cfg.get_fields.values())
+            export = partial(self._iter_section, typecast=typecast, native=native, batched=batched,
+                             codec=self._codec, canonical=canonical)
             cds = cfg.def_sect
-            result[cds] = self.export_section(cds, strict=strict_defaults, typecast=typecast)
+            result[cds] = dict(export(cds, strict_defaults))
 
             # Export config data
             if cfg.profiles:
                 exists = cfg.profiles.get
                 # bug mypy: profiles cannot be None here
-                if (selected := as_holder(sections, exists)) != exists:                             # type: ignore[arg-type]
+                selected: holder_t[str] = as_holder(sections, exists)                               # type: ignore[arg-type]
+                if selected is not exists:  # not loaded profiles are not compared
                     check_extra(selected, exists, 'profile', input_exc=ie)
-                # bug mypy: k cannot be None here
-                result |= {k: self.export_section(k, strict=strict_data, typecast=typecast)         # type: ignore[misc]
-                           for k in selected}
+                if canonical:
+                    selected = sorted(selected)
+                result |= {k: dict(export(k, strict_data)) for k in selected}
             else:
-                result[cfg.name] = self.export_section(strict=strict_data, typecast=typecast)
+                result[cfg.name] = dict(export(None, strict_data))
+
+            # Export values of fields with batch export function, all at once for each field
+            if batched:
+                self._export_batched(result, typecast)
+            if canonical:
+                result = {k: dict(sorted(v.items())) for k, v in result.items()}
             return result
 
         except (InputError, IOExportError):
@@ -212,11 +468,136 @@ class IO(Locker):
         except Exception as e:
             raise self._exc('export', repr(e)) from e  # not tested extreme case exception
 
+    def fingerprint(self, sections: mb_holder_t[str] | None = None, *, strict_defaults=False,
+                    strict_data=False) -> bytes:
+        """Get config digest of its canonical export (see export_config), stable between processes
+        and equal for configs with equal exported sections, fields and values (for comparison of
+        configs, caching or skipping of unchanged saves without whole structures)
+        :arg sections:          Selected section name(s) or all (if not provided)
+        :arg strict_defaults:   Export all fields from default section (not skip equal to factory)
+        :arg strict_data:       Export all fields from data sections (not skip equal to default)
+        :return:                Digest bytes
+        :raise InputError:      If wrong arguments provided
+        :raise IOExportError:   Any other error"""
+        raw = self.export_config(sections, strict_defaults=strict_defaults,
+                                 strict_data=strict_data, canonical=True)
+        data = repr(tuple((k, tuple(v.items())) for k, v in raw.items())).encode('utf-8')
+        return blake2b(data, digest_size=_SCHEMA_DIGEST_SIZE).digest()
+
     @staticmethod
-    def _import_field(field: Field, raw_value: str, typecast: bool) -> Any:
+    def _canonical_field(field: Field, value) -> str:
+        """Export single field value, as export_config(canonical=True) does"""
+        if (hook := _EXPORT_HOOKS.get(field.type, field.export_func)) is repr:
+            return _canonical(value)
+        return check_type(hook(value), str, True, 'field', False)
+
+    @property
+    def fingerprints(self) -> Fingerprints:
+        """Get incremental fingerprints of fields, sections, profiles and whole config, calculated
+        at first access and updated by config changes (see Fingerprints)
+        :raise IOExportError:   If errors during first calculation"""
+        if self._fingerprints is None:
+            try:
+                fingerprints = Fingerprints(self._cfg, self._canonical_field)
+            except Exception as e:
+                raise self._exc('export', repr(e)) from e
+            with self:
+                self._fingerprints = fingerprints
+        return self._fingerprints
+
+    def _export_batched(self, raw_config: dict[str, fields_t], typecast: bool):
+        """Replace _Batched values in exported sections by results of fields batch functions"""
+        batched: dict[str, list[tuple[fields_t, _Batched]]] = {}
+        for raw_section in raw_config.values():
+            for key, value in raw_section.items():
+                if type(value) is _Batched:
+                    batched.setdefault(key, []).append((raw_section, value))
+
+        fields = self._cfg.get_fields
+        errors = []
+        for key, items in batched.items():
+            field = fields[key]
+            try:
+                raw_values = list(field.export_many([x.value for _, x in items]))                   # type: ignore[misc]
+                if len(raw_values) != len(items):
+                    raise ValueError(f'{len(raw_values)} values returned for {len(items)} values')
+                for (raw_section, _), raw_value in zip(items, raw_values):
+                    raw_section[key] = check_type(raw_value, str, typecast, 'field', False)
+            except Exception as e:
+                fn = GetName(field.export_many, code=True)
+                errors.append(f'Field {key} by {fn}: {e!r}')
+        if errors:
+            raise self._exc('export', '\n\t'.join(('Errors:', *errors)))
+
+    def iter_export(self, sections: mb_holder_t[str] | None = None, *, strict_defaults=False,
+                    strict_data=False, typecast=True, native: Callable[[Any], bool] | None = None
+                    ) -> Iterator[tuple[str, str | None, Any]]:
+        """Export whole config or specified profile(s) lazily, as export_config() does, by fields
+        raw values in the same order. Section without exported fields is yielded as single item
+        with None key and value, fields errors are raised after the last field of its section
+        :arg sections:          Selected section name(s) or all (if not provided)
+        :arg strict_defaults:   Export all fields from default section (not skip equal to factory)
+        :arg strict_data:       Export all fields from data sections (not skip equal to default)
+        :arg typecast:          Force str type if field export_func result is not str
+        :arg native:            Predicate of values, stored natively by storage (see export_section)
+        :return:                Iterator of section name, field name and field raw value
+        :raise InputError:      If wrong arguments provided
+        :raise IOExportError:   Any other error"""
+        cfg = self._cfg
+        ie = (f'{self!r}.iter_export()', 'profiles')
+        try:
+            if sections is not None and cfg.profiles is None:
+                raise fmt_exc(ie, f'Profiles disabled, but provided: {sections!r}')
+
+            # Select sections before export, config support section is skipped if empty
+            selected: list[tuple[str | None, bool]] = [(self._key_section, False),
+                                                       (cfg.def_sect, strict_defaults)]
+            if cfg.profiles:
+                exists = cfg.profiles.get
+                # bug mypy: profiles cannot be None here
+                if (names := as_holder(sections, exists)) is not exists:                            # type: ignore[arg-type]
+                    check_extra(names, exists, 'profile', input_exc=ie)
+                selected += [(k, strict_data) for k in names]
+            else:
+                selected.append((None, strict_data))
+
+            # Export sections one by one
+            codec = self._codec
+            for name, strict in selected:
+                section = cfg.name if name is None else name
+                empty = True
+                for key, raw_value in self._iter_section(name, strict, typecast, native,
+                                                         codec=codec):
+                    empty = False
+                    yield section, key, raw_value
+                if empty and name != self._key_section:
+                    yield section, None, None
+
+        except (InputError, IOExportError):
+            raise
+        except Exception as e:
+            raise self._exc('export', repr(e)) from e  # not tested extreme case exception
+
+    @staticmethod
+    def _import_field(field: Field, raw_value: str, typecast: bool, native=False) -> Any:
+        if native and _is_native(field) and (field.type is str or not isinstance(raw_value, str)):
+            return check_type(raw_value, field.type, typecast, 'field', False)
         hook = _IMPORT_HOOKS.get(field.type, field.import_func)
+        if hook is literal_eval:
+            hook = _literal_eval
         return check_type(hook(raw_value), field.type, typecast, 'field', False)
 
+    @staticmethod
+    def import_cache_info():
+        """Get import cache statistics (hits, misses, maxsize, currsize), cache is common for all
+        configs and is used for fields with default import function (literal_eval)"""
+        return _literal_eval_cached.cache_info()
+
+    @staticmethod
+    def import_cache_clear():
+        """Clear import cache and its statistics"""
+        _literal_eval_cached.cache_clear()
+
     def import_field(self, name: str, raw_value: str, typecast=True) -> Any:
         """Import single field to field type
         :arg name:          Field name
@@ -232,31 +613,30 @@ class IO(Locker):
             raise FieldError('Import', self._cfg.name, name, from_value=raw_value, **kwargs,
                              type_name=self._cfg.type_name, reason=repr(e)) from e
 
-    def import_section(self, raw_section: fields_t[str], name: str | None = None, typecast=True
-                       ) -> fields_t:
+    def import_section(self, raw_section: fields_t[str], name: str | None = None, typecast=True,
+                       native=False) -> fields_t:
         """Import single section to dict with fields values
         note: Import section directly into the config is not available and may not be!
         :arg raw_section:       Fields raw values
         :arg name:              Section name (only for error message)
         :arg typecast:          Force field type if field import_func result has any other type
+        :arg native:            Raw values are from storage with native values (see export_section)
         :return:                Fields values
         :raise InputError:      If wrong arguments provided
         :raise IOImportError:   Any other error"""
-        cfg = self._cfg
-        fields = cfg.get_fields
+        return self._import_section(raw_section, name, typecast, native)
+
+    def _import_section(self, raw_section: Mapping[str, Any], name: str | None, typecast: bool,
+                        native: bool, codec: _Codec | None = None) -> fields_t:
+        """Import single section, see import_section(). Generated functions of config class are
+        got once for all sections, if :arg codec: provided"""
+        fields = self._cfg.get_fields
         ie = (f'{self!r}.import_section()', 'raw_section')
         check_type(raw_section, Mapping, input_exc=ie)
         check_extra(raw_section, fields, 'field', input_exc=ie)
         try:
-            result, errors = {}, []
-            _import = self._import_field
-            for key, raw_value in raw_section.items():
-                field = fields[key]
-                try:
-                    result[key] = _import(field, raw_value, typecast)
-                except Exception as e:
-                    fn = GetName(field.import_func, code=True)
-                    errors.append(_TEMPL_FIELD_DESC.format(key, with_type(raw_value), fn, e))
+            result, errors = _import_items(fields, raw_section, typecast, native,
+                                           (codec or self._codec).imports)
             if errors:
                 raise CheckValueError("\n\t".join(('Errors:', *errors)))
             return result
@@ -266,16 +646,14 @@ class IO(Locker):
         except Exception as e:
             raise self._exc('import', repr(e), name) from e  # not tested extreme case exception
 
-    def import_config(self, raw_config: Mapping[str, fields_t[str]],
-                      sections: mb_holder_t[str] | None = None, typecast=True):
-        """Import whole config, or specified section(s) from it
-        :arg raw_config:        Sections with fields raw values
-        :arg sections:          Selected section name(s) to import or all (if not provided)
-        :arg typecast:          Force field type if field import_func result has any other type
-        :return:                Sections with fields values
-        :raise InputError:      If wrong arguments provided
-        :raise IOImportError:   Any other error"""
+    def _import_config(self, raw_config: Mapping[str, Mapping[str, Any]],
+                       sections: mb_holder_t[str] | None = None, typecast=True, native=False,
+                       imported=False, workers=0) -> imported_t:
+        """Import config without applying, see import_config()
+        Sections (except config support one) are already imported if :arg imported: enabled"""
         cfg = self._cfg
+        import_section = ((lambda x, *_: x) if imported else
+                          partial(self._import_section, codec=self._codec))
         def_sect = cfg.def_sect
         profiles = cfg.profiles
         fields = tuple(cfg.get_fields)
@@ -327,34 +705,381 @@ class IO(Locker):
                 check_extra(sections, selected, 'section', input_exc=ie_sect)
                 raw_config = {k: raw_config[k] for k in sections}
 
+            # Import sections concurrently or with batch functions, used below as already imported
+            if (workers or any(x.import_many for x in cfg.get_fields.values())) and not imported:
+                names = (def_sect,) + (tuple(raw_config) if profiles else (cfg.name,))
+                raw_config = self._import_sections({k: raw_config[k] for k in dict.fromkeys(names)
+                                                    if k in raw_config},
+                                                   typecast, native, workers, ie_cfg)
+                import_section = (lambda x, *_: x)
+
             # Import defaults
-            if defaults := raw_config.pop(def_sect, {}):
-                check_extra(defaults, fields, 'default field', input_exc=ie_cfg)
-                defaults = self.import_section(defaults, def_sect, typecast)
+            defaults: fields_t = {}
+            if raw_defaults := raw_config.pop(def_sect, {}):
+                check_extra(raw_defaults, fields, 'default field', input_exc=ie_cfg)
+                defaults = import_section(raw_defaults, def_sect, typecast, native)
             defaults = cfg.get_factory_defaults | defaults
 
             # Import data
             profiles_data = {}
             if profiles:
                 for k, v in raw_config.items():
-                    p_data = self.import_section(v, k, typecast)
+                    p_data = import_section(v, k, typecast, native)
                     if af := active_fields.get(k):
                         check_items(p_data, af, f'{k!r} profile field', input_exc=ie_cfg)
                         profiles_data[k] = {k: v for k, v in p_data.items() if k in af}
                     else:
                         profiles_data[k] = defaults | p_data
             else:
-                data = defaults | self.import_section(raw_config[cfg.name], cfg.name, typecast)
+                data = import_section(raw_config[cfg.name], cfg.name, typecast, native)
+                data = defaults | data
 
-            # Apply successfully imported data
-            cfg.set_defaults(defaults, typecheck=False)
-            if profiles:
-                profiles.clear()
-                [profiles.set(name, profile, defaults=False, typecheck=False)
-                 for name, profile in profiles_data.items()]
-                profiles.switch(active)
+            return (active, defaults, profiles_data) if profiles else (None, defaults, data)
+
+        except (InputError, IOImportError):
+            raise
+        except Exception as e:
+            raise self._exc('import', repr(e)) from e
+
+    def _import_sections(self, raw_config: Mapping[str, Mapping[str, Any]], typecast: bool,
+                         native: bool, workers: int, ie_cfg: tuple) -> dict[str, fields_t]:
+        """Import sections concurrently by process pool (if fields types and functions can be
+        pickled) or thread pool (if workers provided), or serially. Process pool is reused by
+        all imports with the same workers count (see _process_pool). Fields with batch import
+        function are imported by all their raw values at once. Errors are raised for the first
+        failed section in order, and for batch imported fields after all sections"""
+        cfg = self._cfg
+        fields = dict(cfg.get_fields)
+        batched = {k: v for k, v in fields.items() if v.import_many is not None}
+        ie = (f'{self!r}.import_section()', 'raw_section')
+        for name, raw_section in raw_config.items():
+            if name == cfg.def_sect:
+                check_extra(raw_section, fields, 'default field', input_exc=ie_cfg)
+            check_type(raw_section, Mapping, input_exc=ie)
+            check_extra(raw_section, fields, 'field', input_exc=ie)
+
+        # Import fields by import functions
+        raw_sections = [{k: v for k, v in x.items() if k not in batched}
+                        for x in raw_config.values()]
+        imports: Mapping[str, Callable] | None = self._codec.imports
+        processes = False
+        if workers:
+            try:
+                pickle.dumps(fields)
+                processes, imports = True, None  # generated functions cannot be pickled
+            except Exception:
+                pass
+        func = partial(_import_items, fields, typecast=typecast, native=native, imports=imports)
+        if processes:
+            imported = dict(zip(raw_config, _process_pool(workers).map(func, raw_sections)))
+        elif workers:
+            with ThreadPoolExecutor(workers) as executor:
+                imported = dict(zip(raw_config, executor.map(func, raw_sections)))
+        else:
+            imported = dict(zip(raw_config, map(func, raw_sections)))
+        for name, (_, errors) in imported.items():
+            if errors:
+                raise self._exc('import', '\n\t'.join(('Errors:', *errors)), name)
+        result = {k: v for k, (v, _) in imported.items()}
+
+        # Import fields by batch import functions
+        errors = []
+        for key, field in batched.items():
+            if not (names := [k for k, v in raw_config.items() if key in v]):
+                continue
+            try:
+                values = list(field.import_many([raw_config[k][key] for k in names]))               # type: ignore[misc]
+                if len(values) != len(names):
+                    raise ValueError(f'{len(values)} values returned for {len(names)} raw values')
+                for name, value in zip(names, values):
+                    result[name][key] = check_type(value, field.type, typecast, 'field', False)
+            except Exception as e:
+                errors.append(f'Field {key} by {GetName(field.import_many, code=True)}: {e!r}')
+        if errors:
+            raise self._exc('import', '\n\t'.join(('Errors:', *errors)))
+        return result
+
+    def _apply_config(self, imported: imported_t):
+        """Apply successfully imported data"""
+        cfg = self._cfg
+        profiles = cfg.profiles
+        active, defaults, data = imported
+        try:
+            with cfg._mute():
+                cfg.set_defaults(defaults, typecheck=False)
+                if profiles:
+                    profiles.clear()
+                    [profiles.set(name, profile, defaults=False, typecheck=False)
+                     for name, profile in data.items()]
+                    profiles.switch(active)
+                else:
+                    cfg._set_fields(data)   # noqa
+            cfg._notify('import')
+
+        except (InputError, IOImportError):
+            raise
+        except Exception as e:
+            raise self._exc('import', repr(e)) from e
+
+    def import_config(self, raw_config: Mapping[str, Mapping[str, Any]],
+                      sections: mb_holder_t[str] | None = None, typecast=True, native=False,
+                      workers=0):
+        """Import whole config, or specified section(s) from it
+        :arg raw_config:        Sections with fields raw values
+        :arg sections:          Selected section name(s) to import or all (if not provided)
+        :arg typecast:          Force field type if field import_func result has any other type
+        :arg native:            Raw values are from storage with native values (see export_section)
+        :arg workers:           Import sections concurrently by workers count of process pool
+                                (if fields can be pickled) or thread pool, or serially (if 0)
+        :raise InputError:      If wrong arguments provided
+        :raise IOImportError:   Any other error"""
+        self._apply_config(self._import_config(raw_config, sections, typecast, native,
+                                               workers=workers))
+
+    def _import_stream(self, records: Iterable[tuple[str, str | None, Any]],
+                       sections: mb_holder_t[str] | None = None, typecast=True, native=False
+                       ) -> imported_t:
+        """Import config from raw records without applying, see import_stream()"""
+        ie = (f'{self!r}.import_stream()', 'records')
+        selected: tuple[str, ...] | None = None
+        if sections is not None:
+            selected = tuple(as_holder(sections))                                                   # type: ignore[arg-type]
+        try:
+            result: dict[str, fields_t] = {}
+            for name, items in groupby(records, itemgetter(0)):
+                if name in result:
+                    raise fmt_exc(ie, f'Section records are not in a row: {name!r}')
+                raw_section = {k: v for _, k, v in items if k is not None}
+                if name == self._key_section:
+                    result[name] = raw_section
+                elif selected is None or name in selected:
+                    result[name] = self.import_section(raw_section, name, typecast, native)
+                else:
+                    result[name] = {}  # not selected section is skipped
+            return self._import_config(result, sections, typecast, native, imported=True)
+
+        except (InputError, IOImportError):
+            raise
+        except Exception as e:
+            raise self._exc('import', repr(e)) from e
+
+    def import_stream(self, records: Iterable[tuple[str, str | None, Any]],
+                      sections: mb_holder_t[str] | None = None, typecast=True, native=False):
+        """Import whole config, or specified section(s) from it, by raw records, as import_config()
+        does. Each section is imported at the end of its records (records of each section must be
+        in a row), and config is changed only after the last record
+        :arg records:           Iterable of section name, field name and field raw value
+                                (or None field name and value for empty section, as iter_export())
+        :arg sections:          Selected section name(s) to import or all (if not provided)
+        :arg typecast:          Force field type if field import_func result has any other type
+        :arg native:            Raw values are from storage with native values (see export_section)
+        :raise InputError:      If wrong arguments provided
+        :raise IOImportError:   Any other error"""
+        self._apply_config(self._import_stream(records, sections, typecast, native))
+
+    def export_bytes(self, sections: mb_holder_t[str] | None = None, *, strict_defaults=False,
+                     strict_data=False) -> bytes:
+        """Export whole config or specified profile(s) to binary wire format, as export_config()
+        does. Fields names are stored once in keys table after header (with config schema digest),
+        sections are length prefixed and store values by table positions, values of native field types are
+        type tagged (others are stored as raw str values)
+        :arg sections:          Selected section name(s) or all (if not provided)
+        :arg strict_defaults:   Export all fields from default section (not skip equal to factory)
+        :arg strict_data:       Export all fields from data sections (not skip equal to default)
+        :return:                Wire format data
+        :raise InputError:      If wrong arguments provided
+        :raise IOExportError:   Any other error"""
+        raw_config = self.export_config(sections, strict_defaults=strict_defaults,
+                                        strict_data=strict_data, native=wire_native)
+        return pack(self.schema, raw_config)
+
+    def import_bytes(self, data: bytes | memoryview, sections: mb_holder_t[str] | None = None,
+                     typecast=True):
+        """Import whole config, or specified section(s) from it, from binary wire format data of
+        export_bytes() with the same config schema. Data is not copied, only imported sections
+        are decoded
+        :arg data:              Wire format data
+        :arg sections:          Selected section name(s) to import or all (if not provided)
+        :arg typecast:          Force field type if field import_func result has any other type
+        :raise InputError:      If wrong arguments provided
+        :raise IOImportError:   Any other error"""
+        try:
+            raw_config = unpack(data, self.schema)
+        except (TypeError, ValueError, IndexError, struct.error) as e:
+            raise fmt_exc((f'{self!r}.import_bytes()', 'data'), str(e)) from e
+        self.import_config(raw_config, sections, typecast, native=True)
+
+    def _on_change(self, op: str, *args):
+        """Track profiles renames for recorded snapshots"""
+        if op == 'rename':
+            for snapshot in self._snapshots:
+                snapshot.renames.append((args[1], args[0]))
+
+    def snapshot(self) -> Snapshot:
+        """Record current config state as baseline for export_delta()
+        :return:                Snapshot token
+        :raise IOExportError:   If errors during export"""
+        cfg = self._cfg
+        profiles = cfg.profiles
+        export = self.export_section
+        if not self._snapshots:
+            cfg._add_listener('io', self._on_change)  # noqa
+        snapshot = Snapshot(
+            export(cfg.def_sect, True),
+            None if profiles else export(cfg.name, True),
+            {k: (isinstance(v, tuple), export(k, True)) for k, v in profiles.get.items()}
+            if profiles else {},
+            profiles.active if profiles else None)
+        self._snapshots.add(snapshot)
+        return snapshot
+
+    def _current(self, since: Snapshot, func: str) -> Snapshot:
+        """Get current state, not recorded as snapshot, after :arg since: check"""
+        if since not in self._snapshots:
+            raise InputError('since', func_name=f'{self!r}.{func}()',
+                             must_be='snapshot of the config', received=with_type(since))
+        current = self.snapshot()
+        self._snapshots.discard(current)
+        return current
+
+    def _baseline(self, since: Snapshot) -> tuple[dict[str, tuple[bool, fields_t[str]]],
+                                                  str | None, list[tuple[str, str]]]:
+        """Get snapshot profiles and active profile with applicable renames (as they are applied
+        before other changes), with these renames"""
+        profiles, active, renames = dict(since.profiles), since.active, []
+        for old, new in since.renames:
+            if old in profiles and new not in profiles and new != self._cfg.def_sect:
+                profiles[new] = profiles.pop(old)
+                renames.append((old, new))
+                active = new if active == old else active
+        return profiles, active, renames
+
+    def export_delta(self, since: Snapshot) -> dict[str, Any]:
+        """Export config changes since recorded snapshot, to be applied by apply_delta()
+        of the config with snapshot state. Only changed fields raw values are exported, except
+        added profiles and profiles with changed active fields, which are exported whole
+        :arg since:             Snapshot token, recorded by snapshot() of the config
+        :return:                Delta with only changed items of: 'renames' (old and new names),
+                                'deleted' (profiles names), 'defaults' and 'data' (fields raw
+                                values), 'profiles' (changed profiles fields raw values),
+                                'replaced' (whole profiles fields raw values), 'active' (profile)
+        :raise InputError:      If wrong arguments provided
+        :raise IOExportError:   If errors during export"""
+        current = self._current(since, 'export_delta')
+        profiles, active, renames = self._baseline(since)
+
+        def changed(prev: fields_t[str], curr: fields_t[str]) -> fields_t[str]:
+            return {k: v for k, v in curr.items() if prev.get(k, _UNIQUE) != v}
+
+        # Changed items
+        delta: dict[str, Any] = {'renames': renames,
+                                 'deleted': [k for k in profiles if k not in current.profiles],
+                                 'defaults': changed(since.defaults, current.defaults),
+                                 'data': changed(since.data or {}, current.data or {}),
+                                 'profiles': {}, 'replaced': {}}
+        for name, (full, raw) in current.profiles.items():
+            prev = profiles.get(name)
+            if prev is None or prev[0] != full or prev[1].keys() != raw.keys():
+                delta['replaced'][name] = raw
+            elif raw_changed := changed(prev[1], raw):
+                delta['profiles'][name] = raw_changed
+        if current.active != active:
+            delta['active'] = current.active
+        return {k: v for k, v in delta.items() if v or k == 'active'}
+
+    def _iter_diff(self, since: Snapshot) -> Iterator[tuple[str, str | None, str | None, Any, Any]]:
+        """Get config changes since recorded snapshot by raw values comparison, see
+        cfg.iter_diff(). Previous values are imported from snapshot raw values"""
+        cfg = self._cfg
+        fields = cfg.get_fields
+        current = self._current(since, 'iter_diff')
+        profiles, active, renames = self._baseline(since)
+        imp = self.import_field
+
+        def changed(kind: str, name: str | None, prev: fields_t[str], curr: fields_t[str],
+                    values: fields_t):
+            for key, raw in curr.items():
+                if prev[key] != raw:
+                    yield kind, name, key, imp(key, prev[key]), values[key]
+
+        if current.active != active:
+            yield 'active', None, None, active, current.active
+        yield from (('renamed', new, None, old, new) for old, new in renames)
+        for name, (full, raw) in profiles.items():
+            curr = current.profiles.get(name)
+            if curr is None or curr[0] != full or curr[1].keys() != raw.keys():
+                yield 'removed', name, None, {k: imp(k, v) for k, v in raw.items()}, None
+        yield from changed('defaults', None, since.defaults, current.defaults, cfg.get_defaults)
+        if since.data is not None and current.data is not None:
+            yield from changed('fields', None, since.data, current.data, cfg.get_data)
+        for name, (full, raw) in current.profiles.items():
+            prev = profiles.get(name)
+            values = as_dict(cfg.profiles[name], fields)
+            if prev is None or prev[0] != full or prev[1].keys() != raw.keys():
+                yield 'added', name, None, None, values
             else:
-                cfg._set_fields(data)   # noqa
+                yield from changed('profiles', name, prev[1], raw, values)
+
+    def apply_delta(self, delta: Mapping[str, Any], typecast=True):
+        """Apply config changes, exported by export_delta() of the config with the same state.
+        Delta is checked and imported before any config change
+        :arg delta:             Delta from export_delta()
+        :arg typecast:          Force field type if field import_func result has any other type
+        :raise InputError:      If wrong arguments provided
+        :raise IOImportError:   Any other error"""
+        cfg = self._cfg
+        profiles = cfg.profiles
+        fields = cfg.get_fields
+        ie = (f'{self!r}.apply_delta()', 'delta')
+        check_type(delta, Mapping, input_exc=ie)
+        check_extra(delta, ('renames', 'deleted', 'defaults', 'data', 'profiles', 'replaced',
+                            'active'), 'delta key', input_exc=ie)
+        if not profiles and (wrong := [k for k in delta if k not in ('defaults', 'data')]):
+            raise fmt_exc(ie, f'Profiles disabled, but provided: {", ".join(wrong)}')
+
+        # Check profiles names in order of applying, and import all fields
+        names = {k: k for k in (profiles.get if profiles else ())}  # by names before renames
+        for old, new in delta.get('renames', ()):
+            if old not in names or new in names or new == cfg.def_sect:
+                raise fmt_exc(ie, f'Cannot rename profile {old!r} to {new!r}')
+            names = {new if k == old else k: v for k, v in names.items()}
+        for name in delta.get('deleted', ()):
+            if names.pop(name, _UNIQUE) is _UNIQUE:
+                raise fmt_exc(ie, f'Cannot delete not exists profile {name!r}')
+        changed = {}
+        for name, raw in delta.get('profiles', {}).items():
+            if name not in names:
+                raise fmt_exc(ie, f'Cannot change not exists profile {name!r}')
+            check_extra(raw, as_dict(profiles[names[name]], fields), f'{name!r} profile field',
+                        input_exc=ie)
+            changed[name] = self.import_section(raw, name, typecast)
+        replaced = {k: self.import_section(v, k, typecast)
+                    for k, v in delta.get('replaced', {}).items()}
+        defaults = self.import_section(delta.get('defaults', {}), cfg.def_sect, typecast)
+        data = self.import_section(delta.get('data', {}), cfg.name, typecast)
+        names |= {k: k for k in replaced}
+        if (active := delta.get('active', _UNIQUE)) not in (_UNIQUE, cfg.def_sect, *names):
+            raise fmt_exc(ie, f'Active profile is not provided: {active!r}')
+
+        # Apply changes
+        try:
+            with cfg._mute():  # noqa
+                for old, new in delta.get('renames', ()):
+                    next(profiles._rename(new, old))  # noqa (single config rename)
+                for name in delta.get('deleted', ()):
+                    del profiles[name]
+                if defaults:
+                    cfg.set_defaults(defaults, typecheck=False)
+                for name, items in replaced.items():
+                    profiles.set(name, items, defaults=False, typecheck=False)
+                for name, items in changed.items():
+                    profiles.set(name, as_dict(profiles[name], fields) | items, defaults=False,
+                                 typecheck=False)
+                if data:
+                    cfg._set_fields(data)  # noqa
+                if active is not _UNIQUE:
+                    profiles.switch(active)
+            cfg._notify('import')  # noqa
 
         except (InputError, IOImportError):
             raise
@@ -0,0 +1,91 @@
+"""Internal config layer file changes journal"""
+import os
+from ast import literal_eval
+from pathlib import Path
+from typing import BinaryIO
+from threading import Lock
+
+from .exceptions import FileError
+
+
+class Journal:
+    """Append-only config changes journal, used by file support structure if enabled
+    Each record is a line with tuple repr: operation name and its arguments with raw values.
+    Journal is kept opened for appending, each record is flushed to disk before return"""
+    __slots__ = ('path', 'size', '_file', '_lock')
+    path: Path
+    size: int
+    _file: BinaryIO | None
+    _lock: Lock
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.size = path.stat().st_size if path.exists() else 0
+        self._file = None
+        self._lock = Lock()
+
+    def __del__(self):
+        if hasattr(self, '_lock'):
+            self.close()
+
+    def __repr__(self):
+        return f'Journal({str(self.path)!r})'
+
+    def append(self, record: tuple) -> int:
+        """Append record to the end of journal
+        :arg record:    Operation name and its arguments
+        :return:        Journal size in bytes"""
+        data = f'{record!r}\n'.encode('utf-8')
+        with self._lock:
+            if (file := self._file) is None:
+                self._file = file = self.path.open('ab')
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+            self.size += len(data)
+            return self.size
+
+    def close(self):
+        """Close journal file, it is opened again at next append"""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if (file := self._file) is not None:
+            self._file = None
+            file.close()
+
+    def read(self) -> list[tuple]:
+        """Read all records, except torn last one (if writing was interrupted)
+        :raise FileError:   If any other record is not parsed"""
+        with self._lock:
+            if not self.path.exists():
+                return []
+            data = self.path.read_bytes()
+        records = []
+        for i, line in enumerate(data.split(b'\n')[:-1], 1):  # last line is empty or torn
+            try:
+                records.append(literal_eval(line.decode('utf-8')))
+            except Exception as e:
+                raise FileError(f'Journal "{self.path}" record {i} is not parsed: {e!r}') from e
+        return records
+
+    def trim(self, size: int | None = None):
+        """Remove records from the start of journal
+        :arg size:  Removed records size in bytes, or all records (if not provided)"""
+        with self._lock:
+            self._close()  # replaced or removed file is opened again at next append
+            if size is None or size >= self.size:
+                self.path.unlink(missing_ok=True)
+                self.size = 0
+                return
+            with self.path.open('rb') as file:
+                file.seek(size)
+                data = file.read()
+            temp = self.path.with_name(f'{self.path.name}.tmp')
+            with temp.open('wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp, self.path)
+            self.size = len(data)
@@ -4,12 +4,60 @@ from __future__ import annotations
 from copy import deepcopy
 from types import MappingProxyType
 from typing import Any, Optional, Callable, Iterable
+from functools import partial
+from collections.abc import ValuesView, ItemsView
 
 from .types import fields_t
 from .utils import Locker, check_items, check_types, as_dict_stated, check_lengths, fmt_exc
 from .exceptions import InputError, ProfilesError
 
 
+class _Loader(partial):
+    """Not loaded profile loader, with profile fields (if profile has part of fields)"""
+    fields: tuple | None = None
+
+
+class _LazyProfiles(dict):
+    """Profiles dict, with values loaded at first access by stored partial loaders
+    Not loaded values are never exposed, even in dict(), comparison or views"""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if type(value := super().__getitem__(key)) is _Loader:
+            super().__setitem__(key, value := value())
+        return value
+
+    def __iter__(self):  # disables dict internal fast copying of raw values
+        return super().__iter__()
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            super().pop(key)
+            return value
+        return super().pop(key, *default)
+
+    def values(self):
+        return ValuesView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+
 class Profiles(Locker):
     """Profiles optional structure
     Used in config support structure if enabled, for config profiles operations"""
@@ -70,13 +118,16 @@ class Profiles(Locker):
             else:
                 new_key = self._cfg.def_sect
             self.switch(new_key)
-        del self._profiles[key]
+        profile = self._profiles.pop(key)
+        self._cfg._notify('delete', key, profile)  # noqa
 
     def clear(self):
         """Delete all profiles"""
         if self.active != (default := self._cfg.def_sect):
             self.switch(default)
-        self._profiles.clear()
+        with self:
+            profiles, self._profiles = self._profiles, {}
+        self._cfg._notify('clear', profiles)  # noqa
 
     @property
     def get(self) -> MappingProxyType[str, Any]:
@@ -123,12 +174,15 @@ class Profiles(Locker):
                 cfg.set_defaults(items)
             else:
                 result = tuple(items.values()) if len(fields) == len(items) else items
+                prev = self._profiles.get(name)
                 # bug mypy: no Sequence type, tuple or fields_t in previous line
                 self._profiles[name] = deepcopy(result)                                             # type: ignore[assignment]
                 if name == self.active:
                     with self:
                         self.active_fields = tuple(items)
-                    cfg.set_fields(items)
+                    with cfg._mute():
+                        cfg.set_fields(items)
+                cfg._notify('profile', name, prev, self._profiles[name])
 
         except InputError:
             raise
@@ -147,6 +201,25 @@ class Profiles(Locker):
         else:
             self._profiles[self.active] = tuple(data.values())
 
+    def _set_lazy(self, names: Iterable[str], load: Callable, fields: dict[str, tuple]):
+        """Set profiles, loaded at first access by load(name), except already set ones
+        :arg names:     Profiles names in order
+        :arg load:      Function, that returns profile data by its name
+        :arg fields:    Fields of profiles with part of fields"""
+        lazy = _LazyProfiles()
+        for name in names:
+            dict.__setitem__(lazy, name, loader := _Loader(load, name))
+            loader.fields = fields.get(name)
+        dict.update(lazy, {k: v for k, v in dict.items(self._profiles) if k in lazy})
+        with self:
+            self._profiles = lazy
+
+    def _fields(self) -> dict[str, tuple]:
+        """Get fields of profiles with part of fields, not loaded profiles are kept not loaded"""
+        return {k: v.fields if type(v) is _Loader else tuple(v)
+                for k, v in dict.items(self._profiles)
+                if isinstance(v, dict) or type(v) is _Loader and v.fields is not None}
+
     def _name_error(self, input_exc, name):
         return fmt_exc(input_exc, f'{name!r} profile in {self._cfg.name!r} config is not exists',
                        available=tuple(self._profiles))
@@ -184,7 +257,10 @@ class Profiles(Locker):
     def _rename_raw(self, new_name, old_name):
         if old_name == self.active:
             self.active = new_name
-        self._profiles = {new_name if k == old_name else k: v for k, v in self._profiles.items()}
+        items = [(new_name if k == old_name else k, v) for k, v in dict.items(self._profiles)]
+        self._profiles.clear()
+        dict.update(self._profiles, items)  # not loaded profiles are kept not loaded
+        self._cfg._notify('rename', new_name, old_name)  # noqa
 
     def _rename(self, new_name, old_name):
         if old_name not in self._profiles:
@@ -225,10 +301,13 @@ class Profiles(Locker):
 
         fields = cfg.get_fields
         mapping, data_dict = as_dict_stated(self[name], fields, strict=True)
+        prev_name = self.active
         with self:
             self.active = name
             self.active_fields = tuple(data_dict if mapping else fields)
-        [setattr(data, *kv) for kv in data_dict.items()]
+        with cfg._mute():
+            [setattr(data, *kv) for kv in data_dict.items()]
+        cfg._notify('switch', prev_name, name)
 
         if self.after_switch is not None:
             self.after_switch()
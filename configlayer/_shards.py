@@ -0,0 +1,212 @@
+"""Internal config layer sharded file support structure"""
+import os
+import shutil
+from ast import literal_eval
+from pathlib import Path
+from functools import partial
+from urllib.parse import quote
+
+from ._file import File, _scan, _fsync, _in_loop
+
+from .types import path_t, mb_holder_t, fields_t, imported_t
+from .utils import as_holder, check_extra, check_items
+from .exceptions import InitError, FileError
+
+
+class ShardedFile(File, option='file_shards'):
+    """Sharded file optional structure
+    Used instead of ini file structure if 'file_shards' option enabled. Path is a folder with index
+    file (internal and default sections) and profiles folder with own file for each profile.
+    Profiles files are loaded at first access, and saved only if changed since last save"""
+    __slots__ = ('_dirty', '_moves')
+    _key_profiles = 'profiles'  # Class constant
+    _dirty: set[str]
+    _moves: list[tuple[str | None, str | None]]
+
+    def __init__(self, cfg, path: path_t):
+        if not cfg.profiles:
+            raise InitError("Option 'file_shards' is available only for configs with profiles")
+        if wrong := [k for k in ('file_snapshot', 'file_journal') if getattr(cfg.options, k)]:
+            raise InitError(f"Option 'file_shards' does not support options: {', '.join(wrong)}")
+        self._dirty, self._moves = set(), []
+        super().__init__(cfg, path)
+
+    def _unlink(self):
+        shutil.rmtree(self.path)
+
+    def _flush(self):
+        """Flush index and profiles files with their folders to disk"""
+        [_fsync(x) for x in (self.index_path, *self.profiles_path.glob('*.ini'), self.profiles_path,
+                             self.path)]
+
+    @property
+    def index_path(self) -> Path:
+        """Get index file path, with internal and default sections"""
+        return self.path / 'index.ini'
+
+    @property
+    def profiles_path(self) -> Path:
+        """Get profiles files folder path"""
+        return self.path / 'profiles'
+
+    def profile_path(self, name: str) -> Path:
+        """Get profile file path (name is percent-encoded to be valid file name)"""
+        return self.profiles_path / f'{quote(name, safe=" ")}.ini'
+
+    def _on_change(self, op: str, *args):
+        """Track changed profiles and profiles files renames and deletions, applied at save"""
+        cfg = self._cfg
+        dirty, moves = self._dirty, self._moves
+        match op:
+            case 'set':
+                dirty.add(cfg.profiles.active)  # default section (if active) means all profiles
+            case 'defaults':
+                dirty.add(cfg.def_sect)  # all profiles, as they are saved relative to defaults
+            case 'profile':
+                dirty.add(args[0])
+            case 'rename':
+                cfg.profiles._profiles[args[0]]  # noqa (load profile before its file is renamed)
+                moves.append((args[1], args[0]))
+                dirty.discard(args[1])
+                dirty.add(args[0])  # renamed file is rewritten with renamed section
+            case 'delete':
+                moves.append((args[0], None))
+                dirty.discard(args[0])
+            case 'clear':
+                moves.append((None, None))
+                dirty.intersection_update((cfg.def_sect,))
+            case 'import':
+                moves.append((None, None))
+                dirty.add(cfg.def_sect)
+
+    def _read_file(self, path: Path) -> dict[str, dict[str, str]]:
+        """Read and decode file sections"""
+        data = path.read_bytes()
+        if (hidden_default_sect := f'_{self._cfg.def_sect}') in _scan(data, path):
+            raise FileError(f'{hidden_default_sect!r} section is forbidden, but provided')
+        config = self._get_config()
+        config.read_string(data.decode('utf-8'), str(path))
+        return {k: dict(config[k]) for k in config.sections()}
+
+    def _read_profile(self, name: str) -> dict[str, str]:
+        raw = self._read_file(path := self.profile_path(name))
+        if name not in raw:
+            raise FileError(f'Profile {name!r} section is not provided in "{path}"')
+        return raw[name]
+
+    def _load_profile(self, name: str, defaults: dict, active_fields: dict) -> tuple | dict:
+        """Load profile from its file, in the same way as io.import_config() does"""
+        with self._locked(False):
+            data = self._cfg.io.import_section(self._read_profile(name), name)
+        if af := active_fields.get(name):
+            check_items(data, af, f'{name!r} profile field')
+            return {k: v for k, v in data.items() if k in af}
+        return tuple((defaults | data).values())
+
+    @File._exc('Save to')  # noqa
+    def save(self, sections: mb_holder_t[str] | None = None, *,
+             strict_defaults=False, strict_data=False):
+        """Save index file and changed (or selected) profiles files, with profiles files renames
+        and deletions. All profiles are saved, if defaults are changed or config is imported
+        :arg sections:          Selected profile name(s) or changed (if not provided)
+        :arg strict_defaults:   Save all fields from default section (not skip equal to factory)
+        :arg strict_data:       Save all fields from profiles (not skip equal to default)
+        :raise InputError:      If wrong arguments provided
+        :raise IOExportError:   If errors during export_config"""
+        self._store(sections, self._prepare(sections, strict_defaults, strict_data))
+
+    def _prepare(self, sections: mb_holder_t[str] | None, strict_defaults: bool, strict_data: bool
+                 ) -> tuple[dict[str, bytes], bytes, list[tuple[str | None, str | None]], set[str]]:
+        """Get rendered profiles and index file, pending files moves and taken changes"""
+        cfg, dirty = self._cfg, self._dirty
+        io = cfg.io
+        names = tuple(cfg.profiles.get)
+        selected: tuple[str, ...]
+        if sections is not None:
+            selected = tuple(as_holder(sections))                                                   # type: ignore[arg-type]
+        elif cfg.def_sect in dirty or not self.path.exists():
+            selected = names
+        else:
+            selected = tuple(k for k in names if k in dirty)
+        raw = io.export_config(selected, strict_defaults=strict_defaults, strict_data=strict_data,
+                               typecast=True)
+        index = {k: raw.pop(k) for k in (io._key_section, cfg.def_sect)}  # noqa
+        index[io._key_section][self._key_profiles] = repr(list(names))  # noqa
+
+        # Take changes and moves, they are returned back if storing failed
+        taken = set(dirty) if sections is None else dirty.intersection(selected)
+        dirty.difference_update(taken)
+        moves = self._moves.copy()
+        self._moves.clear()
+        return self._render(raw), b''.join(self._render(index).values()), moves, taken
+
+    def _store(self, sections: mb_holder_t[str] | None,
+               prepared: tuple[dict[str, bytes], bytes, list, set[str]]):
+        rendered, index, moves, taken = prepared
+        try:
+            with self._locked(True):
+                self.path.mkdir(exist_ok=True)
+                self.profiles_path.mkdir(exist_ok=True)
+                for old, new in moves:
+                    if old is None:
+                        for file in self.profiles_path.glob('*.ini'):
+                            file.unlink()
+                    elif new is None:
+                        self.profile_path(old).unlink(missing_ok=True)
+                    elif (path := self.profile_path(old)).exists():
+                        os.replace(path, self.profile_path(new))
+                for name, data in rendered.items():
+                    self.profile_path(name).write_bytes(data)
+                self.index_path.write_bytes(index)
+        except BaseException:
+            self._dirty.update(taken)
+            self._moves[:0] = moves
+            raise
+
+    def _read(self, sections: mb_holder_t[str] | None = None  # type: ignore[override]
+              ) -> tuple[imported_t, tuple[list[str], partial, dict[str, tuple]]]:
+        """Read and import index file with active profile file without applying
+        :return:    Imported data, profiles names, not loaded profiles loader and fields of profiles
+                    with part of fields"""
+        io = self._cfg.io
+        raw: dict[str, fields_t[str]] = self._read_file(self.index_path)
+        support = raw.get(io._key_section, {})  # noqa
+        names = list(literal_eval(support.pop(self._key_profiles, '[]')))
+        active_fields = dict(literal_eval(support.pop(io._key_fields, '{}')))  # noqa
+        if sections is not None:
+            selected: list[str] = list(as_holder(sections))                                         # type: ignore[arg-type]
+            check_extra(selected, names, 'section', input_exc=(f'{self!r}.load()', 'sections'))
+            names = selected
+
+        # Active profile is imported with index, other ones - at first access
+        if (active := literal_eval(support.get(io._key_profile, 'None'))) in names:  # noqa
+            raw[active] = self._read_profile(active)
+            if active in active_fields:
+                support[io._key_fields] = repr({active: active_fields[active]})  # noqa
+        imported = _in_loop(io._import_config, raw)  # noqa
+        return imported, (names, partial(self._load_profile, defaults=imported[1],
+                                         active_fields=active_fields), active_fields)
+
+    @File._exc('Load from')  # noqa
+    def load(self, sections: mb_holder_t[str] | None = None):
+        """Load index file and active profile file, other profiles files are loaded at first access
+        :arg sections:          Selected profile name(s) or all (if not provided)
+        :raise InputError:      If wrong arguments provided
+        :raise IOImportError:   If errors during import_config
+        :raise FileError:       If file contains forbidden default section"""
+        self._apply(self._fetch(sections))
+
+    def _fetch(self, sections: mb_holder_t[str] | None
+               ) -> tuple[imported_t, tuple[list[str], partial, dict[str, tuple]]]:
+        with self._locked(False):
+            return self._read(sections)
+
+    def _apply(self, fetched: tuple[imported_t, tuple[list[str], partial, dict[str, tuple]]]):
+        cfg = self._cfg
+        imported, (names, load, fields) = fetched
+        with cfg._mute():
+            cfg.io._apply_config(imported)  # noqa
+            cfg.profiles._set_lazy(names, load, fields)  # noqa
+        self._dirty.clear()
+        self._moves.clear()
+        cfg._notify('load')
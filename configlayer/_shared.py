@@ -0,0 +1,240 @@
+"""Internal config layer shared file support structure"""
+import os
+from threading import RLock
+from contextlib import contextmanager
+from typing import Mapping
+from pathlib import Path
+from weakref import WeakValueDictionary
+from functools import partial
+from configparser import ConfigParser
+
+from ._file import File, _LazySection, _flocked, _fsync, _in_loop, _scan, _READ_ATTEMPTS
+
+from .types import path_t, mb_holder_t, fields_t, imported_t
+from .constants import DEFAULT_SECTION
+from .exceptions import InitError, FileError
+from .utils import Locker
+
+
+# Hidden ConfigParser default section name, forbidden in shared file
+_HIDDEN_DEFAULT_SECT = f'_{DEFAULT_SECTION}'
+
+
+class _SharedMember(File):
+    """Shared file member optional structure
+    Used in config support structure instead of file structure, if shared file provided as path.
+    Config sections are stored with config name prefix, except data section named as config"""
+    __slots__ = ('store', '__weakref__')
+    store: 'SharedFile'
+
+    def __init__(self, cfg, store: 'SharedFile'):
+        if cfg.profiles:
+            raise InitError('Shared file is available only for configs with disabled profiles')
+        if wrong := [k for k in ('file_snapshot', 'file_journal') if getattr(cfg.options, k)]:
+            raise InitError(f'Shared file does not support options: {", ".join(wrong)}')
+
+        self._cfg, self.store, self.path = cfg, store, store.path
+        self._index, self._stamp, self._removed, self._journal = {}, None, set(), None
+        self._compactor, self._generation, self._lock = None, 0, store._lock  # noqa
+        self._asaves, self._awriting = {}, None
+        store._register(self)  # noqa
+        if self._own(store._parse()):  # noqa
+            self.load()
+
+        # Locks structure for changes with disabling attribute deletion and unlocked index
+        Locker.__init__(self, '_index', '_stamp', '_removed', '_compactor', '_generation',
+                        '_awriting', del_attr=False)
+
+    def __del__(self):
+        """Remove config from shared file members at config deletion"""
+        if hasattr(self, 'store') and self.store._members.get(self._cfg.name) is self:  # noqa
+            del self.store._members[self._cfg.name]  # noqa
+
+    def _section(self, name: str) -> str:
+        """Get shared file section name of config section"""
+        return name if name == self._cfg.name else f'{self._cfg.name}:{name}'
+
+    def _own(self, raw_config: Mapping[str, Mapping[str, str]]) -> dict[str, Mapping[str, str]]:
+        """Get config sections from shared file sections"""
+        name = self._cfg.name
+        prefix = f'{name}:'
+        return {k if k == name else k[len(prefix):]: v for k, v in raw_config.items()
+                if k == name or k.startswith(prefix)}
+
+    def _locked(self, exclusive: bool):
+        return self.store._locked(exclusive)  # noqa
+
+    def _render(self, raw_config: dict[str, fields_t[str]]) -> dict[str, bytes]:
+        return super()._render({self._section(k): v for k, v in raw_config.items()})
+
+    def _write(self, rendered: dict[str, bytes]):
+        self.store._update(rendered)  # noqa
+
+    def _patch(self, rendered: dict[str, bytes], removed: set[str]):
+        self.store._update(rendered)  # noqa (no profiles to remove)
+
+    def _read(self, sections: mb_holder_t[str] | None = None) -> tuple[imported_t, None]:
+        """Import config sections of shared file without applying"""
+        if not (raw := self._own(self.store._parse())):  # noqa
+            raise FileError(f'{self._cfg.name!r} {self._cfg.type_name} sections are not found')
+        return _in_loop(self._cfg.io._import_config, raw, sections), None  # noqa
+
+
+class SharedFile(Locker):
+    """Shared file structure
+    Provided as path to several configs with disabled profiles, to store them in single ini file.
+    File is read and indexed once for all configs (until it is changed), and written atomically,
+    with all configs at save() or with selected one at its cfg.file.save()"""
+    __slots__ = ('_members', '_data', '_index', '_raw', '_stamp', '_lock', 'path')
+    _file_type = _SharedMember  # Class constant (file structure of configs with shared file)
+    _members: WeakValueDictionary
+    _data: bytes
+    _index: dict[str, tuple[int, int]]
+    _raw: dict[str, _LazySection]
+    _stamp: tuple[int, int, int] | None
+    _lock: RLock
+    path: Path
+
+    def __init__(self, path: path_t):
+        """
+        :arg path:          Shared file path to load from or save to
+        :raise InitError:   If path is already used
+        :raise FileError:   If path is not exists and file cannot be created"""
+        if (path := Path(path)) in (used := File._used_paths):  # noqa
+            raise InitError(f'Path "{path}" is already used in {used[path]!r} config')
+
+        self.path = path
+        self._members = WeakValueDictionary()
+        self._data, self._index, self._raw, self._stamp = b'', {}, {}, None
+        self._lock = RLock()
+        if not path.exists():
+            self._check()
+        File._used_paths[path] = type(self).__name__  # noqa
+
+        # Locks structure for changes with disabling attribute deletion and unlocked file data
+        super().__init__('_data', '_index', '_raw', '_stamp', del_attr=False)
+
+    def __del__(self):
+        """Remove path from used at shared file deletion"""
+        if hasattr(self, 'path'):
+            File._used_paths.pop(self.path, None)  # noqa
+
+    def __repr__(self):
+        return f'SharedFile({str(self.path)!r})'
+
+    def __str__(self):
+        return f'Shared file "{self.path}" of {", ".join(map(repr, self._members)) or "no"} configs'
+
+    @File._exc('Save to')  # noqa
+    def _check(self):
+        self.path.write_bytes(b'')  # Create "empty" file for path correctness check
+        self.path.unlink()          # Remove "empty" file, folder is not created
+
+    def _register(self, member: _SharedMember):
+        name = member._cfg.name  # noqa
+        if name in self._members:
+            raise InitError(f'Config name {name!r} is already used in {self!r}')
+        self._members[name] = member
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold thread lock and advisory lock, if 'file_lock' option enabled in any member"""
+        with self._lock:
+            if not any(x._cfg.options.file_lock for x in self._members.values()):  # noqa
+                yield
+                return
+            with _flocked(self.path.with_name(f'{self.path.name}.lock'), exclusive):
+                yield
+
+    def _get_stamp(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _decode(self, data: bytes, name: str, begin: int, end: int) -> dict[str, str]:
+        config = ConfigParser(default_section=_HIDDEN_DEFAULT_SECT)
+        config.optionxform = str  # type: ignore[assignment,method-assign]
+        config.read_string(data[begin:end].decode('utf-8'), str(self.path))
+        return dict(config[name]) if name else {}
+
+    def _set(self, data: bytes, stamp: tuple[int, int, int] | None):
+        """Set file data with its sections index and lazy decoded sections"""
+        index = _scan(data, self.path)
+        self._decode(data, '', 0, min((x[0] for x in index.values()), default=len(data)))
+        if _HIDDEN_DEFAULT_SECT in index:
+            raise FileError(f'{_HIDDEN_DEFAULT_SECT!r} section is forbidden, but provided')
+        self._data, self._index, self._stamp = data, index, stamp
+        self._raw = {k: _LazySection(partial(self._decode, data, k, *v)) for k, v in index.items()}
+
+    def _parse(self) -> dict[str, _LazySection]:
+        """Get sections of file, it is read and indexed again only if changed since last time"""
+        with self._lock:
+            for _ in range(_READ_ATTEMPTS):
+                if (stamp := self._get_stamp()) == self._stamp:
+                    return self._raw
+                data = self.path.read_bytes() if stamp else b''
+                if self._get_stamp() == stamp:
+                    self._set(data, stamp)
+                    return self._raw
+            raise FileError(f'File is changed during each of {_READ_ATTEMPTS} reading attempts')
+
+    def _update(self, rendered: dict[str, bytes]):
+        """Replace provided sections in file and write it atomically, other sections are kept"""
+        with self._lock:
+            self._parse()
+            data, index = self._data, self._index
+            chunks = [data[:min((x[0] for x in index.values()), default=len(data))]]
+            chunks += [rendered.get(k) or data[b:e] for k, (b, e) in index.items()]
+            chunks += [v for k, v in rendered.items() if k not in index]
+            data = b''.join(chunks)
+
+            temp = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            try:
+                temp.write_bytes(data)
+                os.replace(temp, self.path)
+            except BaseException:
+                temp.unlink(missing_ok=True)
+                raise
+            self._set(data, self._get_stamp())
+
+    @File._exc('Save to')  # noqa
+    def save(self, *, strict_defaults=False, strict_data=False):
+        """Save all configs to file in single write, sections of other configs are kept as is
+        :arg strict_defaults:   Save all fields from default sections (not skip equal to factory)
+        :arg strict_data:       Save all fields from data sections (not skip equal to default)
+        :raise IOExportError:   If errors during export_config"""
+        self._store(None, self._prepare(None, strict_defaults, strict_data))
+
+    def _prepare(self, sections: None, strict_defaults: bool, strict_data: bool
+                 ) -> dict[str, bytes]:
+        """Get rendered sections of all configs at save (configs are exported, not thread safe)"""
+        rendered: dict[str, bytes] = {}
+        for member in list(self._members.values()):
+            rendered |= member._render(member._cfg.io.export_config(  # noqa
+                sections, strict_defaults=strict_defaults, strict_data=strict_data, typecast=True))
+        return rendered
+
+    def _store(self, sections: None, rendered: dict[str, bytes]):
+        """Write rendered sections of all configs at save (file is written, thread safe)"""
+        with self._locked(True):
+            self._update(rendered)
+
+    def _flush(self):
+        """Flush saved file to disk (its folder entry is flushed separately)"""
+        _fsync(self.path)
+
+    @File._exc('Load from')  # noqa
+    def load(self):
+        """Load all configs, which sections are provided in file, from single file reading
+        :raise IOImportError:   If errors during import_config
+        :raise FileError:       If file contains forbidden default section"""
+        members = list(self._members.values())
+        with self._locked(False):
+            raw = self._parse()
+            imported = [(x._cfg, x._read()[0]) for x in members if x._own(raw)]  # noqa
+        for cfg, data in imported:
+            with cfg._mute():  # noqa
+                cfg.io._apply_config(data)  # noqa
+            cfg._notify('load')  # noqa
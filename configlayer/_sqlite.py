@@ -0,0 +1,83 @@
+"""Internal config layer SQLite file support structure"""
+import sqlite3
+from typing import Iterator
+from functools import partial
+from contextlib import contextmanager
+
+from ._file import File, _LazySection, _in_loop
+
+from .types import mb_holder_t, fields_t, imported_t
+
+
+_SCHEMA = ('CREATE TABLE IF NOT EXISTS sections ('
+           'name TEXT PRIMARY KEY, position INTEGER NOT NULL)',
+           'CREATE TABLE IF NOT EXISTS fields ('
+           'section TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+           'position INTEGER NOT NULL, PRIMARY KEY (section, key)) WITHOUT ROWID')
+
+
+class SQLiteFile(File, suffixes=('.db', '.sqlite', '.sqlite3')):
+    """SQLite file optional structure
+    Used instead of ini file structure for paths with database suffix. Each exported field is
+    stored as a row, so selected sections are loaded by index and saved in single transaction"""
+    __slots__ = ()
+
+    @contextmanager
+    def _transaction(self, write: bool) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('BEGIN IMMEDIATE' if write else 'BEGIN')
+            try:
+                if write:
+                    [db.execute(x) for x in _SCHEMA]
+                yield db
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+        finally:
+            db.close()
+
+    def _render(self, raw_config: dict[str, fields_t[str]]                                        # type: ignore[override]
+                ) -> dict[str, fields_t[str]]:
+        return raw_config
+
+    @staticmethod
+    def _insert(db: sqlite3.Connection, raw_config: dict[str, fields_t[str]], position: int):
+        db.executemany('INSERT INTO sections VALUES (?, ?)',
+                       ((k, i) for i, k in enumerate(raw_config, position)))
+        db.executemany('INSERT INTO fields VALUES (?, ?, ?, ?)',
+                       ((name, k, v, i) for name, section in raw_config.items()
+                        for i, (k, v) in enumerate(section.items())))
+
+    def _write(self, rendered: dict[str, fields_t[str]]):                                          # type: ignore[override]
+        with self._transaction(True) as db:
+            db.execute('DELETE FROM fields')
+            db.execute('DELETE FROM sections')
+            self._insert(db, rendered, 0)
+
+    def _patch(self, rendered: dict[str, fields_t[str]], removed: set[str]):                       # type: ignore[override]
+        with self._transaction(True) as db:
+            exists = dict(db.execute('SELECT name, position FROM sections'))
+            dropped = [(x,) for x in removed if x in exists and x not in rendered]
+            db.executemany('DELETE FROM fields WHERE section = ?', dropped)
+            db.executemany('DELETE FROM sections WHERE name = ?', dropped)
+            for name, section in rendered.items():
+                db.execute('DELETE FROM fields WHERE section = ?', (name,))
+                db.executemany('INSERT INTO fields VALUES (?, ?, ?, ?)',
+                               ((name, k, v, i) for i, (k, v) in enumerate(section.items())))
+            self._insert(db, {k: {} for k in rendered if k not in exists},
+                         max(exists.values(), default=-1) + 1)
+
+    @staticmethod
+    def _query(db: sqlite3.Connection, name: str) -> dict[str, str]:
+        return dict(db.execute('SELECT key, value FROM fields WHERE section = ? ORDER BY position',
+                               (name,)))
+
+    def _read(self, sections: mb_holder_t[str] | None = None) -> tuple[imported_t, None]:
+        """Read and import file data without applying, only imported sections are queried"""
+        with self._transaction(False) as db:
+            names = [x for x, in db.execute('SELECT name FROM sections ORDER BY position')]
+            raw = {k: _LazySection(partial(self._query, db, k)) for k in names}
+            return _in_loop(self._cfg.io._import_config, raw, sections), None  # noqa
@@ -0,0 +1,188 @@
+"""Internal config layer binary wire format support functions
+Format: header (magic, schema digest, sections count), keys table (fields names and other section
+keys, in order of appearance), then sections by name and payload length, payload is bitmap of
+present keys (by table positions), then type tagged values in table order. Values of native field
+types are stored as tagged primitives or containers, others - as exported raw strings. Lengths,
+counts and integers are variable length (integers are zigzag encoded), floats are 8 bytes"""
+import struct
+from typing import Any
+from functools import partial
+
+from ._file import _LazySection
+
+
+# Header with format magic, config schema digest and sections count
+_MAGIC = b'CLW1'
+_HEADER = struct.Struct('<4s16sI')
+
+# Primitives
+_U32 = struct.Struct('<I')  # section payload length
+_F64 = struct.Struct('<d')
+
+
+def wire_native(value: Any) -> bool:
+    """Check that value is stored in wire format without changes"""
+    if value is None or (t := type(value)) in (bool, int, float, str):
+        return True
+    if t is list:
+        return all(map(wire_native, value))
+    if t is dict:
+        return all(wire_native(k) and wire_native(v) for k, v in value.items())
+    return False
+
+
+def _pack_uint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _pack_str(out: bytearray, value: str):
+    data = value.encode('utf-8')
+    _pack_uint(out, len(data))
+    out += data
+
+
+def _pack(out: bytearray, value: Any):
+    t = type(value)
+    if t is str:
+        out += b's'
+        _pack_str(out, value)
+    elif value is None:
+        out += b'n'
+    elif t is bool:
+        out += b't' if value else b'f'
+    elif t is int:
+        out += b'i'
+        _pack_uint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif t is float:
+        out += b'd'
+        out += _F64.pack(value)
+    elif t is list:
+        out += b'l'
+        _pack_uint(out, len(value))
+        [_pack(out, x) for x in value]
+    else:
+        out += b'm'
+        _pack_uint(out, len(value))
+        for k, v in value.items():
+            _pack(out, k)
+            _pack(out, v)
+
+
+def pack(schema: bytes, raw_config: dict[str, dict[str, Any]]) -> bytes:
+    """Get wire format data of exported config"""
+    out = bytearray(_HEADER.pack(_MAGIC, schema, len(raw_config)))
+    keys = tuple({k: None for x in raw_config.values() for k in x})
+    _pack_uint(out, len(keys))
+    [_pack_str(out, x) for x in keys]
+    empty = bytes((len(keys) + 7) >> 3)
+    for name, raw_section in raw_config.items():
+        _pack_str(out, name)
+        start = len(out)
+        out += _U32.pack(0)  # payload length, filled after payload
+        bitmap = start + _U32.size
+        out += empty
+        for i, key in enumerate(keys):
+            if key in raw_section:
+                out[bitmap + (i >> 3)] |= 1 << (i & 7)
+                _pack(out, raw_section[key])
+        _U32.pack_into(out, start, len(out) - bitmap)
+    return bytes(out)
+
+
+def _unpack_uint(data: memoryview, pos: int) -> tuple[int, int]:
+    if (byte := data[pos]) < 0x80:
+        return byte, pos + 1
+    value, shift = byte & 0x7F, 7
+    while True:
+        pos += 1
+        value |= ((byte := data[pos]) & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos + 1
+        shift += 7
+
+
+def _unpack_str(data: memoryview, pos: int) -> tuple[str, int]:
+    size, pos = _unpack_uint(data, pos)
+    return str(data[pos:pos + size], 'utf-8'), pos + size
+
+
+def _unpack(data: memoryview, pos: int) -> tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    match tag:
+        case 0x73:  # s
+            return _unpack_str(data, pos)
+        case 0x6E:  # n
+            return None, pos
+        case 0x74:  # t
+            return True, pos
+        case 0x66:  # f
+            return False, pos
+        case 0x69:  # i
+            value, pos = _unpack_uint(data, pos)
+            return -((value + 1) >> 1) if value & 1 else value >> 1, pos
+        case 0x64:  # d
+            return _F64.unpack_from(data, pos)[0], pos + _F64.size
+        case 0x6C:  # l
+            count, pos = _unpack_uint(data, pos)
+            result = []
+            for _ in range(count):
+                value, pos = _unpack(data, pos)
+                result.append(value)
+            return result, pos
+        case 0x6D:  # m
+            count, pos = _unpack_uint(data, pos)
+            mapping = {}
+            for _ in range(count):
+                key, pos = _unpack(data, pos)
+                mapping[key], pos = _unpack(data, pos)
+            return mapping, pos
+    raise ValueError(f'Unknown value tag {tag:#x} at {pos - 1}')
+
+
+def unpack_section(keys: tuple[str, ...], data: memoryview, begin: int, end: int
+                   ) -> dict[str, Any]:
+    """Decode section payload"""
+    pos = begin + ((len(keys) + 7) >> 3)
+    result = {}
+    for i, key in enumerate(keys):
+        if data[begin + (i >> 3)] >> (i & 7) & 1:
+            result[key], pos = _unpack(data, pos)
+    if pos != end:
+        raise ValueError(f'Section payload size {end - begin} is not matched to decoded')
+    return result
+
+
+def unpack(data: bytes | memoryview, schema: bytes) -> dict[str, _LazySection]:
+    """Get sections of wire format data, decoded at first access (data is not copied)
+    :raise ValueError:  If data header is wrong or schema is not matched"""
+    data = memoryview(data).cast('B')
+    if len(data) < _HEADER.size:
+        raise ValueError(f'Data size {len(data)} is less than header size {_HEADER.size}')
+    magic, digest, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError(f'Wrong format magic {magic!r}, must be {_MAGIC!r}')
+    if digest != schema:
+        raise ValueError(f'Schema {digest.hex()} is not matched to config schema {schema.hex()}')
+
+    size, pos = _unpack_uint(data, _HEADER.size)
+    table = []
+    for _ in range(size):
+        key, pos = _unpack_str(data, pos)
+        table.append(key)
+
+    keys, sections = tuple(table), {}
+    for _ in range(count):
+        name, pos = _unpack_str(data, pos)
+        size, = _U32.unpack_from(data, pos)
+        pos += _U32.size
+        if pos + size > len(data) or size < (len(keys) + 7) >> 3:
+            raise ValueError(f'Section {name!r} payload is truncated')
+        sections[name] = _LazySection(partial(unpack_section, keys, data, pos, pos + size))
+        pos += size
+    if pos != len(data):
+        raise ValueError(f'Extra {len(data) - pos} bytes after the last section')
+    return sections
@@ -6,7 +6,7 @@ from pathlib import Path
 from dataclasses import dataclass
 
 
-__all__ = ('path_t', 'state_t', 'holder_t', 'mb_holder_t', 'fields_t', 'on_set_t',
+__all__ = ('path_t', 'state_t', 'holder_t', 'mb_holder_t', 'fields_t', 'on_set_t', 'imported_t',
            'ClsObj', 'ItemError', 'ValidWrong', 'Field')
 
 
@@ -21,6 +21,7 @@ mb_holder_t: TypeAlias = T | Iterable[T] | Sequence[T]  # Maybe holder_t, as_hol
 
 fields_t = dict[str, T]                         # Fields holder type
 on_set_t = tuple[mb_holder_t[str] | None, bool, Callable[[str, Any, Any], None]]
+imported_t = tuple[str | None, fields_t, fields_t]   # Imported active profile, defaults and data
 
 
 class ClsObj(NamedTuple):
@@ -51,8 +52,13 @@ class ValidWrong(tuple):
 class Field:
     """Field additional descriptor's holder
     Used if custom export/import functions needed at value declaration of inherited ConfigBase
+    Optional batch functions are used by io.export_config() and io.import_config() for all
+    field values (or raw values) of exported (or imported) sections at once, instead of export_func
+    and import_func, they must return the same results in the same order
     Also used internally in ConfigBase"""
     default: Any
     export_func: Callable = repr
     import_func: Callable = literal_eval
     type: type = object  # internal usage, filled at ConfigBase init
+    export_many: Callable[[list], Iterable[str]] | None = None
+    import_many: Callable[[list[str]], Iterable] | None = None
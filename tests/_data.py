@@ -193,6 +193,29 @@ class WrongImportResult(ConfigBase):
     test: int = Field(5, import_func=increment_str)                                  # type: ignore
 
 
+batch_calls: list[tuple[str, list]] = []
+
+
+def export_hex(values: list) -> list[str]:
+    batch_calls.append(('export', values))
+    return [hex(x) for x in values]
+
+
+def import_hex(raw_values: list[str]) -> list[int]:
+    batch_calls.append(('import', raw_values))
+    return [int(x, 16) for x in raw_values]
+
+
+class BatchIO(ConfigBase):
+    v_hex: int = Field(15, hex, lambda x: int(x, 16),                                # type: ignore
+                       export_many=export_hex, import_many=import_hex)
+    v_int: int = 0
+
+
+class WrongBatch(ConfigBase):
+    test: int = Field(15, hex, lambda x: int(x, 16), export_many=lambda x: [])       # type: ignore
+
+
 class ExportSensitive(ConfigBase):
     f1: int = Field(2, lambda x: repr(x) if isinstance(x, int) else x)               # type: ignore
     f2: dict = Field({2: 2}, lambda x: repr(x) if isinstance(x, dict) else x)        # type: ignore
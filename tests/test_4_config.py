@@ -303,3 +303,88 @@ def test_options():
                           failed=False),
                setattr, config, 'v_str', 'other')
         assert config.v_str == result2
+
+
+def test_history():
+    assert Config1().cfg.history is None
+    raises(init('config', InputError('history', must_be='not negative int',
+                                     received='-1 (int)'), Config1, history=-1),
+           Config1, history=-1)
+
+    data = Config1(profiles=True, history=4)
+    cfg, history = data.cfg, data.cfg.history
+    assert (len(history), history.size, history.redo_count, history.undo()) == (0, 4, 0, 0)
+
+    # Each change is reverted and applied again
+    states = []
+    for func, *args in ((setattr, data, 'v_int', 1),
+                        (cfg.set_defaults, {'v_str': 'def'}),
+                        (cfg.profiles.set, 'p1', {'v_int': 2}),
+                        (partial(cfg.profiles.set, defaults=False), 'p2', {'v_bool': True}),
+                        (cfg.profiles.switch, 'p2'),
+                        (setattr, data, 'v_bool', False),
+                        (cfg.profiles.rename, 'p3', 'p2'),
+                        (cfg.profiles.set, 'p1', {'v_int': 3}),
+                        (cfg.profiles.__delitem__, 'p3'),  # switch to p1 and delete
+                        (cfg.profiles.clear,)):  # switch to default and clear
+        states.append((cfg.get_data, cfg.get_defaults, cfg.profiles.active,
+                       dict(cfg.profiles.get)))
+        func(*args)
+    states.append((cfg.get_data, cfg.get_defaults, cfg.profiles.active, dict(cfg.profiles.get)))
+    assert (len(history), history.checkpoint()) == (4, 12)
+
+    def state():
+        return cfg.get_data, cfg.get_defaults, cfg.profiles.active, dict(cfg.profiles.get)
+
+    assert history.undo() == 1 and dict(cfg.profiles.get) == states[-2][3]  # not switched
+    assert cfg.profiles.active == cfg.def_sect
+    assert history.undo() == 1 and state() == states[-2]
+    assert history.undo(8) == 2 and state()[1:] == states[-3][1:] and len(history) == 0
+    assert data.v_bool is False and data.v_int == 3  # not used by p3 profile field is kept
+    raises(InputError, history.undo, 7)
+    assert history.redo(12) == 4 and state() == states[-1]
+    raises(InputError, history.redo, 13)
+
+    # New change drops reverted changes, undo and redo of field set do not record changes
+    history.undo(10)
+    data.v_float = 0.5
+    assert (history.redo_count, history.checkpoint(), len(history)) == (0, 11, 3)
+    assert history.undo() == 1 and data.v_float == 3.1415 and history.redo() == 1
+    assert data.v_float == 0.5 and len(history) == 3
+
+    # Set of equal value is not recorded, set of several fields is reverted at once
+    data.v_float = float('0.5')
+    data.v_list = data.v_list
+    assert (history.checkpoint(), len(history)) == (11, 3)
+    prev = cfg.get_data
+    cfg.set_fields({'v_int': 10, 'v_str': 'batch', 'v_float': 0.5})
+    assert (history.checkpoint(), len(history)) == (12, 4)
+    assert history.undo() == 1 and cfg.get_data == prev
+    assert history.redo() == 1 and (data.v_int, data.v_str) == (10, 'batch')
+    with history.batch():
+        data.v_int = 11
+        with history.batch():
+            data.v_int = 12
+        data.v_str = 'outer'
+    assert history.checkpoint() == 13 and history.undo() == 1
+    assert (data.v_int, data.v_str) == (10, 'batch')
+
+    # Whole history of single changes, with profiles recreated in order
+    data = Config1(profiles=True, history=100)
+    cfg = data.cfg
+    states = []
+    for func, *args in ((setattr, data, 'v_int', 1),
+                        (cfg.set_defaults, {'v_str': 'def'}),
+                        (cfg.profiles.set, 'p1', {'v_int': 2}),
+                        (partial(cfg.profiles.set, defaults=False), 'p2', {'v_bool': True}),
+                        (cfg.profiles.switch, 'p2'),
+                        (setattr, data, 'v_bool', False),
+                        (cfg.profiles.rename, 'p3', 'p2'),
+                        (cfg.profiles.set, 'p1', {'v_int': 3})):
+        states.append(state())
+        func(*args)
+    states.append(state())
+    for i in reversed(range(len(states) - 1)):
+        history = cfg.history
+        assert history.undo() == 1 and state() == states[i]
+    assert cfg.history.redo(8) == 8 and state() == states[-1]
@@ -1,14 +1,17 @@
+import json
 from functools import partial
 from itertools import product
 
 from configlayer.exceptions import (InputError, CheckValueError, CheckTypeError,
                                     FieldError, IOExportError, IOImportError)
-from configlayer.utils import safe, as_holder, is_exception
+from configlayer.utils import safe, as_holder, is_exception, as_dict
+from configlayer._io import _process_pool
 
 from _utilities import raises_init, raises, subtest
 from _data import (WrongExportRepr, WrongExportFunc, WrongExportType, WrongImportEval,
-                   WrongImportFunc, WrongImportResult, WrongReprType, ExportSensitive,
-                   Config1, Config2, Config3, Config4, Lang1, exp_strict, imp_strict, OwnInt)
+                   WrongImportFunc, WrongImportResult, WrongReprType, WrongBatch, ExportSensitive,
+                   BatchIO, Config1, Config2, Config3, Config4, Lang1, exp_strict, imp_strict,
+                   OwnInt, batch_calls)
 
 
 def test_init():
@@ -293,6 +296,14 @@ def test_export_configs():
     msg_extra = ("Extra profile: ''. "
                  "Must be not more than expected ('profile1', 'Profile 2'), but received: ''")
 
+    def stream(target, *args, **kwargs):
+        result = {}
+        for section, key, raw_value in target(*args, **kwargs):
+            raw_section = result.setdefault(section, {})
+            if key is not None:
+                raw_section[key] = raw_value
+        return result
+
     def fmt_cte(section, value):
         inner_exc = CheckTypeError(f'Field {value} (int) must be str type')
         return IOExportError(f"Cannot export 'IO' config section {section!r}. Errors:\n"
@@ -328,8 +339,14 @@ def test_export_configs():
             if profiles is None or sec_profile2 in profiles:
                 rp |= (vps2 if s_data else vp_2)
 
-        # Test both
+        # Test both, streamed export must be the same
         for name, target, result in (('simple', ecs, rs), ('profiles', ecp, rp)):
+            iterator = target.__self__.iter_export
+            if not any(map(is_exception, as_holder(result))):
+                st.send((f'Stream {name}', safe(stream, iterator, profiles, **kwargs), result))
+            elif isinstance(result, IOExportError) and profiles != '':  # profiles checked first
+                st.send((f'Stream {name}', safe(stream, iterator, profiles, **kwargs, _exc_=repr),
+                         repr(result)))
             if any(map(is_exception, results := as_holder(result))):
                 try:
                     raises(result, target, profiles, **kwargs)
@@ -687,3 +704,430 @@ def test_import_config():
     raises(IOImportError(tmpl.format(default_)), icp, {default_: {'v_bool': True}} | vs_is)
     raises(IOImportError(tmpl.format(simple__)), ics, {simple__: {'v_bool': True}})
     raises(IOImportError(tmpl.format('Some1')), icp, {'Some1': {'v_bool': True}} | vs_is | vsd)
+
+
+def test_import_stream():
+    # Prepare profiles config with active fields profile
+    e_data = Config1(io=True, profiles=True)
+    e_data.cfg.set_defaults({'v_int': 5})
+    e_data.cfg.profiles.set('p1', {'v_bool': True}, defaults=False)
+    e_data.cfg.profiles.set('p2', {'v_str': 'two'})
+    e_data.cfg.profiles.set('p3')
+    e_data.cfg.profiles.switch('p2')
+    exported = e_data.cfg.io.export_config()
+
+    # Streamed export is imported as whole exported config
+    i_data = Config1(io=True, profiles=True)
+    i_data.cfg.io.import_stream(e_data.cfg.io.iter_export())
+    assert i_data.cfg.io.export_config() == exported
+    assert i_data.cfg.profiles.get == e_data.cfg.profiles.get
+    assert i_data.cfg.profiles.active == 'p2' and i_data.v_str == 'two'
+
+    # Selected sections, not selected ones are not imported
+    records = list(e_data.cfg.io.iter_export())
+    records.append(('p4', 'v_int', "'wrong'"))
+    i_data = Config1(io=True, profiles=True)
+    i_data.cfg.io.import_stream(iter(records), ('DEFAULT', 'p2'))
+    assert tuple(i_data.cfg.profiles.get) == ('p2',) and i_data.v_int == 5
+
+    # Errors, config is not changed
+    ie = InputError('records', func_name='Config1.cfg.io.import_stream()',
+                    msg="Section records are not in a row: 'p1'")
+    raises(ie, i_data.cfg.io.import_stream, records[:-1] + [('p1', 'v_int', '1')])
+    ve = ValueError("invalid literal for int() with base 10: 'wrong'")
+    ce = CheckTypeError(f"Field 'wrong' (str) must be int type, typecast to int: {ve!r}")
+    iie = IOImportError("Cannot import 'Config1' config section 'p4'. Errors:\n"
+                        f"\tField v_int=\"'wrong'\" (str) by literal_eval: {ce!r}")
+    raises(iie, i_data.cfg.io.import_stream, records)
+    assert tuple(i_data.cfg.profiles.get) == ('p2',)
+
+
+def test_import_parallel():
+    # Fields with lambda import functions are imported by thread pool
+    e_data = Config1(io=True, profiles=True)
+    e_data.cfg.set_defaults({'v_int': 5})
+    [e_data.cfg.profiles.set(f'p{i}', {'v_cust3': i}) for i in range(8)]
+    e_data.cfg.profiles.set('a', {'v_bool': True}, defaults=False)
+    exported = e_data.cfg.io.export_config()
+    i_data = Config1(io=True, profiles=True)
+    i_data.cfg.io.import_config(exported, workers=4)
+    assert i_data.cfg.profiles.get == e_data.cfg.profiles.get
+    assert i_data.cfg.get_defaults == e_data.cfg.get_defaults
+
+    # Errors are the same as at serial import
+    for raw in ({'p3': {'v_int': "'wrong'"}, 'p5': {'v_int': '[]'}},
+                {'p2': {'wrong': '1'}},
+                {'DEFAULT': {'wrong': '1'}}):
+        wrong = exported | raw
+        expected = safe(Config1(io=True, profiles=True).cfg.io.import_config, wrong, _exc_=repr)
+        assert expected.startswith(('IOImportError', 'InputError'))
+        assert safe(i_data.cfg.io.import_config, wrong, workers=2, _exc_=repr) == expected
+
+    # Fields with picklable import functions are imported by process pool
+    lang = Lang1(io=True)
+    lang.cfg.profiles.set('en', {'some1': 'First'})
+    lang.cfg.profiles.set('de', {'some1': 'Erste', 'some2': 'Zweite'})
+    exported = lang.cfg.io.export_config()
+    lang.cfg.profiles.clear()
+    lang.cfg.io.import_config(exported, workers=2)
+    assert lang.cfg.io.export_config() == exported
+    assert lang.cfg.profiles['de'] == ('Erste', 'Zweite', 'Another')
+
+    # Process pool is created once and reused by next imports with the same workers count
+    pool = _process_pool(2)
+    lang.cfg.io.import_config(exported, workers=2)
+    assert _process_pool(2) is pool
+    assert lang.cfg.io.export_config() == exported
+
+
+def test_delta():
+    # Prepare source and receiver configs with the same state
+    e_data = Config1(io=True, profiles=True)
+    e_profiles = e_data.cfg.profiles
+    [e_profiles.set(f'p{i}', {'v_int': i}) for i in range(1, 4)]
+    e_profiles.set('a', {'v_bool': True}, defaults=False)
+    e_profiles.switch('p1')
+    i_data = Config1(io=True, profiles=True)
+    i_data.cfg.io.import_config(e_data.cfg.io.export_config())
+    since = e_data.cfg.io.snapshot()
+    assert e_data.cfg.io.export_delta(since) == {}
+
+    # Only changes are exported
+    e_profiles.rename('q2', 'p2')
+    del e_profiles['p3']
+    e_data.v_int = 7
+    e_data.cfg.set_defaults({'v_str': 'new'})
+    e_profiles.set('a', {'v_bool': False}, defaults=False)
+    e_profiles.set('p4', {'v_float': 0.5}, defaults=False)
+    e_profiles.switch('q2')
+    delta = e_data.cfg.io.export_delta(since)
+    assert delta == {'renames': [('p2', 'q2')], 'deleted': ['p3'], 'defaults': {'v_str': "'new'"},
+                     'profiles': {'p1': {'v_int': '7'}, 'a': {'v_bool': 'False'}},
+                     'replaced': {'p4': {'v_float': '0.5'}}, 'active': 'q2'}
+
+    # Delta is applied to receiver, also after serialization
+    i_data.cfg.io.apply_delta(json.loads(json.dumps(delta)))
+    assert i_data.cfg.io.export_config() == e_data.cfg.io.export_config()
+    assert i_data.cfg.profiles.get == e_profiles.get and i_data.v_int == 2
+
+    # Config without profiles
+    e_data = Config1(io=True)
+    i_data = Config1(io=True)
+    since = e_data.cfg.io.snapshot()
+    e_data.v_list = []
+    i_data.cfg.io.apply_delta(delta := e_data.cfg.io.export_delta(since))
+    assert delta == {'data': {'v_list': '[]'}} and i_data.v_list == []
+
+    # Errors, receiver is not changed
+    ie = InputError('since', func_name='Config1.cfg.io.export_delta()',
+                    must_be='snapshot of the config', received='None (NoneType)')
+    raises(ie, e_data.cfg.io.export_delta, None)
+    ie = InputError('delta', func_name='Config1.cfg.io.apply_delta()',
+                    msg='Profiles disabled, but provided: deleted')
+    raises(ie, i_data.cfg.io.apply_delta, {'data': {'v_int': '1'}, 'deleted': ['p1']})
+    assert i_data.v_int == 65535
+
+
+def test_batch():
+    # Fields with batch functions are exported and imported by all values at once
+    data = BatchIO(io=True, profiles=True)
+    [data.cfg.profiles.set(f'p{i}', {'v_hex': i, 'v_int': i}) for i in range(16, 20)]
+    data.cfg.profiles.set('a', {'v_int': 1}, defaults=False)
+    batch_calls.clear()
+    exported = data.cfg.io.export_config()
+    assert batch_calls == [('export', [16, 17, 18, 19])]
+    assert exported['p17'] == {'v_hex': '0x11', 'v_int': '17'} and exported['a'] == {'v_int': '1'}
+
+    i_data = BatchIO(io=True, profiles=True)
+    batch_calls.clear()
+    i_data.cfg.io.import_config(exported)
+    assert batch_calls == [('import', ['0x10', '0x11', '0x12', '0x13'])]
+    assert i_data.cfg.profiles.get == data.cfg.profiles.get
+
+    # Errors
+    ce = CheckValueError("'WrongBatch' config IO check failed:\n\tField test batch function "
+                         "<lambda> result [] must be equal ['0xf']")
+    raises_init((ce,), WrongBatch, io=True)
+    exported['p18']['v_hex'] = 'wrong'
+    ve = ValueError("invalid literal for int() with base 16: 'wrong'")
+    ie = IOImportError("Cannot import 'BatchIO' config. Errors:\n"
+                       f"\tField v_hex by import_hex: {ve!r}")
+    raises(ie, i_data.cfg.io.import_config, exported)
+
+
+def test_import_cache():
+    data = Config1(io=True, profiles=True)
+    io = data.cfg.io
+    raw = {'v_bool': 'True', 'v_int': '0', 'v_list': "[[1], 'a']", 'v_tuple': '(1, [2])',
+           'v_set': "{'a'}", 'v_dict': "{1: [2]}"}
+    io.import_cache_clear()
+
+    # Repeated raw values are evaluated once
+    io.import_config({'_CONFIG_LAYER': {'profile': "'p1'"}, **{f'p{i}': raw for i in range(10)}})
+    hits, misses, _, size = io.import_cache_info()
+    assert (hits, misses, size) == (54, 6, 6)
+
+    # Mutable results are copied
+    p1, p2 = (as_dict(data.cfg.profiles[k], data.cfg.get_fields) for k in ('p1', 'p2'))
+    for key in ('v_list', 'v_tuple', 'v_set', 'v_dict'):
+        assert p1[key] == p2[key] and p1[key] is not p2[key]
+    assert p1['v_list'][0] is not p2['v_list'][0] and p1['v_tuple'][1] is not p2['v_tuple'][1]
+    assert p1['v_dict'][1] is not p2['v_dict'][1]
+
+    # Long raw values are not cached
+    io.import_section({'v_str': repr('long' * 100)})
+    assert io.import_cache_info().currsize == 6
+
+
+def test_bytes():
+    # Values of all fields types round trip, native values are stored type tagged
+    data = Config1(io=True, profiles=True)
+    data.cfg.set_defaults({'v_str': 'default'})
+    data.cfg.profiles.set('p1', {'v_int': -(1 << 70), 'v_list': [1, 'a', None, {1: [2.5]}],
+                                 'v_dict': {(1, 2): 3}, 'v_set': {'x'}, 'v_cust1': OwnInt(7)})
+    data.cfg.profiles.set('p 2', {'v_bool': True, 'v_float': float('inf')}, defaults=False)
+    data.cfg.profiles.switch('p1')
+    wire = data.cfg.io.export_bytes(strict_data=True)
+    assert wire.startswith(b'CLW1' + data.cfg.io.schema)
+    assert b'[1, ' not in wire and b"{(1, 2): 3}" in wire
+    assert wire.count(b'v_int') == wire.count(b'v_list') == 1  # field names are stored once
+
+    i_data = Config1(io=True, profiles=True)
+    i_data.cfg.io.import_bytes(memoryview(wire))
+    assert i_data.cfg.io.export_config() == data.cfg.io.export_config()
+    assert i_data.cfg.profiles.get == data.cfg.profiles.get and i_data.v_int == -(1 << 70)
+
+    # Selected sections
+    i_data = Config1(io=True, profiles=True)
+    i_data.cfg.io.import_bytes(wire, ('DEFAULT', 'p1'))
+    assert tuple(i_data.cfg.profiles.get) == ('p1',)
+    assert i_data.cfg.get_defaults['v_str'] == 'default'
+
+    # Errors
+    schema, other = data.cfg.io.schema.hex(), Config4(io=True, profiles=True).cfg.io.schema.hex()
+    for wrong, msg in ((b'CLW0' + wire[4:], "Wrong format magic b'CLW0', must be b'CLW1'"),
+                       (wire[:-1], "Section 'p 2' payload is truncated"),
+                       (wire + b'\0', 'Extra 1 bytes after the last section'),
+                       (wire[:10], 'Data size 10 is less than header size 24')):
+        raises((InputError('data', func_name='Config1.cfg.io.import_bytes()', msg=msg),
+                ValueError(msg)), i_data.cfg.io.import_bytes, wrong)
+    msg = f'Schema {schema} is not matched to config schema {other}'
+    raises((InputError('data', func_name='Config4.cfg.io.import_bytes()', msg=msg),
+            ValueError(msg)), Config4(io=True, profiles=True).cfg.io.import_bytes, wire)
+
+
+def test_codec():
+    # Generated functions are cached by config class
+    data1, data2 = Config1(io=True), Config1(io=True)
+    codec = data1.cfg.io._codec  # noqa
+    assert data2.cfg.io._codec is codec  # noqa
+    assert Config2(io=True).cfg.io._codec is not codec  # noqa
+    assert data1.cfg.io.export_section(strict=True) == exp_strict
+    assert data1.cfg.io.import_section(exp_strict) == imp_strict
+
+    # Results and errors are equal to generic ones
+    fields = data1.cfg.get_fields
+    for key, value in exp_strict.items():
+        for typecast, native in product((True, False), repeat=2):
+            generic = safe(data1.cfg.io._import_field, fields[key], value, typecast, native)  # noqa
+            result = safe(codec.imports[key], value, typecast, native)
+            assert repr(result) == repr(generic)
+    raises(CheckTypeError("Field 0.5 (float) must be int type"), codec.imports['v_int'], '0.5',
+           False, False)
+    assert codec.imports['v_int']('0.5', True, False) == 0
+
+    # Functions are generated again, if field functions changed
+    fields['v_int'].export_func = hex
+    fields['v_int'].import_func = partial(int, base=16)
+    assert data1.cfg.io._codec is not codec  # noqa
+    assert data1.cfg.io.export_section() == {}
+    data1.v_int = 255
+    assert data1.cfg.io.export_section() == {'v_int': '0xff'}
+    assert data1.cfg.io.import_section({'v_int': '0xff'}) == {'v_int': 255}
+    assert data2.cfg.io._codec is not codec  # noqa
+    assert data2.cfg.io.export_section({'v_int': 255}) == {'v_int': '255'}
+
+
+def test_canonical():
+    # Values exported by repr have sorted sets and dicts items, other values are exported as is
+    data = Config1(io=True, profiles=True)
+    cfg = data.cfg
+    cfg.set_defaults({'v_set': {'c', 'a', 'b'}, 'v_dict': {2: {'y', 'x'}, 1: ({0: 1, -1: 0},)}})
+    cfg.profiles.set('p2', {'v_tuple': ({3, 1}, set()), 'v_cust3': 7})
+    cfg.profiles.set('p1', {'v_list': ['b', 'a'], 'v_str': 'x'}, defaults=False)
+    cfg.profiles.switch('p2')
+    raw = cfg.io.export_config(canonical=True)
+    assert raw == {'_CONFIG_LAYER': {'fields': "{'p1': ('v_list', 'v_str')}", 'profile': "'p2'"},
+                   'DEFAULT': {'v_dict': "{1: ({-1: 0, 0: 1},), 2: {'x', 'y'}}",
+                               'v_set': "{'a', 'b', 'c'}"},
+                   'p1': {'v_list': "['b', 'a']", 'v_str': "'x'"},
+                   'p2': {'v_cust3': '7custom', 'v_tuple': '({1, 3}, set())'}}
+    assert list(raw) == ['_CONFIG_LAYER', 'DEFAULT', 'p1', 'p2']
+    assert [list(x) for x in raw.values()] == [sorted(x) for x in raw.values()]
+
+    # Canonical export is imported as usual
+    i_data = Config1(io=True, profiles=True)
+    i_data.cfg.io.import_config(raw)
+    assert i_data.cfg.profiles.get == cfg.profiles.get
+    assert i_data.cfg.get_defaults == cfg.get_defaults
+
+    # Fingerprint is equal for configs with the same profiles, created in other order
+    other = Config1(io=True, profiles=True)
+    other.cfg.set_defaults({'v_dict': {1: ({-1: 0, 0: 1},), 2: {'x', 'y'}},
+                            'v_set': {'a', 'b', 'c'}})
+    other.cfg.profiles.set('p1', {'v_str': 'x', 'v_list': ['b', 'a']}, defaults=False)
+    other.cfg.profiles.set('p2', {'v_cust3': 7, 'v_tuple': ({1, 3}, set())})
+    assert other.cfg.io.export_config() != cfg.io.export_config()
+    assert other.cfg.io.fingerprint() != cfg.io.fingerprint()  # active profile differs
+    other.cfg.profiles.switch('p2')
+    assert other.cfg.io.fingerprint() == cfg.io.fingerprint() == i_data.cfg.io.fingerprint()
+    assert len(cfg.io.fingerprint()) == 16
+    assert cfg.io.fingerprint(strict_data=True) != cfg.io.fingerprint()
+    assert cfg.io.fingerprint('p1') != cfg.io.fingerprint()
+
+    # Any value change changes fingerprint
+    fingerprint = cfg.io.fingerprint()
+    data.v_float = 0.5
+    assert cfg.io.fingerprint() != fingerprint
+    data.v_float = 3.1415
+    assert cfg.io.fingerprint() == fingerprint
+
+
+def test_fingerprints():
+    data = Config1(io=True, profiles=True)
+    cfg = data.cfg
+    fp = cfg.io.fingerprints
+    assert cfg.io.fingerprints is fp
+
+    def check():  # incremental digests are equal to calculated again
+        state = (fp.root, fp.data, dict(fp._sections), dict(fp._nodes))  # noqa
+        fp._rebuild()  # noqa
+        assert state == (fp.root, fp.data, dict(fp._sections), dict(fp._nodes))  # noqa
+        return state[0]
+
+    # Digests are updated by each change
+    roots = [check()]
+    for func, *args in ((setattr, data, 'v_int', 5),
+                        (cfg.set_defaults, {'v_str': 'def', 'v_set': {'b', 'a'}}),
+                        (cfg.profiles.set, 'p1', {'v_int': 1}),
+                        (partial(cfg.profiles.set, defaults=False), 'p2', {'v_list': [2]}),
+                        (cfg.profiles.set, 'p3', {'v_float': 0.5, 'v_bool': True}),
+                        (cfg.profiles.switch, 'p1'),
+                        (setattr, data, 'v_dict', {3: 'c'}),
+                        (cfg.set_defaults, {'v_str': 'def2'}),
+                        (cfg.profiles.rename, 'p4', 'p2'),
+                        (cfg.profiles.set, 'p1', {'v_int': 2}),
+                        (cfg.profiles.__delitem__, 'p1'),
+                        (cfg.profiles.switch, cfg.def_sect),
+                        (setattr, data, 'v_int', 7)):
+        func(*args)
+        assert (root := check()) not in roots
+        roots.append(root)
+
+    # Section and field digests, set back of field value restores digests
+    section, field = fp.section('p3'), fp.field('p3', 'v_float')
+    cfg.profiles.switch('p3')
+    data.v_float = 1.5
+    assert fp.section('p3') != section and fp.field('p3', 'v_float') != field
+    data.v_float = 0.5
+    assert fp.section('p3') == section and fp.field('p3', 'v_float') == field
+    raises(InputError, fp.section, 'wrong')
+    raises(InputError, fp.field, 'p4', 'v_int')
+
+    # Configs with equal profiles have equal digests, in any profiles order
+    other = Config1(io=True, profiles=True)
+    other.cfg.io.import_config(cfg.io.export_config(canonical=True))
+    o_fp = other.cfg.io.fingerprints
+    assert list(other.cfg.profiles.get) != list(cfg.profiles.get)
+    assert o_fp.root == fp.root and o_fp.diff_profiles(fp) == []
+    assert other == data
+
+    # Digests are exact only for immutable fields types, as in-place changes are not tracked
+    other.v_list.append(5)
+    assert not fp.exact and o_fp.data == fp.data and other != data
+    other.v_list.pop()
+    lang, other_lang = Lang1(io=True), Lang1(io=True)
+    assert lang.cfg.io.fingerprints.exact and other_lang.cfg.io.fingerprints.exact
+    other_lang.some1 = 'changed'
+    assert lang != other_lang
+    other_lang.some1 = lang.some1
+    assert lang == other_lang
+
+    # Changed, added and deleted profiles are found by profiles tree
+    other.cfg.profiles.set('p4', {'v_list': [5]})
+    other.cfg.profiles.set('p5', {'v_int': 5})
+    del other.cfg.profiles['p3']
+    assert o_fp.diff_profiles(fp) == fp.diff_profiles(o_fp) == ['p3', 'p4', 'p5']
+    assert o_fp.root != fp.root and other != data
+    check()
+
+    # Rename to the same name keeps profile, rename to existing name replaces its digest
+    fp = o_fp
+    cfg = other.cfg
+    section, root = fp.section('p4'), fp.root
+    cfg.profiles.rename('p4', 'p4')
+    assert fp.section('p4') == section and check() == root
+    for new, old in (('p6', 'p4'), ('p4', 'p6'), ('p7', 'p4'), ('p4', 'p7')):
+        cfg.profiles.set(new, {'v_int': 6})
+        cfg.profiles.rename(new, old)
+        check()
+        assert set(fp._sections) == {None, cfg.def_sect, *cfg.profiles.get}  # noqa
+
+
+def test_diff():
+    data, other = Config1(io=True, profiles=True), Config1(io=True, profiles=True)
+    cfg = data.cfg
+    assert cfg.diff(other) == {} and cfg.diff(cfg.def_sect) == {}
+
+    # Config target, without and with fingerprints
+    cfg.set_defaults({'v_str': 'def'})
+    cfg.profiles.set('p1', {'v_int': 1})
+    cfg.profiles.set('p2', {'v_list': [2]}, defaults=False)
+    other.cfg.profiles.set('p2', {'v_list': [3]}, defaults=False)
+    other.cfg.profiles.set('p3', {'v_bool': True}, defaults=False)
+    other.cfg.profiles.switch('p2')
+    expected = {'active': ('p2', 'DEFAULT'),
+                'defaults': {'v_str': ('Some string', 'def')},
+                'fields': {'v_str': ('Some string', 'def'),
+                           'v_list': ([3], [-1, 0, 1, 'repeat €₽'])},
+                'removed': {'p3': {'v_bool': True}},
+                'added': {'p1': imp_strict | {'v_str': 'def', 'v_int': 1}},
+                'profiles': {'p2': {'v_list': ([3], [2])}}}
+    assert cfg.diff(other) == expected
+    assert list(x[0] for x in cfg.iter_diff(other)) == [
+        'active', 'defaults', 'fields', 'fields', 'profiles', 'removed', 'added']
+    cfg.io.fingerprints, other.cfg.io.fingerprints  # noqa
+    assert cfg.diff(other) == expected
+    cfg.profiles.set('p3', {'v_bool': True}, defaults=False)
+    assert cfg.diff(other) == {k: v for k, v in expected.items() if k != 'removed'}
+    assert other.cfg.diff(data)['profiles'] == {'p2': {'v_list': ([2], [3])}}
+    data.v_list.append(7)  # in-place change is not notified, so digests are not used
+    assert cfg.diff(other)['fields']['v_list'] == ([3], [-1, 0, 1, 'repeat €₽', 7])
+    data.v_list.pop()
+
+    # Profile and default section targets
+    cfg.profiles.switch('p1')
+    data.v_int = 5
+    assert cfg.diff('p2') == {'fields': {'v_list': ([2], [-1, 0, 1, 'repeat €₽'])}}
+    assert cfg.diff(cfg.def_sect) == {'fields': {'v_int': (65535, 5)}}
+    assert cfg.diff('p1') == {}
+
+    # Snapshot target, with renames
+    snapshot = cfg.io.snapshot()
+    cfg.profiles.rename('p4', 'p2')
+    data.v_float = 0.5
+    cfg.profiles.set('p3', {'v_bool': True, 'v_int': 3}, defaults=False)
+    del cfg.profiles['p4']
+    cfg.set_defaults({'v_str': 'def2'})
+    assert cfg.diff(snapshot) == {'renamed': [('p2', 'p4')],
+                                  'removed': {'p4': {'v_list': [2]},
+                                              'p3': {'v_bool': True}},
+                                  'added': {'p3': {'v_bool': True, 'v_int': 3}},
+                                  'defaults': {'v_str': ('def', 'def2')},
+                                  'profiles': {'p1': {'v_float': (3.1415, 0.5)}}}
+
+    # Errors
+    raises(InputError, cfg.diff, 'wrong')
+    raises(InputError, cfg.diff, Config2(io=True))
+    raises(InputError, cfg.diff, 5)
+    raises(InputError, cfg.diff, other.cfg.io.snapshot())
@@ -1,11 +1,33 @@
+import asyncio
+import os
+import bz2
+import gzip
+import lzma
+import json
+import marshal
+import shutil
+import sqlite3
 from gc import collect
 from itertools import product
 from pathlib import Path
-
+from functools import partial
+from time import sleep
+from threading import Thread, get_ident
+from contextlib import closing
+from configparser import DuplicateOptionError
+
+from configlayer import ConfigBase, Options, SharedFile
+from configlayer._file import File, fcntl
+from configlayer.utils import as_dict
+from configlayer._sqlite import SQLiteFile
+from configlayer._compressed import CompressedFile
+from configlayer._formats import JSONFile, TOMLFile, tomllib
+from configlayer._shards import ShardedFile
 from configlayer.exceptions import InitError, FileError, IOImportError, InputError
 
-from _utilities import raises_init, subtest
-from _data import TEMP_PATH, Config1, Config1Alias, Config2, Config3, Config4, exp_strict
+from _utilities import raises_init, raises, subtest
+from _data import (TEMP_PATH, OwnInt, Config1, Config1Alias, Config2, Config3, Config4,
+                   exp_strict, imp_strict)
 
 
 def test_init():
@@ -151,3 +173,701 @@ def test_load():
 
         del data
         collect()
+
+
+def test_save_sections():
+    collect()
+
+    TEMP_PATH.unlink(missing_ok=True)
+    data = Config1(TEMP_PATH, profiles=True)
+    profiles = data.cfg.profiles
+    [profiles.set(f'p{i}', {'v_int': i}) for i in range(1, 4)]
+    data.cfg.file.save()
+    original = TEMP_PATH.read_bytes()
+
+    # Unchanged sections are not rewritten
+    data.cfg.file.save('p2')
+    assert TEMP_PATH.read_bytes() == original
+
+    # Same sized section is patched in place, resized one - with the rest of file
+    for value, sections in ((7, 'p2'), (77777, 'p1'), (8, ('p3', 'p4'))):
+        profiles.set(sections if isinstance(sections, str) else sections[-1], {'v_int': value})
+        data.cfg.file.save(sections)
+        expected = b''.join(data.cfg.file._render(data.cfg.io.export_config()).values())
+        assert TEMP_PATH.read_bytes() == expected
+
+    # Deleted and renamed profiles are removed from file, index is updated after external changes
+    del profiles['p1']
+    profiles.rename('p5', 'p4')
+    TEMP_PATH.write_bytes(b'\n' + TEMP_PATH.read_bytes())
+    data.cfg.file.save('p3')
+    text = TEMP_PATH.read_text(encoding='utf-8')
+    assert text.startswith('\n[_CONFIG_LAYER]') and '[p1]' not in text and '[p4]' not in text
+    data.cfg.file.save('p5')
+    data.cfg.file.load()
+    assert tuple(profiles.get) == ('p2', 'p3', 'p5')
+
+    # All sections are saved after import, as removed profiles are unknown
+    data.cfg.io.import_config({'_CONFIG_LAYER': {'profile': "'q1'"}, 'DEFAULT': {}, 'q1': {}})
+    data.cfg.file.save('q1')
+    data.cfg.file.load()
+    assert tuple(profiles.get) == ('q1',)
+
+    del data
+    collect()
+
+
+def test_load_sections():
+    collect()
+
+    TEMP_PATH.unlink(missing_ok=True)
+    data = Config1(TEMP_PATH, profiles=True)
+    [data.cfg.profiles.set(f'p{i}', {'v_int': i}) for i in range(1, 3)]
+    data.cfg.file.save()
+
+    # Only selected sections are decoded, so broken not selected section is not affect loading
+    TEMP_PATH.write_text(TEMP_PATH.read_text(encoding='utf-8') + 'v_int = 3\n', encoding='utf-8')
+    data.cfg.file.load('p1')
+    assert data.cfg.profiles.get == {'p1': tuple((imp_strict | {'v_int': 1}).values())}
+
+    # Whole file is parsed at once at full load, as ConfigParser does it
+    de = DuplicateOptionError('p2', 'v_int', str(TEMP_PATH), 12)
+    raises((FileError(f'Load from "{TEMP_PATH}" failed. {de}'), de), data.cfg.file.load)
+
+    # Section header is a line prefix, as for ConfigParser
+    text = TEMP_PATH.read_text(encoding='utf-8').removesuffix('v_int = 3\n')
+    TEMP_PATH.write_text(text.replace('[p1]', '[p1]  ; main profile'), encoding='utf-8')
+    for sections in (None, 'p1'):
+        data.cfg.file.load(sections)
+        assert data.cfg.profiles.get['p1'] == tuple((imp_strict | {'v_int': 1}).values())
+
+    del data
+    collect()
+
+
+def test_snapshot():
+    collect()
+
+    # Snapshot is not made for data of not builtin types (not marshallable)
+    TEMP_PATH.unlink(missing_ok=True)
+    data = Config1(TEMP_PATH, profiles=True, options=Options(file_snapshot=True))
+    file = data.cfg.file
+    file.snapshot_path.unlink(missing_ok=True)
+    file.save()
+    file.load()
+    assert not file.snapshot_path.exists()
+
+    # Changed functions code (with constants and closures) changes schema
+    item = data.cfg.io._schema_item
+    assert item(lambda x: int(x) + 1) != item(lambda x: int(x) + 2)
+
+    def offset(value):
+        return lambda x: int(x) + value
+    assert item(offset(1)) != item(offset(2))
+
+    del data, file
+    collect()
+
+    class Builtins(ConfigBase):
+        v_int: int = 0
+        v_list: list = [1, 'two']
+        v_set: set = {b'three'}
+
+    TEMP_PATH.unlink(missing_ok=True)
+    data = Builtins(TEMP_PATH, profiles=True, options=Options(file_snapshot=True))
+    file, snapshot_path = data.cfg.file, data.cfg.file.snapshot_path
+    data.cfg.profiles.set('p1', {'v_int': 1})
+    file.save()
+    assert not file.snapshot_path.exists()
+
+    def snapshot():
+        with snapshot_path.open('rb') as f:
+            return marshal.load(f), marshal.load(f)
+
+    # Snapshot is made at load from file, and used at the next load, if file is not changed
+    file.load()
+    (key, stamp, digest), (index, (active, defaults, profiles)) = snapshot()
+    assert (key, stamp, index) == (file._snapshot_key(), file._get_stamp(), file._index)
+    assert (active, defaults) == ('DEFAULT', data.cfg.get_factory_defaults)
+    assert profiles == {'p1': defaults | {'v_int': 1}}
+    file.snapshot_path.write_bytes(marshal.dumps((key, stamp, digest))
+                                   + marshal.dumps((index, (active, defaults, {'p2': defaults}))))
+    file.load()
+    assert tuple(data.cfg.profiles.get) == ('p2',)
+
+    # Changed file stamp with the same data - snapshot is used, with header update
+    os.utime(TEMP_PATH, ns=(stamp[1] - 10 ** 9, stamp[1] - 10 ** 9))
+    file.load()
+    assert tuple(data.cfg.profiles.get) == ('p2',)
+    assert snapshot()[0] == (key, file._get_stamp(), digest)
+
+    # Changed file or broken snapshot invalidates snapshot
+    TEMP_PATH.write_bytes(TEMP_PATH.read_bytes() + b'\n')
+    file.load()
+    assert tuple(data.cfg.profiles.get) == ('p1',) and snapshot()[0][2] != digest
+    file.snapshot_path.write_bytes(b'broken')
+    file.load()
+    assert tuple(data.cfg.profiles.get) == ('p1',) and snapshot()[0][0] == key
+
+    del data, file
+    collect()
+
+    # Changed factory defaults invalidates snapshot, as imported data contains them
+    TEMP_PATH.unlink(missing_ok=True)
+    for default in (1, 2):
+        class Snapshot(ConfigBase):
+            v_int: int = default
+        data = Snapshot(TEMP_PATH, options=Options(file_snapshot=True))
+        assert data.v_int == default
+        data.cfg.file.save()
+        data.cfg.file.load()
+        del data
+        collect()
+    TEMP_PATH.with_name(f'{TEMP_PATH.name}.snapshot').unlink()
+
+
+def test_lock():
+    collect()
+
+    TEMP_PATH.unlink(missing_ok=True)
+    options = Options(file_lock=True)
+    if fcntl is None:
+        fe = FileError(f'Save to "{TEMP_PATH}" failed. '
+                       "Option 'file_lock' is not supported on this platform")
+        return raises_init(fe, Config1, TEMP_PATH, profiles=True, options=options)
+    data = Config1(TEMP_PATH, profiles=True, options=options)
+    file = data.cfg.file
+
+    # Readers are waiting for the writer lock release (flock is per opened file)
+    file.save()
+    with file.lock_path.open('a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        (reader := Thread(target=file.load)).start()
+        reader.join(0.2)
+        assert reader.is_alive()
+        fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        reader.join()
+
+    # Readers are not blocking each other
+    with file.lock_path.open('a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_SH)
+        file.load()
+        fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    # File is replaced by written temp file, so readers without lock never see torn file
+    with TEMP_PATH.open('rb') as old:
+        original = TEMP_PATH.read_bytes()
+        data.v_int = 5
+        file.save()
+        assert old.read() == original != TEMP_PATH.read_bytes()
+    assert not list(TEMP_PATH.parent.glob(f'{TEMP_PATH.name}.*.tmp'))
+
+    del data, file
+    collect()
+    TEMP_PATH.with_name(f'{TEMP_PATH.name}.lock').unlink()
+
+
+def test_journal():
+    collect()
+
+    TEMP_PATH.unlink(missing_ok=True)
+    options = Options(file_journal=True)
+    data = Config1(TEMP_PATH, profiles=True, options=options)
+    file = data.cfg.file
+    file.journal_path.unlink(missing_ok=True)
+    profiles = data.cfg.profiles
+
+    def state(cfg):
+        return cfg.get_defaults, cfg.profiles.active, dict(cfg.profiles.get)
+
+    def reloaded(expected):
+        collect()
+        new = Config1(TEMP_PATH, profiles=True, options=options)
+        assert state(new.cfg) == expected
+        return new, new.cfg.file, new.cfg.profiles
+
+    # Changes are journaled and replayed at load (without file, or over saved file)
+    data.v_int = 1
+    data.cfg.set_defaults({'v_str': 'def'})
+    [profiles.set(f'p{i}', {'v_int': i}) for i in range(2, 5)]
+    profiles.switch('p2')
+    data.v_list = ['p2']
+    profiles.rename('p5', 'p3')
+    del profiles['p2']
+    assert not TEMP_PATH.exists()
+    assert len(file.journal_path.read_bytes().splitlines()) == 10
+    expected = state(data.cfg)
+    del data, file, profiles
+    data, file, profiles = reloaded(expected)
+    assert profiles.active == 'p5'
+
+    file.save()
+    assert not file.journal_path.exists()
+    data.v_bool = True
+    with file.journal_path.open('ab') as journal:
+        journal.write(b"('switch', 'p5')")  # torn record is skipped
+    expected = state(data.cfg)
+    del data, file, profiles
+    data, file, profiles = reloaded(expected)
+    assert data.v_bool is True
+
+    # Import is compacted to file, as any big journal
+    data.cfg.io.import_config({'_CONFIG_LAYER': {'profile': "'p1'"}, 'p1': {'v_int': '7'}})
+    file.compact(wait=True)
+    assert not file.journal_path.exists()
+    expected = state(data.cfg)
+    del data, file, profiles
+    data, file, profiles = reloaded(expected)
+    assert tuple(profiles.get) == ('p1',) and data.v_int == 7
+
+    # Late compaction is skipped, if file is saved after its export
+    def delayed(self, *args):
+        sleep(0.05)
+        compact(self, *args)
+
+    compact, File._compact = File._compact, delayed
+    try:
+        data.v_int = 10
+        file.compact()
+        data.v_int = 20
+        file.save()
+        file.compact(wait=True)
+    finally:
+        File._compact = compact
+    expected = state(data.cfg)
+    del data, file, profiles
+    data, file, profiles = reloaded(expected)
+    assert data.v_int == 20 and not file.journal_path.exists()
+
+    # Wrong records are not replayed
+    file.journal_path.write_bytes(b"('switch', 'p9')\n")
+    ie = InputError('name', func_name='Config1.cfg.profiles.switch()',
+                    msg="'p9' profile in 'Config1' config is not exists", available=('p1',))
+    fe = FileError(f'Journal "{file.journal_path}" record 1 replay failed: {ie!r}')
+    raises(FileError(f'Load from "{TEMP_PATH}" failed. {fe}'), file.load)
+
+    # Journal is not used (and not removed at save) by config with disabled journal
+    del data, file, profiles
+    collect()
+    data = Config1(TEMP_PATH, profiles=True)
+    data.cfg.file.save()
+    data.v_int = 30
+    assert data.cfg.file.journal_path.read_bytes() == b"('switch', 'p9')\n"
+    data.cfg.file.journal_path.unlink()
+
+    del data
+    collect()
+
+
+def test_sqlite():
+    collect()
+
+    path = TEMP_PATH.with_suffix('.db')
+    path.unlink(missing_ok=True)
+    data = Config1(path, profiles=True)
+    assert type(data.cfg.file) is SQLiteFile and not path.exists()
+    profiles = data.cfg.profiles
+    data.cfg.set_defaults({'v_str': 'def'})
+    [profiles.set(f'p{i}', {'v_int': i}) for i in range(1, 4)]
+    profiles.switch('p2')
+    data.cfg.file.save()
+
+    def rows():
+        with closing(sqlite3.connect(path)) as db:
+            return (db.execute('SELECT * FROM sections ORDER BY position').fetchall(),
+                    db.execute('SELECT * FROM fields ORDER BY section, position').fetchall())
+
+    sections = [('_CONFIG_LAYER', 0), ('DEFAULT', 1), ('p1', 2), ('p2', 3), ('p3', 4)]
+    fields = [('DEFAULT', 'v_str', "'def'", 0), ('_CONFIG_LAYER', 'profile', "'p2'", 0),
+              ('p1', 'v_int', '1', 0), ('p2', 'v_int', '2', 0), ('p3', 'v_int', '3', 0)]
+    assert rows() == (sections, fields)
+
+    # Selected sections are updated in transaction, deleted are removed, other are kept
+    data.v_int = 22
+    del profiles['p1']
+    profiles.set('p4', {'v_bool': True})
+    data.cfg.file.save(('p2', 'p4'))
+    fields[1:4] = [('_CONFIG_LAYER', 'profile', "'p2'", 0), ('p2', 'v_int', '22', 0)]
+    del sections[2]
+    assert rows() == (sections + [('p4', 5)], fields + [('p4', 'v_bool', 'True', 0)])
+
+    # Full save drops deleted sections, full load and load of selected sections
+    data.cfg.file.save()
+    assert [x[0] for x in rows()[0]] == ['_CONFIG_LAYER', 'DEFAULT', 'p2', 'p3', 'p4']
+    state = data.cfg.get_defaults, profiles.active, dict(profiles.get)
+    data.cfg.file.load()
+    assert (data.cfg.get_defaults, profiles.active, profiles.get) == state
+    data.cfg.file.load(('p2', 'p3'))
+    assert tuple(profiles.get) == ('p2', 'p3')
+
+    del data, profiles
+    collect()
+    path.unlink()
+
+
+def test_shared():
+    collect()
+
+    TEMP_PATH.unlink(missing_ok=True)
+    store = SharedFile(TEMP_PATH)
+    data1, data2 = Config1(store), Config2(store)
+    assert not TEMP_PATH.exists() and str(store) == (f'Shared file "{TEMP_PATH}" of '
+                                                     "'Config1', 'Valid fields' configs")
+
+    # Path and config name are used once, profiles and per-file options are not supported
+    raises_init(InitError(f"Path \"{TEMP_PATH}\" is already used in 'SharedFile' config"),
+                Config1, TEMP_PATH)
+    raises_init(InitError(f"Config name 'Config1' is already used in {store!r}"), Config1, store)
+    raises_init(InitError('Shared file is available only for configs with disabled profiles'),
+                Config3, store, profiles=True)
+    raises_init(InitError('Shared file does not support options: file_journal'),
+                Config3, store, options=Options(file_journal=True))
+
+    # All configs are saved in single file with prefixed sections
+    data1.v_int, data2.c2 = 1, 'two'
+    data2.cfg.set_defaults({'v_int': 2})
+    store.save()
+    assert TEMP_PATH.read_text(encoding='utf-8').split('\n') == [
+        '[Config1:DEFAULT]', '', '[Config1]', 'v_int = 1', '',
+        '[Valid fields:DEFAULT]', 'v_int = 2', '', '[Valid fields]', 'v_int = 65535',
+        "c2 = 'two'", '', '']
+
+    # Config save replaces its sections only, other configs sections are kept
+    data1.v_int, data2.c2 = 11, 'not saved'
+    data1.cfg.file.save()
+    text = TEMP_PATH.read_text(encoding='utf-8')
+    assert 'v_int = 11' in text and "c2 = 'two'" in text
+    raw = store._parse()  # noqa
+    assert store._parse() is raw  # noqa (not changed file is not read again)
+
+    # Configs are loaded from single reading, not provided configs are skipped
+    del data1, data2, store, raw
+    collect()
+    store = SharedFile(TEMP_PATH)
+    data1, data2, data3 = Config1(store), Config2(store), Config3(store)
+    assert (data1.v_int, data2.cfg.get_defaults['v_int'], data2.c2) == (11, 2, 'two')
+    data1.v_int, data2.c2 = 0, ''
+    store.load()
+    assert (data1.v_int, data2.c2) == (11, 'two')
+    raises((FileError(f'Load from "{TEMP_PATH}" failed. '
+                      "'Gotcha' config sections are not found"),), data3.cfg.file.load)
+
+    del data1, data2, data3, store
+    collect()
+    assert TEMP_PATH not in File._used_paths  # noqa
+    TEMP_PATH.unlink()
+
+
+def test_shards():
+    collect()
+
+    path = TEMP_PATH.with_suffix('')
+    shutil.rmtree(path, ignore_errors=True)
+    options = Options(file_shards=True)
+    raises_init(InitError("Option 'file_shards' is available only for configs with profiles"),
+                Config1, path, options=options)
+    raises_init(InitError("Option 'file_shards' does not support options: file_journal"),
+                Config1, path, profiles=True, options=Options(file_shards=True, file_journal=True))
+    data = Config1(path, profiles=True, options=options)
+    file, profiles = data.cfg.file, data.cfg.profiles
+    assert type(file) is ShardedFile and not path.exists()
+
+    # Index file with internal and default sections and file per profile
+    data.cfg.set_defaults({'v_str': 'def'})
+    [profiles.set(f'p{i}', {'v_int': i}) for i in range(1, 4)]
+    profiles.switch('p2')
+    file.save()
+    assert file.index_path.read_text(encoding='utf-8').split('\n') == [
+        '[_CONFIG_LAYER]', "profile = 'p2'", "profiles = ['p1', 'p2', 'p3']", '',
+        '[DEFAULT]', "v_str = 'def'", '', '']
+    assert file.profile_path('p3').read_text(encoding='utf-8') == '[p3]\nv_int = 3\n\n'
+
+    # Only changed profiles are saved, renames and deletions are applied to files
+    def mark(profile_path):
+        profile_path.write_bytes(profile_path.read_bytes() + b'# kept\n')
+    profiles.set('p4', {'v_int': 4})
+    file.save()
+    [mark(file.profile_path(x)) for x in ('p1', 'p2', 'p3', 'p4')]
+    data.v_int = 22
+    profiles.rename('a/b', 'p1')
+    del profiles['p3']
+    file.save()
+    assert sorted(x.name for x in file.profiles_path.iterdir()) == ['a%2Fb.ini', 'p2.ini',
+                                                                    'p4.ini']
+    assert file.profile_path('a/b').read_text(encoding='utf-8') == '[a/b]\nv_int = 1\n\n'
+    assert file.profile_path('p2').read_text(encoding='utf-8') == '[p2]\nv_int = 22\n\n'
+    assert file.profile_path('p4').read_bytes().endswith(b'# kept\n')
+
+    # Renamed not loaded profile is loaded before its file is renamed
+    file.load()
+    profiles.rename('p5', 'p4')
+    file.save()
+    file.load()
+    assert profiles.get['p5'] == tuple((data.cfg.get_defaults | {'v_int': 4}).values())
+
+    # Defaults change saves all profiles
+    mark(file.profile_path('p2'))
+    data.cfg.set_defaults({'v_str': 'def2'})
+    file.save()
+    assert not file.profile_path('p2').read_bytes().endswith(b'# kept\n')
+
+    # Not active profiles are loaded at first access, and not loaded at save of other ones
+    profiles.set('p6', {'v_int': 6}, defaults=False)
+    file.save()
+    state = data.cfg.get_defaults, profiles.active, dict(profiles.get)
+    file.load()
+    data.v_int = 222
+    file.save()
+    assert [k for k, v in dict.items(profiles._profiles) if isinstance(v, partial)] == [
+        'a/b', 'p5', 'p6']
+    assert "fields = {'p6': ('v_int',)}" in file.index_path.read_text(encoding='utf-8')
+    data.v_int = 22
+    file.save()
+    assert repr(profiles.get) == f'mappingproxy({state[2]!r})'
+    assert (data.cfg.get_defaults, profiles.active, profiles.get) == state
+    assert type(dict.get(profiles._profiles, 'a/b')) is tuple  # noqa
+
+    # Not exists section selected
+    ie = InputError('sections', func_name=f'{file!r}.load()', msg="Extra section: 'p3'",
+                    must_be="not more than expected ('a/b', 'p2', 'p5', 'p6')", received=": 'p3'")
+    raises((FileError(f'Load from "{path}" failed. {ie!r}'), ie), file.load, 'p3')
+
+    del data, file, profiles
+    collect()
+    shutil.rmtree(path)
+
+
+def test_compressed():
+    for suffix, module in ('.gz', gzip), ('.bz2', bz2), ('.xz', lzma):
+        collect()
+
+        path = TEMP_PATH.with_suffix(f'.ini{suffix}')
+        path.unlink(missing_ok=True)
+        data = Config1(path, profiles=True)
+        file, profiles = data.cfg.file, data.cfg.profiles
+        assert type(file) is CompressedFile and not path.exists()
+
+        def decompressed():
+            return module.decompress(path.read_bytes()).decode('utf-8').replace(os.linesep, '\n')
+
+        # Compressed data is the same as ini file data
+        [profiles.set(f'p{i}', {'v_int': i}) for i in range(1, 4)]
+        file.save()
+        text = "[_CONFIG_LAYER]\nprofile = 'DEFAULT'\n\n[DEFAULT]\n\n"
+        text += ''.join(f'[p{i}]\nv_int = {i}\n\n' for i in range(1, 4))
+        assert decompressed() == text
+
+        # Selected sections are replaced, deleted ones are removed, other ones are kept
+        profiles.set('p2', {'v_int': 22})
+        profiles.set('p4', {'v_int': 4})
+        del profiles['p1']
+        file.save(('p2', 'p4'))
+        text = text.replace('[p1]\nv_int = 1\n\n', '').replace('v_int = 2\n', 'v_int = 22\n')
+        text += '[p4]\nv_int = 4\n\n'
+        assert decompressed() == text
+
+        # Load and forbidden default section
+        file.load()
+        assert tuple(profiles.get) == ('p2', 'p3', 'p4') and profiles['p2'][2] == 22
+        assert not list(path.parent.glob(f'{path.name}.*.tmp'))
+
+        # Only selected sections are decoded, so broken not selected section is not affect loading
+        path.write_bytes(module.compress(module.decompress(path.read_bytes()) + b'v_int = 3\n'))
+        file.load('p2')
+        assert tuple(profiles.get) == ('p2',) and profiles['p2'][2] == 22
+        path.write_bytes(module.compress(b'[_DEFAULT]\n'))
+        fe = FileError("'_DEFAULT' section is forbidden, but provided")
+        raises((FileError(f'Load from "{path}" failed. {fe}'),), file.load)
+
+        del data, file, profiles
+        collect()
+        path.unlink()
+
+
+def test_formats():
+    native = {'v_bool': True, 'v_str': 'text "quoted"', 'v_int': 2, 'v_float': 0.5,
+              'v_list': [-1, 'ok'], 'v_cust2': 'custom'}
+    raw = {'v_bytes': "b'bytes'", 'v_tuple': '(1,)', 'v_set': "{'set'}", 'v_dict': "{1: 'one'}",
+           'v_cust1': '6', 'v_cust3': '3custom', 'v_path': 'path'}
+    imported = native | {'v_bytes': b'bytes', 'v_tuple': (1,), 'v_set': {'set'},
+                         'v_dict': {1: 'one'}, 'v_cust1': OwnInt(6), 'v_cust3': 3,
+                         'v_path': Path('path')}
+    for suffix, file_type in ('.json', JSONFile), ('.toml', TOMLFile):
+        collect()
+
+        path = TEMP_PATH.with_suffix(suffix)
+        path.unlink(missing_ok=True)
+        data = Config1(path, profiles=True)
+        file, profiles = data.cfg.file, data.cfg.profiles
+        assert type(file) is file_type and not path.exists()
+
+        # Native field types are stored as is, others - as exported strings
+        profiles.set('p 1', imported)
+        profiles.set('p2', {'v_int': 2})
+        file.save()
+        if suffix == '.json':
+            assert json.loads(path.read_bytes())['p 1'] == native | raw
+        else:
+            text = path.read_text(encoding='utf-8')
+            assert '["p 1"]\nv_bool = true\nv_str = "text \\"quoted\\""\n' in text
+            assert '\nv_list = [-1, "ok"]\n' in text and '\nv_dict = "{1: \'one\'}"\n' in text
+
+        # Selected sections are saved, other ones are kept, native values are imported as is
+        profiles.set('p2', {'v_int': 22})
+        profiles.set('p3', {'v_float': 1e100})
+        file.save(('p2', 'p3'))
+        if suffix == '.toml' and tomllib is None:
+            raises((FileError(f'Load from "{path}" failed. '
+                              'TOML file reading needs tomllib (Python 3.11+)'),), file.load)
+        else:
+            profiles.set('p 1', {})
+            file.load()
+            assert tuple(profiles.get) == ('p 1', 'p2', 'p3')
+            assert as_dict(profiles['p 1'], data.cfg.get_fields) == imp_strict | imported
+            assert profiles['p2'][2] == 22 and profiles['p3'][3] == 1e100
+
+            # Renamed profile is removed from file at save of selected sections
+            profiles.rename('p 3', 'p3')
+            file.save('p 3')
+            file.load()
+            assert tuple(profiles.get) == ('p 1', 'p2', 'p 3')
+
+        del data, file, profiles
+        collect()
+        path.unlink()
+
+
+def test_async():
+    collect()
+
+    TEMP_PATH.unlink(missing_ok=True)
+    data = Config1(TEMP_PATH, profiles=True)
+    file, profiles = data.cfg.file, data.cfg.profiles
+
+    async def saves(file, profiles):
+        # Config is exported at the start of writing, waiting saves with same arguments coalesced
+        profiles.set('p1', {'v_int': 1})
+        first = asyncio.create_task(file.asave())
+        await asyncio.sleep(0)
+        profiles.set('p1', {'v_int': 2})
+        others = [asyncio.create_task(file.asave()) for _ in range(3)]
+        selected = asyncio.create_task(file.asave('p1'))
+        await asyncio.sleep(0)
+        assert len(file._asaves) == 2
+        profiles.set('p1', {'v_int': 3})
+        await asyncio.gather(first, *others, selected)
+        assert not file._asaves and file._awriting is None
+
+    asyncio.run(saves(file, profiles))
+    assert '[p1]\nv_int = 3\n' in TEMP_PATH.read_text(encoding='utf-8')
+
+    # Load file, it is read in executor and imported and applied in event loop thread
+    async def load(file):
+        threads = []
+
+        def recorded(*args, **kwargs):
+            threads.append(get_ident())
+            return import_config(*args, **kwargs)
+
+        io_type = type(file._cfg.io)
+        import_config, io_type._import_config = io_type._import_config, recorded
+        try:
+            await file.aload()
+        finally:
+            io_type._import_config = import_config
+        assert threads == [get_ident()]
+
+    profiles.set('p1', {'v_int': 4})
+    asyncio.run(load(file))
+    assert profiles['p1'][2] == 3
+
+    # Errors are raised as at synchronous load
+    TEMP_PATH.unlink()
+    raises((FileError(f'Load from "{TEMP_PATH}" failed. No such file or directory'),),
+           asyncio.run, file.aload())
+
+    del data, file, profiles
+    collect()
+
+
+def test_load_many():
+    collect()
+
+    paths = [TEMP_PATH.with_name(f'temp_config_{i}.ini') for i in range(8)]
+    configs = [Config1(path) for path in paths]
+    for i, data in enumerate(configs):
+        data.v_int = i
+        data.cfg.file.save()
+        data.v_int = -1
+
+    # All configs are loaded, files are read in pool threads
+    ConfigBase.load_many(*configs, workers=4)
+    assert [x.v_int for x in configs] == list(range(8))
+
+    # Failed configs are reported, other ones are loaded anyway
+    [setattr(x, 'v_int', -1) for x in configs]
+    paths[3].unlink()
+    fe = FileError(f'Loading of 1 from 8 configs failed:\n\t'
+                   f'Load from "{paths[3]}" failed. No such file or directory')
+    raises((fe,), ConfigBase.load_many, *configs)
+    assert [x.v_int for x in configs] == [0, 1, 2, -1, 4, 5, 6, 7]
+
+    # Configs without file
+    ie = InputError('configs', func_name='ConfigBase.load_many()',
+                    must_be='configs with file paths', received=': Config2, 1')
+    raises((ie,), ConfigBase.load_many, configs[0], Config2(), 1)
+
+    del configs, data
+    collect()
+    [x.unlink(missing_ok=True) for x in paths]
+
+
+def test_save_all():
+    collect()
+
+    paths = [TEMP_PATH.with_name(f'temp_config_{i}.ini') for i in range(4)]
+    [x.unlink(missing_ok=True) for x in paths]
+    configs = [Config1(path) for path in paths]
+    without_file = Config2()
+    assert all(any(x is y for y in ConfigBase.get_configs()) for x in (*configs, without_file))
+
+    # All configs with files are saved
+    for i, data in enumerate(configs):
+        data.v_int = i
+    ConfigBase.save_all(workers=2)
+    assert all(f'v_int = {i}\n' in x.read_text(encoding='utf-8') for i, x in enumerate(paths))
+
+    # Configs with shared file are saved by single shared file writing
+    shared_path = TEMP_PATH.with_name('temp_config_shared.ini')
+    shared_path.unlink(missing_ok=True)
+    store = SharedFile(shared_path)
+    shared = [Config3(store), Config4(store)]
+    shared[0].v_int = shared[1].v_int = 5
+
+    def update(self, rendered):
+        writes.append(tuple(rendered))
+        original(self, rendered)
+
+    writes, (original, SharedFile._update) = [], (SharedFile._update, update)
+    try:
+        ConfigBase.save_all()
+    finally:
+        SharedFile._update = original
+    assert writes == [('Gotcha:DEFAULT', 'Gotcha', 'IO:DEFAULT', 'IO')]
+    assert shared_path.read_text(encoding='utf-8').count('v_int = 5\n') == 2
+    del shared, store
+    collect()
+    shared_path.unlink()
+
+    # All configs with existing files are reloaded
+    [setattr(x, 'v_int', -1) for x in configs]
+    paths[0].unlink()
+    ConfigBase.reload_all()
+    assert [x.v_int for x in configs] == [-1, 1, 2, 3]
+
+    # Deleted configs are removed from live configs
+    ids = {id(x) for x in configs}
+    del configs, data, without_file
+    collect()
+    assert not ids & {id(x) for x in ConfigBase.get_configs()}
+    [x.unlink(missing_ok=True) for x in paths]